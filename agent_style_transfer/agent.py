@@ -3,14 +3,67 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING, get_args
 
-from langchain.schema import HumanMessage, SystemMessage
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages.ai import add_usage
+from pydantic import BaseModel, ValidationError
 
-from agent_style_transfer.llm_provider_setup import get_llm
-from agent_style_transfer.prompt_builder import build_generation_prompt
+from agent_style_transfer.deadlines import (
+    Deadline,
+    DeadlineExceeded,
+    as_deadline,
+    gather_within,
+)
+from agent_style_transfer.hedging import HedgePolicy
+from agent_style_transfer.llm_provider_setup import (
+    CACHE_CONTROL_PROVIDERS,
+    TRUNCATION_STOP_REASONS,
+    get_llm,
+    get_stop_reason,
+    get_token_usage,
+    max_tokens_kwargs,
+)
+from agent_style_transfer.long_input import (
+    DEFAULT_LONG_INPUT,
+    LongInputConfig,
+    condense_target_content,
+)
+from agent_style_transfer.prompt_builder import (
+    StyleInference,
+    aenhance_reference_styles,
+    build_cacheable_generation_prompt,
+    build_combined_generation_prompt,
+    build_generation_prompt,
+    get_max_tokens,
+)
+from agent_style_transfer.response_cache import (
+    ResponseCache,
+    is_deterministic,
+    response_cache_key,
+)
+from agent_style_transfer.scheduler import ConcurrencyScheduler
 from agent_style_transfer.schemas import (
     StyleTransferRequest,
     StyleTransferResponse,
+    StyleTransferStreamEvent,
+    build_combined_schema,
+    combined_field_name,
+)
+from agent_style_transfer.single_flight import acoalesce, llm_call_key
+from agent_style_transfer.style_cache import StyleProfileCache
+from agent_style_transfer.sync_adapter import ainvoke_model
+from agent_style_transfer.utils.json_stream import IncrementalJSONParser
+from agent_style_transfer.utils.tokens import estimate_input_tokens, estimate_tokens
+
+if TYPE_CHECKING:
+    from agent_style_transfer.persona_profile import PersonaProfileStore
+
+SYSTEM_MESSAGE = (
+    "You are an expert content creator specializing in style transfer. "
+    "Return the content in the exact format specified by the output schema."
 )
 
 
@@ -19,6 +72,16 @@ async def transfer_style(
     llm_provider: str = "google_genai",
     model: str | None = None,
     temperature: float = 0.7,
+    style_cache: StyleProfileCache | None = None,
+    hedge_policy: HedgePolicy | None = None,
+    response_cache: ResponseCache | None = None,
+    combine_schemas: bool = False,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+    long_input: LongInputConfig | None = DEFAULT_LONG_INPUT,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+    deadline: Deadline | float | None = None,
 ) -> list[StyleTransferResponse]:
     """Main interface for style transfer functionality with parallel processing.
 
@@ -28,6 +91,50 @@ async def transfer_style(
             Defaults to "google_genai".
         model: Model name. If None, will use provider defaults.
         temperature: Model temperature (0.0 to 1.0). Defaults to 0.7.
+        style_cache: Optional persistent cache of inferred style profiles.
+            On a hit the style inference LLM calls are skipped.
+        hedge_policy: Optional policy that duplicates slow generation calls to
+            a secondary provider/model and keeps the fastest answer.
+        response_cache: Optional cache of generated output. Only used when
+            ``temperature`` is 0 (or the model has a fixed seed).
+        combine_schemas: Generate all target schemas of the request in a
+            single call (see :func:`process_combined_schemas`) instead of one
+            call per schema.
+        max_prompt_tokens: Optional token budget of each generation prompt.
+            Over-budget prompts drop metadata and extra examples, then
+            truncate target content (see
+            :func:`~agent_style_transfer.prompt_builder.fit_prompt_sections`).
+            ``metadata["prompt_tokens"]`` reports the estimated prompt size.
+        prompt_caching: Lay prompts out with the instructions, writing
+            guidance and reference style first, as a prefix that providers
+            can cache across requests, and mark it as a cache breakpoint for
+            providers that take one (Anthropic ``cache_control``). Cached
+            token counts are reported in ``metadata["usage"]``.
+        long_input: When and how long target documents are condensed. Target
+            content over ``long_input.threshold_tokens`` is chunked, the key
+            points of the chunks are extracted concurrently and only those
+            are sent to generation (see
+            :func:`~agent_style_transfer.long_input.condense_target_content`).
+            ``None`` always sends target content verbatim.
+        style_inference: How reference styles are inferred from documents.
+            ``"llm"`` runs one structured LLM call per reference style,
+            grounded by locally measured statistics; ``"local"`` estimates
+            the style from those statistics only, in milliseconds and
+            without a network call (see
+            :mod:`~agent_style_transfer.stylometry`).
+        persona_profiles: Optional store of persona profiles. Reference
+            styles are then profiled incrementally: only documents new to a
+            persona (by name) are analyzed and the LLM inference only runs
+            again once the persona's style drifts (see
+            :mod:`~agent_style_transfer.persona_profile`). Takes precedence
+            over ``style_cache``.
+        deadline: Optional :class:`~agent_style_transfer.deadlines.Deadline`
+            (or seconds from now) shared by the stages of the request. Style
+            inference that runs out of its share is cancelled and generation
+            continues with the reference styles as given
+            (``metadata["timed_out_stages"]`` lists ``"inference"``).
+            Generation calls that run out of theirs are cancelled and their
+            schemas are returned with ``status="timeout"``.
 
     Returns:
         List of style transfer responses
@@ -35,62 +142,909 @@ async def transfer_style(
 
     llm = get_llm(llm_provider, model=model, temperature=temperature)
 
-    tasks = []
-    for output_schema in request.target_schemas:
-        task = process_target_schema(
+    deadline = as_deadline(deadline)
+    timed_out_stages = []
+
+    # Infer reference styles and condense long target content once, shared
+    # across every target schema
+    preparation = prepare_request(
+        request,
+        llm_provider,
+        model,
+        style_cache,
+        long_input,
+        style_inference,
+        persona_profiles,
+    )
+    if deadline is None:
+        reference_style, target_content = await preparation
+    else:
+        try:
+            reference_style, target_content = await deadline.run(
+                "inference", preparation
+            )
+        except DeadlineExceeded:
+            # Generating without inferred style beats returning nothing
+            reference_style = request.reference_style
+            target_content = request.target_content
+            timed_out_stages.append("inference")
+
+    if combine_schemas and len(request.target_schemas) > 1:
+        tasks = [
+            process_combined_schemas(
+                llm,
+                request.target_schemas,
+                reference_style,
+                request.intent,
+                request.focus,
+                target_content,
+                llm_provider,
+                hedge_policy=hedge_policy,
+                response_cache=response_cache,
+                max_prompt_tokens=max_prompt_tokens,
+                prompt_caching=prompt_caching,
+            )
+        ]
+        (combined,) = await gather_within(deadline, "generation", tasks)
+        results = combined or [None] * len(request.target_schemas)
+    else:
+        tasks = [
+            process_target_schema(
+                llm,
+                output_schema,
+                reference_style,
+                request.intent,
+                request.focus,
+                target_content,
+                llm_provider,
+                hedge_policy=hedge_policy,
+                response_cache=response_cache,
+                max_prompt_tokens=max_prompt_tokens,
+                prompt_caching=prompt_caching,
+            )
+            for output_schema in request.target_schemas
+        ]
+        results = await gather_within(deadline, "generation", tasks)
+
+    responses = [
+        (
+            response
+            if response is not None
+            else build_timeout_response(
+                output_schema,
+                reference_style,
+                request.intent,
+                request.focus,
+                target_content,
+                "generation",
+            )
+        )
+        for response, output_schema in zip(results, request.target_schemas)
+    ]
+    if timed_out_stages:
+        for response in responses:
+            response.metadata["timed_out_stages"] = list(timed_out_stages)
+
+    return responses
+
+
+async def transfer_style_stream(
+    request: StyleTransferRequest,
+    llm_provider: str = "google_genai",
+    model: str | None = None,
+    temperature: float = 0.7,
+    style_cache: StyleProfileCache | None = None,
+    response_cache: ResponseCache | None = None,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+    long_input: LongInputConfig | None = DEFAULT_LONG_INPUT,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> AsyncIterator[StyleTransferResponse]:
+    """Yield style transfer responses as soon as each schema finishes.
+
+    Arguments are as in :func:`transfer_style`, which also takes
+    ``hedge_policy``, ``combine_schemas`` and ``deadline``; those are not
+    supported here. Responses arrive in completion order;
+    ``metadata["schema_index"]`` holds the position of the schema in
+    ``request.target_schemas``. Closing the generator early cancels the
+    schemas still in flight.
+    """
+
+    llm = get_llm(llm_provider, model=model, temperature=temperature)
+
+    reference_style, target_content = await prepare_request(
+        request,
+        llm_provider,
+        model,
+        style_cache,
+        long_input,
+        style_inference,
+        persona_profiles,
+    )
+
+    async def run_schema(index, output_schema):
+        response = await process_target_schema(
             llm,
             output_schema,
-            request.reference_style,
+            reference_style,
             request.intent,
             request.focus,
-            request.target_content,
+            target_content,
             llm_provider,
+            response_cache=response_cache,
+            max_prompt_tokens=max_prompt_tokens,
+            prompt_caching=prompt_caching,
         )
-        tasks.append(task)
+        response.metadata["schema_index"] = index
+        return response
 
-    responses = await asyncio.gather(*tasks)
+    tasks = [
+        asyncio.ensure_future(run_schema(index, output_schema))
+        for index, output_schema in enumerate(request.target_schemas)
+    ]
 
-    return responses
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def transfer_style_stream_events(
+    request: StyleTransferRequest,
+    llm_provider: str = "google_genai",
+    model: str | None = None,
+    temperature: float = 0.7,
+    style_cache: StyleProfileCache | None = None,
+    prompt_caching: bool = False,
+    long_input: LongInputConfig | None = DEFAULT_LONG_INPUT,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> AsyncIterator[StyleTransferStreamEvent]:
+    """Stream partial structured output for every schema of a request.
+
+    Arguments are as in :func:`transfer_style`, restricted to the request,
+    model settings, ``style_cache``, ``prompt_caching``, ``long_input``,
+    ``style_inference`` and ``persona_profiles``: streamed output is not
+    hedged, cached, combined, budgeted or bound to a deadline. Events from
+    all schemas are interleaved as they arrive and tagged with
+    ``schema_index``; each schema ends with a ``final`` event carrying its
+    validated response. See :func:`stream_target_schema` for the event
+    types.
+    """
+
+    llm = get_llm(llm_provider, model=model, temperature=temperature)
+
+    reference_style, target_content = await prepare_request(
+        request,
+        llm_provider,
+        model,
+        style_cache,
+        long_input,
+        style_inference,
+        persona_profiles,
+    )
+
+    queue = asyncio.Queue()
+
+    async def run_schema(index, output_schema):
+        try:
+            async for event in stream_target_schema(
+                llm,
+                output_schema,
+                reference_style,
+                request.intent,
+                request.focus,
+                target_content,
+                llm_provider,
+                prompt_caching=prompt_caching,
+            ):
+                event.schema_index = index
+                if event.response:
+                    event.response.metadata["schema_index"] = index
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(None)
+
+    tasks = [
+        asyncio.ensure_future(run_schema(index, output_schema))
+        for index, output_schema in enumerate(request.target_schemas)
+    ]
+
+    try:
+        remaining = len(tasks)
+        while remaining:
+            event = await queue.get()
+            if event is None:
+                remaining -= 1
+            elif isinstance(event, Exception):
+                raise event
+            else:
+                yield event
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def transfer_style_batch(
+    requests: list[StyleTransferRequest],
+    llm_provider: str = "google_genai",
+    model: str | None = None,
+    temperature: float = 0.7,
+    max_concurrency: int = 8,
+    per_provider_limits: dict[str, int] | None = None,
+    style_cache: StyleProfileCache | None = None,
+    scheduler: ConcurrencyScheduler | None = None,
+    response_cache: ResponseCache | None = None,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+    long_input: LongInputConfig | None = DEFAULT_LONG_INPUT,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> list[list[StyleTransferResponse]]:
+    """Run style transfer for many requests on a shared concurrency pool.
+
+    Every request's style inference and every (request, schema) generation
+    is scheduled as its own unit of work, so a slow request never holds up
+    the rest of the batch. One LLM client is shared by all units.
+
+    Failures are isolated per unit: a schema whose generation raises (e.g. a
+    provider error or invalid output) is returned as a ``status="error"``
+    response with the error in ``metadata["error"]``, and a request whose
+    style inference raises gets such a response for every schema. The other
+    results of the batch are returned as usual.
+
+    Args:
+        requests: Style transfer requests to process
+        llm_provider: Model provider (openai, anthropic, google_genai).
+            Defaults to "google_genai".
+        model: Model name. If None, will use provider defaults.
+        temperature: Model temperature (0.0 to 1.0). Defaults to 0.7.
+        max_concurrency: Maximum number of units of work in flight at once.
+        per_provider_limits: Optional per-provider caps on in-flight units.
+        style_cache: Optional persistent cache of inferred style profiles.
+        scheduler: Scheduler to share with other batches. When given,
+            ``max_concurrency`` and ``per_provider_limits`` are ignored.
+        response_cache: Optional cache of generated output for deterministic
+            settings (see :func:`transfer_style`).
+        max_prompt_tokens: Optional token budget of each generation prompt
+            (see :func:`transfer_style`).
+        prompt_caching: Use the provider cache friendly prompt layout (see
+            :func:`transfer_style`).
+        long_input: When and how long target documents are condensed (see
+            :func:`transfer_style`).
+        style_inference: How reference styles are inferred (see
+            :func:`transfer_style`).
+        persona_profiles: Optional store of incrementally updated persona
+            profiles (see :func:`transfer_style`).
+
+    Returns:
+        One list of responses per request, in request order, with one response
+        per target schema
+    """
+
+    if scheduler is None:
+        scheduler = ConcurrencyScheduler(max_concurrency, per_provider_limits)
+
+    llm = get_llm(llm_provider, model=model, temperature=temperature)
+
+    async def run_schema(request, output_schema, reference_style, target_content):
+        try:
+            async with scheduler.slot(llm_provider):
+                return await process_target_schema(
+                    llm,
+                    output_schema,
+                    reference_style,
+                    request.intent,
+                    request.focus,
+                    target_content,
+                    llm_provider,
+                    response_cache=response_cache,
+                    max_prompt_tokens=max_prompt_tokens,
+                    prompt_caching=prompt_caching,
+                )
+        except Exception as e:
+            return build_error_response(
+                output_schema,
+                reference_style,
+                request.intent,
+                request.focus,
+                target_content,
+                e,
+            )
+
+    async def run_request(request):
+        try:
+            async with scheduler.slot(llm_provider):
+                reference_style, target_content = await prepare_request(
+                    request,
+                    llm_provider,
+                    model,
+                    style_cache,
+                    long_input,
+                    style_inference,
+                    persona_profiles,
+                )
+        except Exception as e:
+            return [
+                build_error_response(
+                    output_schema,
+                    request.reference_style,
+                    request.intent,
+                    request.focus,
+                    request.target_content,
+                    e,
+                )
+                for output_schema in request.target_schemas
+            ]
+
+        return list(
+            await asyncio.gather(
+                *(
+                    run_schema(request, output_schema, reference_style, target_content)
+                    for output_schema in request.target_schemas
+                )
+            )
+        )
+
+    return list(await asyncio.gather(*(run_request(r) for r in requests)))
+
+
+async def prepare_request(
+    request: StyleTransferRequest,
+    llm_provider: str,
+    model: str | None,
+    style_cache: StyleProfileCache | None,
+    long_input: LongInputConfig | None,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> tuple[list, list]:
+    """Infer a request's reference styles and condense its long target content.
+
+    Both run concurrently. Returns the enhanced reference styles and the
+    target documents to generate from.
+    """
+
+    async def target_content():
+        if long_input is None:
+            return request.target_content
+        return await condense_target_content(
+            request.target_content, llm_provider, model, long_input
+        )
+
+    reference_style, target_docs = await asyncio.gather(
+        aenhance_reference_styles(
+            request.reference_style,
+            llm_provider,
+            cache=style_cache,
+            style_inference=style_inference,
+            persona_profiles=persona_profiles,
+        ),
+        target_content(),
+    )
+    return reference_style, target_docs
 
 
 async def process_target_schema(
-    llm, output_schema, reference_style, intent, focus, target_content, llm_provider
+    llm,
+    output_schema,
+    reference_style,
+    intent,
+    focus,
+    target_content,
+    llm_provider,
+    hedge_policy: HedgePolicy | None = None,
+    response_cache: ResponseCache | None = None,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
 ) -> StyleTransferResponse:
-    """Process a single schema asynchronously."""
+    """Process a single schema asynchronously.
+
+    ``reference_style`` is expected to be already enhanced with
+    :func:`aenhance_reference_styles`; no style inference happens here. With a
+    ``hedge_policy``, slow or failing calls are duplicated to the policy's
+    secondary provider and ``metadata["hedge"]`` reports what happened. With a
+    ``response_cache`` and a deterministic ``llm`` (temperature 0 or a fixed
+    seed), the output is served from and stored in the cache and
+    ``metadata["response_cache"]`` is ``"hit"`` or ``"miss"``.
+    """
 
     schema_class = output_schema.output_type.get_schema()
 
-    structured_llm = llm.with_structured_output(schema_class, method="function_calling")
+    messages = build_messages(
+        output_schema,
+        reference_style,
+        intent,
+        focus,
+        target_content,
+        llm_provider,
+        max_prompt_tokens,
+        prompt_caching,
+    )
 
-    prompt = build_generation_prompt(
-        output_schema, reference_style, intent, focus, target_content, llm_provider
+    processed_content, generation_info = await _generate_structured(
+        llm,
+        schema_class,
+        messages,
+        llm_provider,
+        hedge_policy,
+        response_cache,
+        max_tokens=get_max_tokens(output_schema),
     )
 
-    system_message = (
-        "You are an expert content creator specializing in style transfer. "
-        "Return the content in the exact format specified by the output schema."
+    response = build_response(
+        processed_content, output_schema, reference_style, intent, focus, target_content
     )
+    response.metadata.update(generation_info)
+    return response
 
-    messages = [SystemMessage(content=system_message), HumanMessage(content=prompt)]
 
+async def process_combined_schemas(
+    llm,
+    output_schemas,
+    reference_style,
+    intent,
+    focus,
+    target_content,
+    llm_provider,
+    hedge_policy: HedgePolicy | None = None,
+    response_cache: ResponseCache | None = None,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+) -> list[StyleTransferResponse]:
+    """Generate several schemas with a single structured output call.
+
+    The reference style and target content are sent once, together with the
+    guidance of every schema, and the model fills a composite output model
+    (see :func:`~agent_style_transfer.schemas.build_combined_schema`). The
+    result is split back into one response per schema, in order, each with
+    ``metadata["combined_schemas"]`` set to the number of schemas generated
+    together. ``hedge_policy`` and ``response_cache`` apply to the combined
+    call as in :func:`process_target_schema`.
+    """
+
+    schema_class = build_combined_schema(output_schemas)
+
+    messages = build_combined_messages(
+        output_schemas,
+        reference_style,
+        intent,
+        focus,
+        target_content,
+        llm_provider,
+        max_prompt_tokens,
+        prompt_caching,
+    )
+
+    combined_content, generation_info = await _generate_structured(
+        llm,
+        schema_class,
+        messages,
+        llm_provider,
+        hedge_policy,
+        response_cache,
+        max_tokens=sum(get_max_tokens(s) for s in output_schemas),
+    )
+
+    responses = []
+    for i, output_schema in enumerate(output_schemas, 1):
+        response = build_response(
+            getattr(combined_content, combined_field_name(i, output_schema)),
+            output_schema,
+            reference_style,
+            intent,
+            focus,
+            target_content,
+        )
+        response.metadata.update(generation_info)
+        response.metadata["combined_schemas"] = len(output_schemas)
+        responses.append(response)
+
+    return responses
+
+
+async def _generate_structured(
+    llm,
+    schema_class: type[BaseModel],
+    messages: list[BaseMessage],
+    llm_provider: str,
+    hedge_policy: HedgePolicy | None = None,
+    response_cache: ResponseCache | None = None,
+    max_tokens: int | None = None,
+) -> tuple[BaseModel, dict]:
+    """Generate one ``schema_class`` object from ``messages``.
+
+    The schema is bound as the forced tool of ``llm`` and the output is
+    capped at ``max_tokens``. Models without native async support run on
+    the bounded pool of :mod:`agent_style_transfer.sync_adapter`. Returns
+    the object and the response metadata describing how it was produced:
+    the estimated ``prompt_tokens``, the provider reported ``usage``
+    (including prompt cache reads), ``max_tokens``, ``stop_reason`` and
+    ``truncated`` (the output hit the limit), plus ``hedge`` and
+    ``response_cache`` entries when applicable.
+
+    When the cap cuts the tool call off before it is complete, the call is
+    retried once with twice the cap (``metadata["truncation_retry"]``);
+    only a second incomplete answer raises.
+    """
+
+    cache_key = None
+    if response_cache is not None and is_deterministic(llm):
+        settings = getattr(llm, "_identifying_params", {}) or {}
+        cache_key = response_cache_key(
+            messages,
+            schema_class,
+            llm_provider,
+            settings.get("model") or settings.get("model_name"),
+            settings.get("temperature"),
+            settings=settings,
+            max_tokens=max_tokens,
+        )
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return schema_class.model_validate_json(cached), {
+                "prompt_tokens": estimate_input_tokens(messages),
+                "max_tokens": max_tokens,
+                "response_cache": "hit",
+            }
+
+    async def generate(cap):
+        tool_llm = _bind_schema(llm, schema_class, llm_provider, cap)
+        if hedge_policy is None:
+            return await ainvoke_model(tool_llm, messages), None
+
+        secondary_llm = _bind_schema(
+            hedge_policy.secondary_llm(),
+            schema_class,
+            hedge_policy.secondary_provider,
+            cap,
+        )
+        return await hedge_policy.run(
+            lambda: ainvoke_model(tool_llm, messages),
+            lambda: ainvoke_model(secondary_llm, messages),
+        )
+
+    async def generate_once(cap):
+        # Identical concurrent generations (same model, schema and prompt)
+        # share one call
+        key = llm_call_key(
+            "generate",
+            llm_provider,
+            None,
+            messages,
+            llm=getattr(llm, "_identifying_params", {}),
+            schema=schema_class.__name__,
+            max_tokens=cap,
+            hedged=hedge_policy is not None,
+        )
+        message, hedge_info = await acoalesce(key, lambda: generate(cap))
+        stop_reason = get_stop_reason(message)
+        truncated = stop_reason in TRUNCATION_STOP_REASONS
+        return message, hedge_info, stop_reason, truncated
+
+    cap = max_tokens
+    message, hedge_info, stop_reason, truncated = await generate_once(cap)
+    retried = False
     try:
-        processed_content = await structured_llm.ainvoke(messages)
-    except AttributeError:
-        processed_content = structured_llm.invoke(messages)
+        processed_content = _parse_tool_call(message, schema_class, truncated)
+    except (OutputParserException, ValidationError):
+        if not truncated or cap is None:
+            raise
+        cap *= 2
+        retried = True
+        message, hedge_info, stop_reason, truncated = await generate_once(cap)
+        processed_content = _parse_tool_call(message, schema_class, truncated)
+
+    info = {
+        "prompt_tokens": estimate_input_tokens(messages),
+        "max_tokens": cap,
+        "stop_reason": stop_reason,
+    }
+    if retried:
+        info["truncation_retry"] = True
+    usage = get_token_usage(message)
+    if usage:
+        info["usage"] = usage
+    if truncated:
+        info["truncated"] = True
+    if hedge_info:
+        info["hedge"] = hedge_info
+    if cache_key is not None:
+        # Truncated output, or output from a hedge's secondary model, doesn't
+        # belong to this key
+        if not truncated and (not hedge_info or hedge_info["winner"] == "primary"):
+            response_cache.set(cache_key, processed_content.model_dump_json())
+        info["response_cache"] = "miss"
+    return processed_content, info
+
+
+def _bind_schema(llm, schema_class, llm_provider, max_tokens):
+    """Force ``llm`` to answer with a ``schema_class`` tool call."""
+    return llm.bind_tools(
+        [schema_class],
+        tool_choice=schema_class.__name__,
+        **max_tokens_kwargs(llm_provider, max_tokens),
+    )
+
+
+def _parse_tool_call(message, schema_class, truncated: bool = False) -> BaseModel:
+    """Validate the ``schema_class`` tool call of a model ``message``."""
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        if tool_call["name"] == schema_class.__name__:
+            return schema_class.model_validate(tool_call["args"])
+
+    reason = " before the output hit max_tokens" if truncated else ""
+    raise OutputParserException(
+        f"Model did not return a complete {schema_class.__name__}{reason}"
+    )
+
+
+async def stream_target_schema(
+    llm,
+    output_schema,
+    reference_style,
+    intent,
+    focus,
+    target_content,
+    llm_provider,
+    prompt_caching: bool = False,
+) -> AsyncIterator[StyleTransferStreamEvent]:
+    """Stream a single schema's structured output as it is generated.
+
+    The model's streaming tool-call argument deltas are fed to an incremental
+    JSON parser. Yields ``delta`` events with new text of top-level string
+    fields (e.g. ``BlogPost.markdown``), ``item`` events for each completed
+    entry of a top-level list (e.g. each ``TweetSingle`` of a thread), and a
+    final ``final`` event carrying the validated response.
+    """
+
+    schema_class = output_schema.output_type.get_schema()
+
+    max_tokens = get_max_tokens(output_schema)
+
+    tool_llm = _bind_schema(llm, schema_class, llm_provider, max_tokens)
+
+    messages = build_messages(
+        output_schema,
+        reference_style,
+        intent,
+        focus,
+        target_content,
+        llm_provider,
+        prompt_caching=prompt_caching,
+    )
+
+    parser = IncrementalJSONParser()
+    stop_reason = None
+    usage = None
+
+    async for chunk in tool_llm.astream(messages):
+        stop_reason = get_stop_reason(chunk) or stop_reason
+        usage = add_usage(usage, getattr(chunk, "usage_metadata", None))
+        for tool_chunk in getattr(chunk, "tool_call_chunks", None) or []:
+            for kind, path, value in parser.feed(tool_chunk.get("args") or ""):
+                if kind == "delta" and len(path) == 1:
+                    yield StyleTransferStreamEvent(
+                        event="delta", field=path[0], text=value
+                    )
+                elif kind == "value" and len(path) == 2:
+                    yield _item_event(schema_class, path[0], value)
+
+    processed_content = schema_class.model_validate(parser.root or {})
+
+    response = build_response(
+        processed_content, output_schema, reference_style, intent, focus, target_content
+    )
+    response.metadata["prompt_tokens"] = estimate_input_tokens(messages)
+    response.metadata["max_tokens"] = max_tokens
+    response.metadata["stop_reason"] = stop_reason
+    if stop_reason in TRUNCATION_STOP_REASONS:
+        response.metadata["truncated"] = True
+    if usage:
+        response.metadata["usage"] = get_token_usage(usage)
+
+    yield StyleTransferStreamEvent(event="final", response=response)
+
+
+def _item_event(schema_class, field, item) -> StyleTransferStreamEvent:
+    """Build an ``item`` event, validating the item against the field's type."""
+    item_type = next(iter(get_args(schema_class.model_fields[field].annotation)), None)
+    if isinstance(item_type, type) and issubclass(item_type, BaseModel):
+        item = item_type.model_validate(item)
+    return StyleTransferStreamEvent(event="item", field=field, item=item)
+
+
+def build_messages(
+    output_schema,
+    reference_style,
+    intent,
+    focus,
+    target_content,
+    llm_provider,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+) -> list[BaseMessage]:
+    """Build the chat messages for generating one schema."""
+
+    if prompt_caching:
+        return _cacheable_messages(
+            [output_schema],
+            reference_style,
+            intent,
+            focus,
+            target_content,
+            llm_provider,
+            max_prompt_tokens,
+        )
+
+    prompt = build_generation_prompt(
+        output_schema,
+        reference_style,
+        intent,
+        focus,
+        target_content,
+        llm_provider,
+        infer_styles=False,
+        max_prompt_tokens=_prompt_budget(max_prompt_tokens),
+    )
 
-    processed_content = processed_content.model_dump_json(indent=2)
+    return [SystemMessage(content=SYSTEM_MESSAGE), HumanMessage(content=prompt)]
+
+
+def build_combined_messages(
+    output_schemas,
+    reference_style,
+    intent,
+    focus,
+    target_content,
+    llm_provider,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+) -> list[BaseMessage]:
+    """Build the chat messages for generating several schemas in one call."""
+
+    if prompt_caching:
+        return _cacheable_messages(
+            output_schemas,
+            reference_style,
+            intent,
+            focus,
+            target_content,
+            llm_provider,
+            max_prompt_tokens,
+        )
+
+    prompt = build_combined_generation_prompt(
+        output_schemas,
+        reference_style,
+        intent,
+        focus,
+        target_content,
+        llm_provider,
+        infer_styles=False,
+        max_prompt_tokens=_prompt_budget(max_prompt_tokens),
+    )
+
+    return [SystemMessage(content=SYSTEM_MESSAGE), HumanMessage(content=prompt)]
+
+
+def _cacheable_messages(
+    output_schemas,
+    reference_style,
+    intent,
+    focus,
+    target_content,
+    llm_provider,
+    max_prompt_tokens: int | None = None,
+) -> list[BaseMessage]:
+    """Build messages whose stable prompt prefix can be cached by the provider.
+
+    For providers with explicit breakpoints the prefix is a separate content
+    block marked with ``cache_control``; elsewhere the prefix and suffix are
+    sent as one text and cached automatically.
+    """
+
+    prefix, suffix = build_cacheable_generation_prompt(
+        output_schemas,
+        reference_style,
+        intent,
+        focus,
+        target_content,
+        _prompt_budget(max_prompt_tokens),
+    )
+
+    if llm_provider in CACHE_CONTROL_PROVIDERS:
+        content = [
+            {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": suffix},
+        ]
+    else:
+        content = prefix + suffix
+
+    return [SystemMessage(content=SYSTEM_MESSAGE), HumanMessage(content=content)]
+
+
+def _prompt_budget(max_prompt_tokens: int | None) -> int | None:
+    """Token budget left for the user prompt once the system message is sent."""
+    if max_prompt_tokens is None:
+        return None
+    return max_prompt_tokens - estimate_tokens(SYSTEM_MESSAGE)
+
+
+def build_response(
+    processed_content, output_schema, reference_style, intent, focus, target_content
+) -> StyleTransferResponse:
+    """Wrap a generated schema object in a style transfer response.
+
+    The object is kept as ``output``; its JSON ``processed_content`` is only
+    rendered when read.
+    """
 
     applied_style = reference_style[0].name if reference_style else "Unknown"
 
     return StyleTransferResponse(
-        processed_content=processed_content,
+        output=processed_content,
         applied_style=applied_style,
         output_schema=output_schema,
-        metadata={
-            "reference_styles_count": len(reference_style),
-            "target_documents_count": len(target_content),
-            "focus": focus,
-            "intent": intent,
-            "schema_name": output_schema.name,
-        },
+        metadata=_response_metadata(
+            output_schema, reference_style, intent, focus, target_content
+        ),
     )
+
+
+def build_timeout_response(
+    output_schema, reference_style, intent, focus, target_content, stage: str
+) -> StyleTransferResponse:
+    """Response for a schema whose ``stage`` ran out of the request deadline."""
+
+    applied_style = reference_style[0].name if reference_style else "Unknown"
+
+    metadata = _response_metadata(
+        output_schema, reference_style, intent, focus, target_content
+    )
+    metadata["timeout_stage"] = stage
+
+    return StyleTransferResponse(
+        processed_content="",
+        applied_style=applied_style,
+        output_schema=output_schema,
+        metadata=metadata,
+        status="timeout",
+    )
+
+
+def build_error_response(
+    output_schema, reference_style, intent, focus, target_content, error: Exception
+) -> StyleTransferResponse:
+    """Response for a schema whose processing raised ``error``."""
+
+    applied_style = reference_style[0].name if reference_style else "Unknown"
+
+    metadata = _response_metadata(
+        output_schema, reference_style, intent, focus, target_content
+    )
+    metadata["error"] = f"{type(error).__name__}: {error}"
+
+    return StyleTransferResponse(
+        processed_content="",
+        applied_style=applied_style,
+        output_schema=output_schema,
+        metadata=metadata,
+        status="error",
+    )
+
+
+def _response_metadata(
+    output_schema, reference_style, intent, focus, target_content
+) -> dict:
+    return {
+        "reference_styles_count": len(reference_style),
+        "target_documents_count": len(target_content),
+        "focus": focus,
+        "intent": intent,
+        "schema_name": output_schema.name,
+    }
@@ -0,0 +1,686 @@
+"""Offline bulk style transfer through provider batch APIs.
+
+Batch APIs trade latency (results within hours) for lower prices and higher
+throughput, which suits non-interactive backfills. A job is run in three
+steps:
+
+1. :func:`submit_batch_job` infers the reference styles, builds one
+   structured output request per (request, target schema) in the backend's
+   payload format and submits them.
+2. :func:`wait_for_batch_job` polls the backend until the job has ended.
+3. :func:`collect_batch_results` maps the provider results back to
+   :class:`~agent_style_transfer.schemas.StyleTransferResponse` objects.
+
+:func:`run_batch_job` does all three. Backends exist for the OpenAI Batch API
+(:class:`OpenAIBatchBackend`), Anthropic Message Batches
+(:class:`AnthropicBatchBackend`) and a local, file-based stand-in
+(:class:`LocalBatchBackend`) that runs the payloads through a chat model and
+writes results in the provider's format.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agent_style_transfer.agent import build_messages, build_response, prepare_request
+from agent_style_transfer.llm_provider_setup import (
+    DEFAULT_MODELS,
+    TRUNCATION_STOP_REASONS,
+    get_stop_reason,
+    get_token_usage,
+    load_env,
+    max_tokens_kwargs,
+)
+from agent_style_transfer.long_input import DEFAULT_LONG_INPUT, LongInputConfig
+from agent_style_transfer.prompt_builder import StyleInference, get_max_tokens
+from agent_style_transfer.schemas import (
+    BatchJob,
+    StyleTransferRequest,
+    StyleTransferResponse,
+)
+from agent_style_transfer.style_cache import StyleProfileCache
+
+if TYPE_CHECKING:
+    from agent_style_transfer.persona_profile import PersonaProfileStore
+
+# Providers with a batch API payload format
+BATCH_PROVIDERS = frozenset({"openai", "anthropic"})
+
+# Job statuses after which the job makes no more progress
+TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+# Endpoint the OpenAI batch requests are sent to
+OPENAI_BATCH_ENDPOINT = "/v1/chat/completions"
+
+
+class BatchBackend(ABC):
+    """Base class of batch backends for one provider's payload format.
+
+    Subclasses implement :meth:`submit`, :meth:`status` and :meth:`results`;
+    :meth:`status` returns one of the normalized job statuses (see
+    :class:`~agent_style_transfer.schemas.BatchJob`).
+    """
+
+    provider: str
+
+    @abstractmethod
+    def submit(self, payload: list[dict]) -> str:
+        """Submit batch request lines and return the job ID."""
+
+    @abstractmethod
+    def status(self, job_id: str) -> str:
+        """Return the normalized status of a job."""
+
+    @abstractmethod
+    def results(self, job_id: str) -> list[dict]:
+        """Return the provider result lines of an ended job."""
+
+
+class OpenAIBatchBackend(BatchBackend):
+    """OpenAI Batch API backend.
+
+    Args:
+        client: ``openai.OpenAI`` client. Created from the environment if None.
+        completion_window: Time the provider has to finish the batch.
+    """
+
+    provider = "openai"
+
+    _STATUSES = {
+        "completed": "completed",
+        "failed": "failed",
+        "expired": "expired",
+        "cancelled": "cancelled",
+    }
+
+    def __init__(self, client=None, completion_window: str = "24h") -> None:
+        if client is None:
+            from openai import OpenAI
+
+            load_env()
+            client = OpenAI()
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, payload: list[dict]) -> str:
+        data = "".join(json.dumps(line) + "\n" for line in payload).encode("utf-8")
+        input_file = self.client.files.create(
+            file=("style-transfer-batch.jsonl", data), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=OPENAI_BATCH_ENDPOINT,
+            completion_window=self.completion_window,
+        )
+        return batch.id
+
+    def status(self, job_id: str) -> str:
+        batch = self.client.batches.retrieve(job_id)
+        return self._STATUSES.get(batch.status, "in_progress")
+
+    def results(self, job_id: str) -> list[dict]:
+        batch = self.client.batches.retrieve(job_id)
+        lines = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                text = self.client.files.content(file_id).text
+                lines.extend(json.loads(line) for line in text.splitlines() if line)
+        return lines
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Anthropic Message Batches backend.
+
+    Args:
+        client: ``anthropic.Anthropic`` client. Created from the environment
+            if None.
+    """
+
+    provider = "anthropic"
+
+    def __init__(self, client=None) -> None:
+        if client is None:
+            from anthropic import Anthropic
+
+            load_env()
+            client = Anthropic()
+        self.client = client
+
+    def submit(self, payload: list[dict]) -> str:
+        return self.client.messages.batches.create(requests=payload).id
+
+    def status(self, job_id: str) -> str:
+        batch = self.client.messages.batches.retrieve(job_id)
+        return "completed" if batch.processing_status == "ended" else "in_progress"
+
+    def results(self, job_id: str) -> list[dict]:
+        return [
+            result.model_dump(mode="json")
+            for result in self.client.messages.batches.results(job_id)
+        ]
+
+
+class LocalBatchBackend(BatchBackend):
+    """File-based stand-in for a provider batch API.
+
+    Submitted payloads are written to ``<directory>/<job_id>.input.jsonl``.
+    The first status poll runs every line through ``llm`` and writes results
+    in ``provider``'s result format to ``<job_id>.output.jsonl``, so jobs can
+    be exercised end to end without network access.
+
+    Args:
+        directory: Directory holding the job files; created as needed.
+        llm: Chat model that answers the batch requests.
+        provider: Provider whose payload and result format is emulated.
+    """
+
+    def __init__(self, directory: str | Path, llm, provider: str = "openai") -> None:
+        if provider not in BATCH_PROVIDERS:
+            raise ValueError(f"Unsupported batch provider: {provider}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.llm = llm
+        self.provider = provider
+
+    def submit(self, payload: list[dict]) -> str:
+        job_id = f"local-{uuid.uuid4().hex}"
+        _write_jsonl(self._path(job_id, "input"), payload)
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        if not self._path(job_id, "input").exists():
+            return "failed"
+        if not self._path(job_id, "output").exists():
+            lines = _read_jsonl(self._path(job_id, "input"))
+            _write_jsonl(
+                self._path(job_id, "output"), [self._run(line) for line in lines]
+            )
+        return "completed"
+
+    def results(self, job_id: str) -> list[dict]:
+        return _read_jsonl(self._path(job_id, "output"))
+
+    def _path(self, job_id: str, kind: str) -> Path:
+        return self.directory / f"{job_id}.{kind}.jsonl"
+
+    def _run(self, line: dict) -> dict:
+        """Answer one request line with a result line in the provider format."""
+        if self.provider == "anthropic":
+            params = line["params"]
+            messages = [{"role": "system", "content": params["system"]}]
+            messages += params["messages"]
+            tools = params["tools"]
+            tool_name = tools[0]["name"]
+            max_tokens = params.get("max_tokens")
+        else:
+            body = line["body"]
+            messages = body["messages"]
+            tools = body["tools"]
+            tool_name = tools[0]["function"]["name"]
+            max_tokens = body.get("max_tokens")
+
+        try:
+            tool_llm = self.llm.bind_tools(
+                tools,
+                tool_choice=tool_name,
+                **max_tokens_kwargs(self.provider, max_tokens),
+            )
+            message = tool_llm.invoke(messages)
+        except Exception as e:
+            return _error_line(self.provider, line["custom_id"], str(e))
+        return _result_line(self.provider, line["custom_id"], message)
+
+
+async def build_batch_payload(
+    requests: list[StyleTransferRequest],
+    llm_provider: str,
+    model: str | None = None,
+    temperature: float = 0.7,
+    style_cache: StyleProfileCache | None = None,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+    long_input: LongInputConfig | None = DEFAULT_LONG_INPUT,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> list[dict]:
+    """Build one batch request line per (request, target schema).
+
+    Reference styles are inferred (and long target content condensed) with
+    regular calls first, so the batch only holds the generation requests.
+    Lines are identified by :func:`batch_custom_id`.
+
+    Args:
+        requests: Style transfer requests to run as a batch
+        llm_provider: Provider whose payload format to build (openai,
+            anthropic)
+        model: Model name. If None, will use provider defaults.
+        temperature: Model temperature (0.0 to 1.0). Defaults to 0.7.
+        style_cache: Optional persistent cache of inferred style profiles.
+        max_prompt_tokens: Optional token budget of each generation prompt.
+        prompt_caching: Use the provider cache friendly prompt layout.
+        long_input: When and how long target documents are condensed.
+        style_inference: How reference styles are inferred (see
+            :func:`~agent_style_transfer.agent.transfer_style`).
+        persona_profiles: Optional store of incrementally updated persona
+            profiles (see :func:`~agent_style_transfer.agent.transfer_style`).
+
+    Returns:
+        Request lines in the provider's batch input format
+    """
+    if llm_provider not in BATCH_PROVIDERS:
+        raise ValueError(f"Unsupported batch provider: {llm_provider}")
+    model = model or DEFAULT_MODELS[llm_provider]
+
+    prepared = await asyncio.gather(
+        *(
+            prepare_request(
+                request,
+                llm_provider,
+                model,
+                style_cache,
+                long_input,
+                style_inference,
+                persona_profiles,
+            )
+            for request in requests
+        )
+    )
+
+    payload = []
+    for i, (request, (reference_style, target_content)) in enumerate(
+        zip(requests, prepared)
+    ):
+        for j, output_schema in enumerate(request.target_schemas):
+            messages = build_messages(
+                output_schema,
+                reference_style,
+                request.intent,
+                request.focus,
+                target_content,
+                llm_provider,
+                max_prompt_tokens,
+                prompt_caching,
+            )
+            build_line = (
+                _anthropic_line if llm_provider == "anthropic" else _openai_line
+            )
+            payload.append(
+                build_line(
+                    batch_custom_id(i, j),
+                    model,
+                    temperature,
+                    messages,
+                    convert_to_openai_tool(output_schema.output_type.get_schema()),
+                    get_max_tokens(output_schema),
+                )
+            )
+    return payload
+
+
+async def submit_batch_job(
+    requests: list[StyleTransferRequest],
+    backend: BatchBackend,
+    model: str | None = None,
+    temperature: float = 0.7,
+    style_cache: StyleProfileCache | None = None,
+    max_prompt_tokens: int | None = None,
+    prompt_caching: bool = False,
+    long_input: LongInputConfig | None = DEFAULT_LONG_INPUT,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> BatchJob:
+    """Submit style transfer requests as one batch job of ``backend``.
+
+    Takes the same arguments as :func:`build_batch_payload`, with the
+    provider given by the backend.
+    """
+    model = model or DEFAULT_MODELS[backend.provider]
+    payload = await build_batch_payload(
+        requests,
+        backend.provider,
+        model,
+        temperature,
+        style_cache=style_cache,
+        max_prompt_tokens=max_prompt_tokens,
+        prompt_caching=prompt_caching,
+        long_input=long_input,
+        style_inference=style_inference,
+        persona_profiles=persona_profiles,
+    )
+    job_id = await asyncio.to_thread(backend.submit, payload)
+    return BatchJob(
+        job_id=job_id, provider=backend.provider, model=model, requests=requests
+    )
+
+
+async def wait_for_batch_job(
+    job: BatchJob,
+    backend: BatchBackend,
+    poll_interval: float = 60.0,
+    timeout: float | None = None,
+) -> BatchJob:
+    """Poll ``backend`` until ``job`` has ended and update its status.
+
+    Raises:
+        TimeoutError: If the job is still running after ``timeout`` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    while True:
+        job.status = await asyncio.to_thread(backend.status, job.job_id)
+        if job.status in TERMINAL_STATUSES:
+            return job
+        if deadline is not None and loop.time() + poll_interval > deadline:
+            raise TimeoutError(f"Batch job {job.job_id} is still {job.status}")
+        await asyncio.sleep(poll_interval)
+
+
+def collect_batch_results(
+    job: BatchJob, backend: BatchBackend
+) -> list[list[StyleTransferResponse | None]]:
+    """Map the results of an ended job back to style transfer responses.
+
+    Returns one list per request with one entry per target schema, in order.
+    Items that failed (provider error, expiry, invalid or missing output) are
+    None and their error message is recorded in ``job.errors``.
+    """
+    responses: list[list[StyleTransferResponse | None]] = [
+        [None] * len(request.target_schemas) for request in job.requests
+    ]
+    seen = set()
+
+    for line in backend.results(job.job_id):
+        custom_id = line.get("custom_id")
+        try:
+            i, j = parse_batch_custom_id(custom_id)
+            request = job.requests[i]
+            output_schema = request.target_schemas[j]
+        except (IndexError, TypeError, ValueError):
+            continue
+        seen.add(custom_id)
+
+        args, stop_reason, usage, error = _parse_result(job.provider, line)
+        truncated = stop_reason in TRUNCATION_STOP_REASONS
+        if error is None:
+            try:
+                processed_content = output_schema.output_type.get_schema()(**args)
+            except Exception as e:
+                error = f"Invalid output{' (truncated)' if truncated else ''}: {e}"
+        if error is not None:
+            job.errors[custom_id] = error
+            continue
+
+        response = build_response(
+            processed_content,
+            output_schema,
+            request.reference_style,
+            request.intent,
+            request.focus,
+            request.target_content,
+        )
+        response.metadata.update(
+            {
+                "batch_job_id": job.job_id,
+                "max_tokens": get_max_tokens(output_schema),
+                "stop_reason": stop_reason,
+            }
+        )
+        if truncated:
+            response.metadata["truncated"] = True
+        if usage:
+            response.metadata["usage"] = usage
+        responses[i][j] = response
+
+    for i, request in enumerate(job.requests):
+        for j in range(len(request.target_schemas)):
+            custom_id = batch_custom_id(i, j)
+            if custom_id not in seen:
+                job.errors[custom_id] = f"No result (job {job.status})"
+    return responses
+
+
+async def run_batch_job(
+    requests: list[StyleTransferRequest],
+    backend: BatchBackend,
+    model: str | None = None,
+    temperature: float = 0.7,
+    poll_interval: float = 60.0,
+    timeout: float | None = None,
+    **kwargs: Any,
+) -> tuple[BatchJob, list[list[StyleTransferResponse | None]]]:
+    """Submit ``requests``, wait for the job and collect its responses.
+
+    ``kwargs`` are passed to :func:`submit_batch_job`.
+
+    Returns:
+        The ended job and the responses (see :func:`collect_batch_results`)
+    """
+    job = await submit_batch_job(requests, backend, model, temperature, **kwargs)
+    await wait_for_batch_job(job, backend, poll_interval, timeout)
+    return job, await asyncio.to_thread(collect_batch_results, job, backend)
+
+
+def batch_custom_id(request_index: int, schema_index: int) -> str:
+    """ID of the batch line for a request's target schema."""
+    return f"request-{request_index}-schema-{schema_index}"
+
+
+def parse_batch_custom_id(custom_id: str) -> tuple[int, int]:
+    """Return the request and schema index of a batch line ID."""
+    _, request_index, _, schema_index = custom_id.split("-")
+    return int(request_index), int(schema_index)
+
+
+def _openai_line(custom_id, model, temperature, messages, tool, max_tokens) -> dict:
+    system, human = messages
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": OPENAI_BATCH_ENDPOINT,
+        "body": {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "messages": [
+                {"role": "system", "content": system.content},
+                {"role": "user", "content": human.content},
+            ],
+            "tools": [tool],
+            "tool_choice": {
+                "type": "function",
+                "function": {"name": tool["function"]["name"]},
+            },
+        },
+    }
+
+
+def _anthropic_line(custom_id, model, temperature, messages, tool, max_tokens):
+    system, human = messages
+    function = tool["function"]
+    return {
+        "custom_id": custom_id,
+        "params": {
+            "model": model,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "system": system.content,
+            "messages": [{"role": "user", "content": human.content}],
+            "tools": [
+                {
+                    "name": function["name"],
+                    "description": function.get("description", ""),
+                    "input_schema": function["parameters"],
+                }
+            ],
+            "tool_choice": {"type": "tool", "name": function["name"]},
+        },
+    }
+
+
+def _parse_result(provider: str, line: dict):
+    """Return the tool arguments, stop reason, usage and error of a result."""
+    if provider == "anthropic":
+        result = line.get("result") or {}
+        if result.get("type") != "succeeded":
+            error = result.get("error") or {}
+            error = error.get("error", error)
+            return None, None, {}, error.get("message") or result.get("type")
+        message = result["message"]
+        stop_reason = message.get("stop_reason")
+        usage = message.get("usage") or {}
+        usage = {
+            "input_tokens": usage.get("input_tokens") or 0,
+            "output_tokens": usage.get("output_tokens") or 0,
+            "cached_input_tokens": usage.get("cache_read_input_tokens") or 0,
+            "cache_creation_input_tokens": (
+                usage.get("cache_creation_input_tokens") or 0
+            ),
+        }
+        args = next(
+            (b["input"] for b in message["content"] if b.get("type") == "tool_use"),
+            None,
+        )
+    else:
+        response = line.get("response") or {}
+        body = response.get("body") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            error = line.get("error") or body.get("error") or {}
+            return None, None, {}, error.get("message") or "Request failed"
+        choice = body["choices"][0]
+        stop_reason = choice.get("finish_reason")
+        usage = body.get("usage") or {}
+        usage = {
+            "input_tokens": usage.get("prompt_tokens") or 0,
+            "output_tokens": usage.get("completion_tokens") or 0,
+            "cached_input_tokens": (usage.get("prompt_tokens_details") or {}).get(
+                "cached_tokens", 0
+            ),
+            "cache_creation_input_tokens": 0,
+        }
+        tool_calls = choice["message"].get("tool_calls") or []
+        try:
+            args = (
+                json.loads(tool_calls[0]["function"]["arguments"])
+                if tool_calls
+                else None
+            )
+        except json.JSONDecodeError as e:
+            truncated = stop_reason in TRUNCATION_STOP_REASONS
+            return (
+                None,
+                stop_reason,
+                usage,
+                f"Invalid output{' (truncated)' if truncated else ''}: {e}",
+            )
+
+    if args is None:
+        truncated = stop_reason in TRUNCATION_STOP_REASONS
+        return (
+            None,
+            stop_reason,
+            usage,
+            ("Output truncated before the tool call" if truncated else "No tool call"),
+        )
+    return args, stop_reason, usage, None
+
+
+def _result_line(provider: str, custom_id: str, message) -> dict:
+    """Format a chat model answer as a provider batch result line."""
+    usage = get_token_usage(message)
+    stop_reason = get_stop_reason(message)
+    tool_calls = message.tool_calls
+    if provider == "anthropic":
+        return {
+            "custom_id": custom_id,
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "role": "assistant",
+                    "content": [
+                        {
+                            "type": "tool_use",
+                            "id": call["id"],
+                            "name": call["name"],
+                            "input": call["args"],
+                        }
+                        for call in tool_calls
+                    ],
+                    "stop_reason": stop_reason or "tool_use",
+                    "usage": {
+                        "input_tokens": usage.get("input_tokens", 0),
+                        "output_tokens": usage.get("output_tokens", 0),
+                        "cache_read_input_tokens": usage.get("cached_input_tokens", 0),
+                        "cache_creation_input_tokens": usage.get(
+                            "cache_creation_input_tokens", 0
+                        ),
+                    },
+                },
+            },
+        }
+    return {
+        "custom_id": custom_id,
+        "response": {
+            "status_code": 200,
+            "body": {
+                "choices": [
+                    {
+                        "message": {
+                            "role": "assistant",
+                            "content": None,
+                            "tool_calls": [
+                                {
+                                    "id": call["id"],
+                                    "type": "function",
+                                    "function": {
+                                        "name": call["name"],
+                                        "arguments": json.dumps(call["args"]),
+                                    },
+                                }
+                                for call in tool_calls
+                            ],
+                        },
+                        "finish_reason": stop_reason or "tool_calls",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": usage.get("input_tokens", 0),
+                    "completion_tokens": usage.get("output_tokens", 0),
+                    "prompt_tokens_details": {
+                        "cached_tokens": usage.get("cached_input_tokens", 0)
+                    },
+                },
+            },
+        },
+        "error": None,
+    }
+
+
+def _error_line(provider: str, custom_id: str, message: str) -> dict:
+    """Format a failed request as a provider batch result line."""
+    if provider == "anthropic":
+        return {
+            "custom_id": custom_id,
+            "result": {
+                "type": "errored",
+                "error": {"type": "error", "error": {"message": message}},
+            },
+        }
+    return {"custom_id": custom_id, "response": None, "error": {"message": message}}
+
+
+def _write_jsonl(path: Path, lines: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        for line in lines:
+            f.write(json.dumps(line) + "\n")
+
+
+def _read_jsonl(path: Path) -> list[dict]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,120 @@
+"""Per-request deadlines split across pipeline stages.
+
+A :class:`Deadline` is created once per request and passed through the
+pipeline. Each stage (style inference, generation, evaluation) gets a share
+of the time that is left when it starts, so time a fast stage does not use
+rolls over to the later ones. Work that outlives its stage budget is
+cancelled and reported with a ``"timeout"`` status instead of holding the
+caller.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+T = TypeVar("T")
+
+# Relative share of the remaining time given to each stage, in pipeline order
+DEFAULT_STAGE_SHARES = {"inference": 0.25, "generation": 0.6, "evaluation": 0.15}
+
+
+class DeadlineExceeded(TimeoutError):
+    """A pipeline stage did not finish within its share of the deadline."""
+
+    def __init__(self, stage: str, timeout: float) -> None:
+        super().__init__(f"Stage '{stage}' exceeded its {timeout:.2f}s budget")
+        self.stage = stage
+        self.timeout = timeout
+
+
+class Deadline:
+    """Time budget of one request, split across pipeline stages.
+
+    Args:
+        seconds: Total time available from now
+        stage_shares: Relative share of each stage, in pipeline order. Only
+            list the stages the request goes through (e.g. drop
+            ``"evaluation"`` when responses are not evaluated) so that no
+            time is held back for stages that never run.
+        clock: Monotonic clock returning seconds
+    """
+
+    def __init__(
+        self,
+        seconds: float,
+        stage_shares: dict[str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.seconds = seconds
+        self.stage_shares = dict(stage_shares or DEFAULT_STAGE_SHARES)
+        self._clock = clock
+        self._expires_at = clock() + seconds
+
+    def remaining(self) -> float:
+        """Seconds left until the deadline (never negative)."""
+        return max(0.0, self._expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def stage_timeout(self, stage: str) -> float:
+        """Seconds the stage starting now may take.
+
+        The stage gets its share of the remaining time relative to itself
+        and the stages after it; the last stage gets everything left. A
+        stage without a share is only bounded by the overall deadline.
+        """
+        stages = list(self.stage_shares)
+        if stage not in self.stage_shares:
+            return self.remaining()
+        later = stages[stages.index(stage) :]
+        total = sum(self.stage_shares[s] for s in later)
+        share = self.stage_shares[stage] / total if total else 1.0
+        return self.remaining() * share
+
+    async def run(self, stage: str, aw: Awaitable[T]) -> T:
+        """Await ``aw`` within the stage budget, cancelling it on timeout.
+
+        Raises:
+            DeadlineExceeded: If the stage budget runs out first.
+        """
+        timeout = self.stage_timeout(stage)
+        try:
+            return await asyncio.wait_for(aw, timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(stage, timeout) from None
+
+
+def as_deadline(deadline: Deadline | float | None) -> Deadline | None:
+    """Accept a :class:`Deadline` or a number of seconds from now."""
+    if deadline is None or isinstance(deadline, Deadline):
+        return deadline
+    return Deadline(deadline)
+
+
+async def gather_within(
+    deadline: Deadline | None, stage: str, aws: list[Awaitable[T]]
+) -> list[T | None]:
+    """Run ``aws`` concurrently within the budget of ``stage``.
+
+    Awaitables still running when the budget runs out are cancelled and
+    their result is None. Without a deadline this is ``asyncio.gather``.
+    Errors of finished awaitables propagate as with ``asyncio.gather``.
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        if deadline is None:
+            return list(await asyncio.gather(*tasks))
+        if tasks:
+            await asyncio.wait(tasks, timeout=deadline.stage_timeout(stage))
+        return [task.result() if task.done() else None for task in tasks]
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        # Let cancelled calls unwind (and release their connections) first
+        await asyncio.gather(*pending, return_exceptions=True)
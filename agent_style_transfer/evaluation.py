@@ -1,5 +1,8 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
 from typing import Any
 
+from agent_style_transfer.deadlines import Deadline, as_deadline
 from agent_style_transfer.evals import (
     evaluate_content_preservation,
     evaluate_platform_appropriateness,
@@ -7,18 +10,26 @@ from agent_style_transfer.evals import (
     evaluate_style_fidelity,
 )
 from agent_style_transfer.schemas import StyleTransferRequest, StyleTransferResponse
+from agent_style_transfer.utils.evaluation import format_result
 
 # Type aliases for cleaner annotations
 EvaluationResult = dict[str, Any]
 EvaluationResults = list[EvaluationResult]
 BatchEvaluationResults = list[EvaluationResults]
 
+# Maximum number of evaluator calls running at once under a deadline
+MAX_EVALUATION_WORKERS = 8
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
 
 def evaluate(
     request: StyleTransferRequest,
     responses: StyleTransferResponse | list[StyleTransferResponse],
     provider: str = "openai",
     model: str = "gpt-4",
+    deadline: Deadline | float | None = None,
 ) -> EvaluationResults | BatchEvaluationResults:
     """Evaluate style transfer response(s).
     Args:
@@ -26,17 +37,29 @@ def evaluate(
         responses: Single response or list of responses to evaluate
         provider: Model provider (openai, anthropic, google_genai)
         model: Model name to use for LLM evaluations
+        deadline: Optional request deadline (or seconds from now). The
+            evaluations then run concurrently within the ``"evaluation"``
+            stage budget; those not finished in time, and those of responses
+            that timed out, are returned with ``status: "timeout"``.
+            Evaluator calls that already started when the budget ran out
+            cannot be interrupted: they are abandoned, not cancelled, and
+            finish in the background.
     Returns:
         List of evaluation results for single response, or list of lists for
         multiple responses
     """
-    if isinstance(responses, list):
-        return [
-            _evaluate_single(request, response, provider, model)
-            for response in responses
+    single = not isinstance(responses, list)
+    batch = [responses] if single else responses
+
+    deadline = as_deadline(deadline)
+    if deadline is None:
+        results = [
+            _evaluate_single(request, response, provider, model) for response in batch
         ]
     else:
-        return _evaluate_single(request, responses, provider, model)
+        results = _evaluate_within(request, batch, provider, model, deadline)
+
+    return results[0] if single else results
 
 
 def _evaluate_single(
@@ -47,8 +70,92 @@ def _evaluate_single(
 ) -> EvaluationResults:
     """Run all evaluations on a single style transfer response."""
     return [
-        evaluate_style_fidelity(request, response, provider, model),
-        evaluate_content_preservation(request, response),
-        evaluate_quality(request, response, provider, model),
-        evaluate_platform_appropriateness(request, response, provider, model),
+        evaluation()
+        for _, evaluation in _evaluations(request, response, provider, model)
+    ]
+
+
+def _evaluate_within(
+    request: StyleTransferRequest,
+    responses: list[StyleTransferResponse],
+    provider: str,
+    model: str,
+    deadline: Deadline,
+) -> BatchEvaluationResults:
+    """Run all evaluations concurrently within the evaluation stage budget.
+
+    Evaluations share a pool of at most :data:`MAX_EVALUATION_WORKERS`
+    threads. Those still queued at the deadline are cancelled; running ones
+    are abandoned and keep their thread until they return.
+    """
+    planned = [
+        (response, _evaluations(request, response, provider, model))
+        for response in responses
+    ]
+    runnable = [
+        evaluation
+        for response, evaluations in planned
+        if response.status != "timeout"
+        for _, evaluation in evaluations
+    ]
+
+    executor = _get_executor()
+    futures = {evaluation: executor.submit(evaluation) for evaluation in runnable}
+    try:
+        wait(futures.values(), timeout=deadline.stage_timeout("evaluation"))
+    finally:
+        # Don't start evaluations that outlived the deadline
+        for future in futures.values():
+            future.cancel()
+
+    results = []
+    for _, evaluations in planned:
+        response_results = []
+        for key, evaluation in evaluations:
+            future = futures.get(evaluation)
+            if future is not None and future.done() and not future.cancelled():
+                response_results.append(future.result())
+            else:
+                response_results.append(
+                    {
+                        **format_result(key, 0.0, "Evaluation timed out"),
+                        "status": "timeout",
+                    }
+                )
+        results.append(response_results)
+    return results
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the bounded pool of deadline aware evaluations."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=MAX_EVALUATION_WORKERS, thread_name_prefix="evaluation"
+            )
+        return _executor
+
+
+def _evaluations(request, response, provider, model) -> list[tuple[str, Any]]:
+    """Result keys and callables of the evaluations run on a response."""
+    return [
+        (
+            "style_fidelity",
+            lambda: evaluate_style_fidelity(request, response, provider, model),
+        ),
+        (
+            "content_preservation",
+            lambda: evaluate_content_preservation(request, response),
+        ),
+        (
+            "content_quality",
+            lambda: evaluate_quality(request, response, provider, model),
+        ),
+        (
+            "platform_appropriateness",
+            lambda: evaluate_platform_appropriateness(
+                request, response, provider, model
+            ),
+        ),
     ]
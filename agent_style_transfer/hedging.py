@@ -0,0 +1,151 @@
+"""Hedged requests and cross-provider fallback for tail latency."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+from collections import deque
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from agent_style_transfer.llm_provider_setup import get_llm
+
+T = TypeVar("T")
+
+
+class HedgePolicy:
+    """Duplicate slow requests to a secondary provider and keep the fastest.
+
+    The primary request gets a head start equal to the ``percentile`` of its
+    recently observed latencies. If it hasn't answered by then, the same
+    request is sent to the secondary provider/model; whichever succeeds first
+    wins and the other is cancelled. A failing primary falls back to the
+    secondary immediately.
+
+    Args:
+        secondary_provider: Provider used for the hedge request
+        secondary_model: Model for the hedge request (provider default if None)
+        temperature: Temperature of the secondary model
+        percentile: Latency percentile of the primary that triggers a hedge
+        initial_delay: Hedge delay (seconds) until ``min_samples`` latencies
+            have been observed
+        min_delay: Lower bound of the hedge delay in seconds
+        max_delay: Upper bound of the hedge delay in seconds
+        window: Number of recent primary latencies kept for the percentile
+        min_samples: Latencies required before the percentile is used
+    """
+
+    def __init__(
+        self,
+        secondary_provider: str,
+        secondary_model: str | None = None,
+        temperature: float = 0.7,
+        percentile: float = 95.0,
+        initial_delay: float = 10.0,
+        min_delay: float = 0.5,
+        max_delay: float = 60.0,
+        window: int = 200,
+        min_samples: int = 20,
+    ) -> None:
+        self.secondary_provider = secondary_provider
+        self.secondary_model = secondary_model
+        self.temperature = temperature
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = 0
+        self.hedged = 0
+        self.secondary_wins = 0
+
+    @property
+    def hedge_rate(self) -> float:
+        """Fraction of requests that fired a secondary request."""
+        return self.hedged / self.requests if self.requests else 0.0
+
+    def delay(self) -> float:
+        """Seconds to wait for the primary before hedging."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+        if len(latencies) < self.min_samples:
+            return self.initial_delay
+        index = max(0, math.ceil(self.percentile / 100 * len(latencies)) - 1)
+        return min(self.max_delay, max(self.min_delay, latencies[index]))
+
+    def record_latency(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def secondary_llm(self):
+        """Return the model used for hedge requests."""
+        return get_llm(
+            self.secondary_provider, self.secondary_model, temperature=self.temperature
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Return hedge counters and rates."""
+        return {
+            "requests": self.requests,
+            "hedged_requests": self.hedged,
+            "secondary_wins": self.secondary_wins,
+            "hedge_rate": self.hedge_rate,
+        }
+
+    async def run(
+        self,
+        primary: Callable[[], Awaitable[T]],
+        secondary: Callable[[], Awaitable[T]],
+    ) -> tuple[T, dict[str, Any]]:
+        """Run ``primary``, hedging with ``secondary`` if it is slow or fails.
+
+        Returns:
+            The winning result and a dict describing the hedge decision
+        """
+        loop = asyncio.get_running_loop()
+        delay = self.delay()
+        started = loop.time()
+        primary_task = asyncio.ensure_future(primary())
+        tasks = {primary_task: "primary"}
+
+        try:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if done and primary_task.exception() is None:
+                self.record_latency(loop.time() - started)
+                return primary_task.result(), self._report(delay, False, "primary")
+
+            tasks[asyncio.ensure_future(secondary())] = "secondary"
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is primary_task:
+                            self.record_latency(loop.time() - started)
+                        return task.result(), self._report(delay, True, tasks[task])
+                    if error is None or task is primary_task:
+                        error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _report(self, delay: float, hedged: bool, winner: str) -> dict[str, Any]:
+        with self._lock:
+            self.requests += 1
+            self.hedged += hedged
+            self.secondary_wins += winner == "secondary"
+        return {
+            "hedged": hedged,
+            "winner": winner,
+            "delay_seconds": delay,
+            **self.stats(),
+        }
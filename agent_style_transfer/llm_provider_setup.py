@@ -1,19 +1,90 @@
-"""LLM provider setup and configuration using LangChain model factories."""
+"""LLM provider setup and configuration using LangChain model factories.
 
-from dotenv import load_dotenv
-from langchain.chat_models import init_chat_model
+Provider integrations and the ``.env`` file are loaded on the first
+:func:`get_llm` call rather than at import time, so importing the package
+stays cheap for code paths that never build a model.
+"""
 
-# Load environment variables from .env file
-load_dotenv()
+import asyncio
+import threading
+import weakref
 
+# Default models for each provider when none is specified
+DEFAULT_MODELS = {
+    "openai": "gpt-3.5-turbo",
+    "anthropic": "claude-3-haiku-20240307",
+    "google_genai": "gemini-1.5-flash",
+}
 
-def get_llm(provider: str, model: str | None = None, temperature: float = 0.7):
+# Stop/finish reasons that mean the output hit the max tokens limit
+TRUNCATION_STOP_REASONS = frozenset({"max_tokens", "length", "MAX_TOKENS"})
+
+# Providers that take explicit prompt cache breakpoints (``cache_control``);
+# the others cache stable prompt prefixes automatically
+CACHE_CONTROL_PROVIDERS = frozenset({"anthropic"})
+
+# Client attributes holding HTTP connection pools, per LangChain integration
+_SYNC_CLIENT_ATTRS = ("root_client", "_client", "client")
+_ASYNC_CLIENT_ATTRS = ("root_async_client", "_async_client", "async_client")
+
+# Memoized models. Async HTTP pools are bound to the event loop that first
+# uses them, so models created inside a running loop are cached per loop;
+# models created outside any loop share the ``_sync_llms`` scope.
+_sync_llms: dict[tuple, object] = {}
+_loop_llms: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+_llm_lock = threading.Lock()
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def load_env() -> None:
+    """Load environment variables from the ``.env`` file, once per process.
+
+    Called by :func:`get_llm`; call it directly when API keys are read from
+    the environment before any model is created.
+    """
+    global _env_loaded
+    if _env_loaded:
+        return
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _env_loaded = True
+
+
+def init_chat_model(**kwargs):
+    """Create a chat model with LangChain's ``init_chat_model`` factory.
+
+    The factory, and through it the provider integrations, is imported on
+    first use because it dominates the import time of the package.
+    """
+    from langchain.chat_models import init_chat_model as _init_chat_model
+
+    return _init_chat_model(**kwargs)
+
+
+def get_llm(
+    provider: str, model: str | None = None, temperature: float = 0.7, **kwargs
+):
     """Get the appropriate LLM instance using LangChain's model factory.
 
+    Instances are memoized on (provider, model, temperature, kwargs) so repeated
+    calls reuse the same client and its HTTP connection pool. Use
+    :func:`clear_llm_cache` or :func:`aclear_llm_cache` to drop them. If a rate
+    limit is configured for the provider/model (see
+    :func:`agent_style_transfer.rate_limiting.configure_rate_limit`), the model
+    is returned wrapped in a ``RateLimitedModel``.
+
     Args:
         provider: Model provider (openai, anthropic, google_genai)
         model: Model name. If None, will use provider defaults.
         temperature: Model temperature (0.0 to 1.0). Defaults to 0.7.
+        **kwargs: Extra model parameters forwarded to ``init_chat_model``.
 
     Returns:
         ChatModel instance
@@ -21,15 +92,128 @@ def get_llm(provider: str, model: str | None = None, temperature: float = 0.7):
 
     # Set default models for each provider if not specified
     if model is None:
-        default_models = {
-            "openai": "gpt-3.5-turbo",
-            "anthropic": "claude-3-haiku-20240307",
-            "google_genai": "gemini-1.5-flash",
-        }
-        model = default_models.get(provider)
-
-    # Use LangChain's model factory with automatic provider inference
-    # The factory will handle API key loading automatically from environment variables
-    return init_chat_model(
-        model=model, model_provider=provider, temperature=temperature
-    )
+        model = DEFAULT_MODELS.get(provider)
+
+    key = (provider, model, temperature, _freeze(kwargs))
+    load_env()
+
+    with _llm_lock:
+        llms = _current_scope()
+        llm = llms.get(key)
+        if llm is None:
+            # Use LangChain's model factory with automatic provider inference
+            # The factory will handle API key loading automatically from
+            # environment variables
+            llm = init_chat_model(
+                model=model, model_provider=provider, temperature=temperature, **kwargs
+            )
+            llms[key] = llm
+
+    from agent_style_transfer.rate_limiting import rate_limited
+
+    return rate_limited(llm, provider, model)
+
+
+def max_tokens_kwargs(provider: str, max_tokens: int | None) -> dict:
+    """Call-time kwargs that cap a provider's output at ``max_tokens``."""
+    if max_tokens is None:
+        return {}
+    if provider == "google_genai":
+        return {"generation_config": {"max_output_tokens": max_tokens}}
+    return {"max_tokens": max_tokens}
+
+
+def get_stop_reason(message) -> str | None:
+    """Return why the provider stopped generating ``message``, if reported."""
+    metadata = getattr(message, "response_metadata", None) or {}
+    reason = metadata.get("stop_reason") or metadata.get("finish_reason")
+    # Google reports an enum member
+    return getattr(reason, "name", reason)
+
+
+def get_token_usage(usage_or_message) -> dict[str, int]:
+    """Return the token usage a provider reported, including prompt caching.
+
+    Accepts a message or its ``usage_metadata``. ``cached_input_tokens`` are
+    input tokens read from the provider's prompt cache and
+    ``cache_creation_input_tokens`` those written to it.
+    """
+    usage = getattr(usage_or_message, "usage_metadata", usage_or_message)
+    if not usage:
+        return {}
+    details = usage.get("input_token_details") or {}
+    return {
+        "input_tokens": usage.get("input_tokens", 0),
+        "output_tokens": usage.get("output_tokens", 0),
+        "cached_input_tokens": details.get("cache_read", 0),
+        "cache_creation_input_tokens": details.get("cache_creation", 0),
+    }
+
+
+def clear_llm_cache() -> None:
+    """Drop every memoized LLM and close their synchronous HTTP clients.
+
+    Async clients can only be closed from their event loop; use
+    :func:`aclear_llm_cache` inside a running loop to close those too.
+    """
+    with _llm_lock:
+        llms = list(_sync_llms.values())
+        for scope in _loop_llms.values():
+            llms.extend(scope.values())
+        _sync_llms.clear()
+        _loop_llms.clear()
+
+    for llm in llms:
+        _close_clients(llm, _SYNC_CLIENT_ATTRS)
+
+
+async def aclear_llm_cache() -> None:
+    """Drop every memoized LLM, closing the current loop's async clients."""
+    loop = asyncio.get_running_loop()
+    with _llm_lock:
+        loop_llms = list(_loop_llms.get(loop, {}).values())
+
+    clear_llm_cache()
+
+    for llm in loop_llms:
+        for client in _clients(llm, _ASYNC_CLIENT_ATTRS):
+            try:
+                await client.close()
+            except Exception:
+                pass
+
+
+def _current_scope() -> dict:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _sync_llms
+    return _loop_llms.setdefault(loop, {})
+
+
+def _freeze(value):
+    """Turn kwargs into a hashable cache key component."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list | tuple | set):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _clients(llm, attrs: tuple[str, ...]) -> list:
+    """Return the already-created HTTP clients of ``llm`` that can be closed."""
+    clients = []
+    for attr in attrs:
+        # Read instance state directly so lazily created clients aren't built
+        client = getattr(llm, "__dict__", {}).get(attr)
+        if client is not None and callable(getattr(client, "close", None)):
+            clients.append(client)
+    return clients
+
+
+def _close_clients(llm, attrs: tuple[str, ...]) -> None:
+    for client in _clients(llm, attrs):
+        try:
+            client.close()
+        except Exception:
+            pass
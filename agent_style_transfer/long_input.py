@@ -0,0 +1,172 @@
+"""Map-reduce condensing of long target documents.
+
+Target content is pasted into the generation prompt verbatim, which does not
+scale to long inputs such as a whitepaper turned into a tweet thread. Long
+documents are instead split into chunks, the key points of every chunk are
+extracted concurrently (map), and the combined key points replace the
+document content in the generation prompt (reduce). If the key points are
+still over the threshold they are condensed again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+
+from agent_style_transfer.llm_provider_setup import get_llm
+from agent_style_transfer.schemas import Document
+from agent_style_transfer.single_flight import acoalesce, llm_call_key
+from agent_style_transfer.sync_adapter import ainvoke_model
+from agent_style_transfer.utils.content_extractor import response_text
+from agent_style_transfer.utils.tokens import chunk_text, estimate_tokens
+
+# Temperature of the key point extraction calls
+CONDENSE_TEMPERATURE = 0.0
+
+# Bump whenever the key point prompt or parsing change
+CONDENSE_PROMPT_VERSION = "1"
+
+# Heading of condensed document content in the generation prompt
+KEY_POINTS_HEADING = "Key points (condensed from a longer document):"
+
+
+@dataclass(frozen=True)
+class LongInputConfig:
+    """When and how long target documents are condensed.
+
+    Args:
+        threshold_tokens: Documents whose content is estimated above this
+            many tokens are condensed; shorter ones are used verbatim.
+        chunk_tokens: Approximate size of the chunks sent to the model.
+        max_concurrency: Maximum number of chunk extraction calls in flight
+            at once, per document.
+        max_points_per_chunk: Key points requested from each chunk.
+        max_rounds: Maximum number of map-reduce rounds per document.
+    """
+
+    threshold_tokens: int = 8000
+    chunk_tokens: int = 2000
+    max_concurrency: int = 5
+    max_points_per_chunk: int = 8
+    max_rounds: int = 3
+
+
+DEFAULT_LONG_INPUT = LongInputConfig()
+
+
+def is_long_input(target_docs: list[Document], config: LongInputConfig) -> bool:
+    """Whether any document of ``target_docs`` is over the config threshold."""
+    return any(
+        estimate_tokens(doc.content) > config.threshold_tokens for doc in target_docs
+    )
+
+
+async def condense_target_content(
+    target_docs: list[Document],
+    provider: str = "google_genai",
+    model: str | None = None,
+    config: LongInputConfig = DEFAULT_LONG_INPUT,
+) -> list[Document]:
+    """Replace the content of long documents with their extracted key points.
+
+    Documents at or below ``config.threshold_tokens`` are returned unchanged
+    (as the same objects). Long ones are copied with their content replaced
+    by a bulleted list of key points, headed by :data:`KEY_POINTS_HEADING`.
+
+    Args:
+        target_docs: Target documents of a style transfer request
+        provider: LLM provider (openai, anthropic, google_genai)
+        model: Model name (optional, uses provider default)
+        config: Threshold, chunk size and concurrency settings
+
+    Returns:
+        The documents, in order, with long content condensed
+    """
+    if not is_long_input(target_docs, config):
+        return target_docs
+
+    llm = get_llm(provider, model, temperature=CONDENSE_TEMPERATURE)
+
+    async def condense(doc: Document) -> Document:
+        if estimate_tokens(doc.content) <= config.threshold_tokens:
+            return doc
+        key_points = await _condense_text(llm, doc, provider, model, config)
+        return doc.model_copy(update={"content": key_points})
+
+    return list(await asyncio.gather(*(condense(doc) for doc in target_docs)))
+
+
+async def _condense_text(
+    llm, doc: Document, provider: str, model: str | None, config: LongInputConfig
+) -> str:
+    """Run map-reduce rounds over the content of ``doc``."""
+    semaphore = asyncio.Semaphore(max(1, config.max_concurrency))
+    text = doc.content
+
+    async def extract(chunk: str, part: int, parts: int) -> list[str]:
+        prompt = _build_key_points_prompt(doc.title, chunk, part, parts, config)
+        async with semaphore:
+            response = await acoalesce(
+                llm_call_key(
+                    "key_points",
+                    provider,
+                    model,
+                    prompt,
+                    temperature=CONDENSE_TEMPERATURE,
+                    prompt_version=CONDENSE_PROMPT_VERSION,
+                ),
+                lambda: ainvoke_model(llm, prompt),
+            )
+        return _parse_key_points(response_text(response))
+
+    for _ in range(max(1, config.max_rounds)):
+        chunks = chunk_text(text, config.chunk_tokens)
+        results = await asyncio.gather(
+            *(extract(chunk, i, len(chunks)) for i, chunk in enumerate(chunks, 1))
+        )
+        points = [point for result in results for point in result]
+        condensed = "\n".join(f"- {point}" for point in points)
+        # Stop once the points fit, or when another round would not help
+        if (
+            estimate_tokens(condensed) <= config.threshold_tokens
+            or len(chunks) == 1
+            or estimate_tokens(condensed) >= estimate_tokens(text)
+        ):
+            break
+        text = condensed
+
+    return f"{KEY_POINTS_HEADING}\n{condensed}"
+
+
+def _build_key_points_prompt(
+    title: str | None, chunk: str, part: int, parts: int, config: LongInputConfig
+) -> str:
+    """Build the prompt extracting the key points of one chunk."""
+    return f"""
+Extract the key points of this excerpt (part {part} of {parts}) of the
+document "{title or "Untitled"}".
+
+Excerpt:
+{chunk}
+
+Keep the facts, figures, names and claims needed to write about the
+document; leave out filler and repetition. Return at most
+{config.max_points_per_chunk} points as a simple list, one point per line:
+- [Point 1]
+- [Point 2]
+"""
+
+
+def _parse_key_points(content: str) -> list[str]:
+    """Parse a bulleted list of key points."""
+    points = []
+    for line in content.split("\n"):
+        line = line.strip()
+        if line.startswith(("-", "•", "*")):
+            point = line[1:].strip()
+            if point:
+                points.append(point)
+    if not points:
+        # Not a list, keep the answer line by line
+        points = [line.strip() for line in content.split("\n") if line.strip()]
+    return points
@@ -0,0 +1,314 @@
+"""Incrementally updated, persistent persona style profiles.
+
+Re-running style inference over every document of a persona each time it
+gains a post does not scale. A :class:`PersonaProfile` remembers which
+documents it already includes (by content hash) and keeps their mergeable
+stylometric aggregates (:class:`~agent_style_transfer.stylometry.StyleStats`),
+so adding documents only profiles the new ones. The LLM inferred style is
+kept with the features measured when it was inferred, and inference only
+runs again once the persona's measured style drifts past a threshold.
+
+Profiles are stored in SQLite by :class:`PersonaProfileStore`, keyed by the
+reference style name.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from agent_style_transfer.llm_provider_setup import DEFAULT_MODELS
+from agent_style_transfer.schemas import Document, WritingStyle
+from agent_style_transfer.sqlite_cache import SQLiteStore
+from agent_style_transfer.stylometry import (
+    StyleStats,
+    profile_text,
+    style_from_stats,
+    style_measurements,
+)
+from agent_style_transfer.writing_style_inferrer import (
+    INFERENCE_PROMPT_VERSION,
+    ainfer_writing_style,
+    infer_writing_style,
+)
+
+# Largest scaled feature change that still reuses the inferred style
+DEFAULT_DRIFT_THRESHOLD = 1.0
+
+# Feature changes counted as one unit of drift
+DRIFT_SCALES = {
+    "avg_sentence_words": 5.0,
+    "avg_word_length": 0.5,
+    "type_token_ratio": 0.15,
+    "flesch_reading_ease": 15.0,
+    "contractions_per_100_words": 2.0,
+    "emojis_per_100_words": 2.0,
+    "hashtags_per_100_words": 2.0,
+    "exclamations_per_100_words": 2.0,
+    "questions_per_100_words": 2.0,
+    "second_person_per_100_words": 2.0,
+}
+
+
+def document_hash(doc: Document) -> str:
+    """Hash identifying a document by its content."""
+    return hashlib.sha256((doc.content or "").encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PersonaProfile:
+    """Style profile of one persona, updated one document at a time.
+
+    Documents are only ever added: a document removed from the persona stays
+    counted in the aggregates.
+
+    Args:
+        name: Persona (reference style) name
+        document_hashes: Hashes of the documents included in ``stats``
+        stats: Merged stylometric aggregates of those documents
+        inferred: Last LLM inferred style
+        inferred_features: Features measured when ``inferred`` was inferred
+        provider: Provider that inferred ``inferred``
+        model: Model that inferred ``inferred``
+        prompt_version: Inference prompt version of ``inferred``
+    """
+
+    name: str
+    document_hashes: set[str] = field(default_factory=set)
+    stats: StyleStats = field(default_factory=StyleStats)
+    inferred: WritingStyle | None = None
+    inferred_features: dict[str, float] = field(default_factory=dict)
+    provider: str | None = None
+    model: str | None = None
+    prompt_version: str | None = None
+
+    def add_documents(self, documents: list[Document]) -> list[Document]:
+        """Profile the documents not included yet and return them.
+
+        Only new documents are profiled; known ones are recognized by hash.
+        """
+        added = []
+        for doc in documents or []:
+            if not (doc.content and doc.content.strip()):
+                continue
+            digest = document_hash(doc)
+            if digest in self.document_hashes:
+                continue
+            self.document_hashes.add(digest)
+            self.stats = self.stats.merge(profile_text(doc.content))
+            added.append(doc)
+        return added
+
+    def drift(self) -> float:
+        """Largest feature change since the last inference.
+
+        Changes are measured in units of :data:`DRIFT_SCALES`; 0.0 before
+        any inference.
+        """
+        if not self.inferred_features:
+            return 0.0
+        features = self.stats.features()
+        return max(
+            abs(features.get(key, 0.0) - self.inferred_features.get(key, 0.0)) / scale
+            for key, scale in DRIFT_SCALES.items()
+        )
+
+    def needs_inference(
+        self,
+        provider: str,
+        model: str | None = None,
+        threshold: float = DEFAULT_DRIFT_THRESHOLD,
+    ) -> bool:
+        """Whether the LLM inferred style is missing, stale or has drifted."""
+        if self.inferred is None:
+            return True
+        if (self.provider, self.model, self.prompt_version) != (
+            provider,
+            model or DEFAULT_MODELS.get(provider),
+            INFERENCE_PROMPT_VERSION,
+        ):
+            return True
+        return self.drift() > threshold
+
+    def set_inferred(
+        self, style: WritingStyle, provider: str, model: str | None = None
+    ) -> None:
+        """Record a freshly inferred style as the new drift baseline."""
+        self.inferred = style
+        self.inferred_features = self.stats.features()
+        self.provider = provider
+        self.model = model or DEFAULT_MODELS.get(provider)
+        self.prompt_version = INFERENCE_PROMPT_VERSION
+
+    def local_style(self) -> WritingStyle | None:
+        """Style estimated from the aggregates alone."""
+        return style_from_stats(self.stats)
+
+    def writing_style(self) -> WritingStyle | None:
+        """The LLM inferred style, or the local one before any inference."""
+        return self.inferred or self.local_style()
+
+    def to_dict(self) -> dict:
+        """Return a JSON serializable copy of the profile."""
+        return {
+            "name": self.name,
+            "document_hashes": sorted(self.document_hashes),
+            "stats": self.stats.to_dict(),
+            "inferred": self.inferred.model_dump() if self.inferred else None,
+            "inferred_features": self.inferred_features,
+            "provider": self.provider,
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> PersonaProfile:
+        """Rebuild a profile saved with :meth:`to_dict`."""
+        inferred = data.get("inferred")
+        return cls(
+            **{
+                **data,
+                "document_hashes": set(data["document_hashes"]),
+                "stats": StyleStats.from_dict(data["stats"]),
+                "inferred": WritingStyle.model_validate(inferred) if inferred else None,
+            }
+        )
+
+
+class PersonaProfileStore(SQLiteStore):
+    """SQLite store of persona profiles that infers styles incrementally.
+
+    Updating a persona (read, add documents, infer, save) holds a lock for
+    that persona, so concurrent requests for the same persona don't lose each
+    other's documents or infer twice. Threads share one lock per persona and
+    coroutines one :class:`asyncio.Lock` per persona and event loop.
+
+    Args:
+        path: SQLite database file; parent directories are created as needed.
+            Use ``":memory:"`` for a process-local store.
+        drift_threshold: Drift (see :meth:`PersonaProfile.drift`) above which
+            a persona's style is inferred again by the LLM.
+    """
+
+    def __init__(
+        self, path: str | Path, drift_threshold: float = DEFAULT_DRIFT_THRESHOLD
+    ) -> None:
+        super().__init__(path, "persona_profiles")
+        self.drift_threshold = drift_threshold
+        self.inferences = 0
+        self._persona_locks: dict[str, threading.Lock] = {}
+        self._async_persona_locks = weakref.WeakKeyDictionary()
+        self._locks_lock = threading.Lock()
+
+    def get(self, name: str) -> PersonaProfile | None:
+        """Return the stored profile of persona ``name``, if any."""
+        with self._lock:
+            row = self._read(name)
+        return PersonaProfile.from_dict(json.loads(row[0])) if row else None
+
+    def save(self, profile: PersonaProfile) -> None:
+        """Store ``profile``, replacing the previous version."""
+        value = json.dumps(profile.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._write(profile.name, value, time.time())
+            self._conn.commit()
+
+    def infer_style(
+        self,
+        name: str,
+        documents: list[Document],
+        provider: str,
+        model: str | None = None,
+        batch_size: int | None = None,
+        style_inference: str = "llm",
+    ) -> WritingStyle | None:
+        """Update the profile of ``name`` with ``documents`` and return its style.
+
+        New documents are added to the stored aggregates. The LLM inference
+        (over all ``documents``) only runs without a previous inference or
+        when the drift passes ``drift_threshold``; otherwise the stored style
+        is returned with refreshed measurements. With
+        ``style_inference="local"`` the style comes from the aggregates only.
+        """
+        with self._persona_lock(name):
+            profile, changed = self._update(name, documents)
+            if style_inference != "local" and profile.needs_inference(
+                provider, model, self.drift_threshold
+            ):
+                inferred = infer_writing_style(
+                    documents,
+                    provider,
+                    model,
+                    batch_size=batch_size,
+                    measurements=self._measurements(profile),
+                )
+                changed |= self._record(profile, inferred, provider, model)
+            if changed:
+                self.save(profile)
+        return self._style(profile, style_inference)
+
+    async def ainfer_style(
+        self,
+        name: str,
+        documents: list[Document],
+        provider: str,
+        model: str | None = None,
+        batch_size: int | None = None,
+        style_inference: str = "llm",
+    ) -> WritingStyle | None:
+        """Async version of :meth:`infer_style`."""
+        async with self._apersona_lock(name):
+            profile, changed = self._update(name, documents)
+            if style_inference != "local" and profile.needs_inference(
+                provider, model, self.drift_threshold
+            ):
+                inferred = await ainfer_writing_style(
+                    documents,
+                    provider,
+                    model,
+                    batch_size=batch_size,
+                    measurements=self._measurements(profile),
+                )
+                changed |= self._record(profile, inferred, provider, model)
+            if changed:
+                self.save(profile)
+        return self._style(profile, style_inference)
+
+    def _persona_lock(self, name: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._persona_locks.setdefault(name, threading.Lock())
+
+    def _apersona_lock(self, name: str) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        with self._locks_lock:
+            locks = self._async_persona_locks.setdefault(loop, {})
+            return locks.setdefault(name, asyncio.Lock())
+
+    def _update(
+        self, name: str, documents: list[Document]
+    ) -> tuple[PersonaProfile, bool]:
+        profile = self.get(name) or PersonaProfile(name)
+        return profile, bool(profile.add_documents(documents))
+
+    def _record(self, profile, inferred, provider, model) -> bool:
+        if inferred is None:
+            return False
+        self.inferences += 1
+        profile.set_inferred(inferred, provider, model)
+        return True
+
+    @staticmethod
+    def _measurements(profile: PersonaProfile) -> dict | None:
+        return style_measurements(profile.stats) or None
+
+    @staticmethod
+    def _style(profile: PersonaProfile, style_inference: str) -> WritingStyle | None:
+        if style_inference == "local":
+            return profile.local_style()
+        return profile.writing_style()
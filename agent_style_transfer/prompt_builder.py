@@ -1,11 +1,307 @@
 """Prompt building utilities for style transfer."""
 
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Literal
+
 from agent_style_transfer.schemas import (
     Document,
     OutputSchema,
     ReferenceStyle,
+    WritingStyle,
+    combined_field_name,
+)
+from agent_style_transfer.utils.tokens import (
+    estimate_tokens,
+    truncate_to_tokens,
+    words_to_tokens,
 )
 
+if TYPE_CHECKING:
+    from agent_style_transfer.persona_profile import PersonaProfileStore
+    from agent_style_transfer.style_cache import StyleProfileCache
+
+# Tokens reserved for the JSON/tool call framing of a structured output
+STRUCTURED_OUTPUT_TOKENS = 50
+
+# Share of a trimmed prompt's section budget the reference style may keep
+STYLE_BUDGET_SHARE = 0.4
+
+# How reference styles are inferred from documents: "llm" runs the LLM
+# inference grounded by the local stylometric profile, "local" only uses the
+# profile (no network call)
+StyleInference = Literal["llm", "local"]
+
+
+def enhance_reference_styles(
+    reference_docs: list[ReferenceStyle],
+    provider: str = "anthropic",
+    cache: StyleProfileCache | None = None,
+    batch_size: int | None = None,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> list[ReferenceStyle]:
+    """Infer the writing style of every document-backed reference style.
+
+    The returned styles are copies; the input styles are left untouched so the
+    result can be computed once per request and shared by every target schema.
+    When a ``cache`` is given, previously inferred profiles skip the LLM calls.
+    ``batch_size`` caps the documents per inference call (see
+    :func:`~agent_style_transfer.writing_style_inferrer.infer_writing_style`).
+    With ``style_inference="local"`` styles are estimated from the surface
+    statistics of the documents only (see
+    :mod:`~agent_style_transfer.stylometry`), without any LLM call. With
+    ``persona_profiles``, each reference style's profile (by name) is updated
+    with its new documents only and the LLM inference only runs again when
+    the style drifts (see :mod:`~agent_style_transfer.persona_profile`); the
+    ``cache`` is then not used.
+    """
+    enhanced_reference_docs = []
+    for ref_style in reference_docs:
+        enhanced_style = ref_style.model_copy()
+
+        if enhanced_style.documents:
+            inferred = _infer_style(
+                enhanced_style.documents,
+                provider,
+                cache,
+                batch_size,
+                style_inference,
+                persona_profiles,
+                enhanced_style.name,
+            )
+            enhanced_style.style_definition = _apply_inferred_style(
+                enhanced_style.style_definition, inferred
+            )
+
+        enhanced_reference_docs.append(enhanced_style)
+
+    return enhanced_reference_docs
+
+
+async def aenhance_reference_styles(
+    reference_docs: list[ReferenceStyle],
+    provider: str = "anthropic",
+    cache: StyleProfileCache | None = None,
+    batch_size: int | None = None,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+) -> list[ReferenceStyle]:
+    """Async version of :func:`enhance_reference_styles`.
+
+    The styles of all reference styles are inferred concurrently.
+    """
+    return list(
+        await asyncio.gather(
+            *(
+                _aenhance_reference_style(
+                    ref, provider, cache, batch_size, style_inference, persona_profiles
+                )
+                for ref in reference_docs
+            )
+        )
+    )
+
+
+async def _aenhance_reference_style(
+    ref_style: ReferenceStyle,
+    provider: str,
+    cache: StyleProfileCache | None,
+    batch_size: int | None,
+    style_inference: StyleInference,
+    persona_profiles: PersonaProfileStore | None,
+) -> ReferenceStyle:
+    """Infer the writing style of a single reference style."""
+    enhanced_style = ref_style.model_copy()
+
+    if enhanced_style.documents:
+        inferred = await _ainfer_style(
+            enhanced_style.documents,
+            provider,
+            cache,
+            batch_size,
+            style_inference,
+            persona_profiles,
+            enhanced_style.name,
+        )
+        enhanced_style.style_definition = _apply_inferred_style(
+            enhanced_style.style_definition, inferred
+        )
+
+    return enhanced_style
+
+
+def _infer_style(
+    documents: list[Document],
+    provider: str,
+    cache: StyleProfileCache | None,
+    batch_size: int | None = None,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+    persona: str | None = None,
+) -> WritingStyle | None:
+    """Infer the writing style of ``documents``, consulting the cache first.
+
+    The local stylometric profile is computed first: it is the whole answer
+    with ``style_inference="local"``, and otherwise its measurements ground
+    the LLM call (they are not added to the inferred style) and it stands in
+    when the LLM returns no style. With ``persona_profiles`` the stored
+    profile of ``persona`` is updated and used instead.
+    """
+    from agent_style_transfer.writing_style_inferrer import infer_writing_style
+
+    if persona_profiles is not None:
+        return persona_profiles.infer_style(
+            persona,
+            documents,
+            provider,
+            batch_size=batch_size,
+            style_inference=style_inference,
+        )
+
+    style, pending = _prepare_inference(documents, provider, cache, style_inference)
+    if pending is None:
+        return style
+
+    inferred = infer_writing_style(
+        documents,
+        provider,
+        batch_size=batch_size,
+        measurements=pending.measurements,
+    )
+    return _complete_inference(pending, inferred, cache)
+
+
+async def _ainfer_style(
+    documents: list[Document],
+    provider: str,
+    cache: StyleProfileCache | None,
+    batch_size: int | None = None,
+    style_inference: StyleInference = "llm",
+    persona_profiles: PersonaProfileStore | None = None,
+    persona: str | None = None,
+) -> WritingStyle | None:
+    """Async version of :func:`_infer_style`."""
+    from agent_style_transfer.writing_style_inferrer import ainfer_writing_style
+
+    if persona_profiles is not None:
+        return await persona_profiles.ainfer_style(
+            persona,
+            documents,
+            provider,
+            batch_size=batch_size,
+            style_inference=style_inference,
+        )
+
+    style, pending = _prepare_inference(documents, provider, cache, style_inference)
+    if pending is None:
+        return style
+
+    inferred = await ainfer_writing_style(
+        documents,
+        provider,
+        batch_size=batch_size,
+        measurements=pending.measurements,
+    )
+    return _complete_inference(pending, inferred, cache)
+
+
+@dataclass
+class _PendingInference:
+    """A style inference waiting for its LLM call."""
+
+    local: WritingStyle | None
+    measurements: dict | None
+    cache_key: str | None
+
+
+def _prepare_inference(
+    documents: list[Document],
+    provider: str,
+    cache: StyleProfileCache | None,
+    style_inference: StyleInference,
+) -> tuple[WritingStyle | None, _PendingInference | None]:
+    """Profile ``documents`` locally and look them up in the cache.
+
+    Returns the style when no LLM call is needed (local inference or a cache
+    hit), otherwise the pending inference.
+    """
+    from agent_style_transfer.stylometry import (
+        profile_documents,
+        style_from_stats,
+        style_measurements,
+    )
+
+    stats = profile_documents(documents)
+    local = style_from_stats(stats)
+    if style_inference == "local":
+        return local, None
+
+    key, cached = _cache_lookup(documents, provider, cache)
+    if cached is not None:
+        return cached, None
+
+    return None, _PendingInference(local, style_measurements(stats) or None, key)
+
+
+def _complete_inference(
+    pending: _PendingInference,
+    inferred: WritingStyle | None,
+    cache: StyleProfileCache | None,
+) -> WritingStyle | None:
+    """Fall back to the local style and cache the result."""
+    inferred = inferred or pending.local
+    if cache is not None and inferred is not None:
+        cache.set(pending.cache_key, inferred)
+    return inferred
+
+
+def _cache_lookup(
+    documents: list[Document],
+    provider: str,
+    cache: StyleProfileCache | None,
+) -> tuple[str | None, WritingStyle | None]:
+    """Return the cache key and cached profile for ``documents``, if any."""
+    if cache is None:
+        return None, None
+
+    from agent_style_transfer.style_cache import style_cache_key
+
+    key = style_cache_key(documents, provider)
+    return key, cache.get(key)
+
+
+def _apply_inferred_style(
+    style_definition: WritingStyle | None,
+    inferred: WritingStyle | None,
+) -> WritingStyle:
+    """Return a style definition completed with an inferred style.
+
+    An explicit definition keeps its characteristics and takes the inferred
+    rules and examples; without one the inferred style is used as is.
+    """
+    if inferred is None:
+        # Create basic style definition if nothing could be inferred
+        return style_definition or WritingStyle(
+            tone="neutral",
+            formality_level=0.5,
+            sentence_structure="varied",
+            vocabulary_level="moderate",
+        )
+
+    if style_definition:
+        return style_definition.model_copy(
+            update={
+                "style_rules": inferred.style_rules,
+                "few_shot_examples": inferred.few_shot_examples,
+            }
+        )
+
+    return inferred
+
 
 def build_generation_prompt(
     output_schema: OutputSchema,
@@ -14,54 +310,213 @@ def build_generation_prompt(
     focus: str,
     target_docs: list[Document],
     provider: str = "anthropic",
+    infer_styles: bool = True,
+    max_prompt_tokens: int | None = None,
 ) -> str:
-    """Build a comprehensive prompt for content generation."""
+    """Build a comprehensive prompt for content generation.
 
-    # Infer style rules and examples directly from documents
-    enhanced_reference_docs = []
-    for ref_style in reference_docs:
-        enhanced_style = ref_style.model_copy()
+    Pass ``infer_styles=False`` when ``reference_docs`` already went through
+    :func:`enhance_reference_styles`, to avoid repeating the inference calls.
+    With ``max_prompt_tokens``, the reference style and target content
+    sections are trimmed to fit the budget (see :func:`fit_prompt_sections`).
+    """
 
-        if enhanced_style.documents:
-            from agent_style_transfer.writing_style_inferrer import (
-                infer_few_shot_examples,
-                infer_style_rules,
-            )
+    if infer_styles:
+        reference_docs = enhance_reference_styles(reference_docs, provider)
 
-            # Infer style rules and examples
-            style_rules = infer_style_rules(enhanced_style.documents, provider)
-            few_shot_examples = infer_few_shot_examples(
-                enhanced_style.documents, provider
-            )
+    return _assemble_prompt(
+        output_schema, reference_docs, intent, focus, target_docs, max_prompt_tokens
+    )
 
-            # Update style definition with inferred data
-            if enhanced_style.style_definition:
-                enhanced_style.style_definition.style_rules = style_rules
-                enhanced_style.style_definition.few_shot_examples = few_shot_examples
-            else:
-                # Create basic style definition if none exists
-                from agent_style_transfer.schemas import WritingStyle
-
-                enhanced_style.style_definition = WritingStyle(
-                    tone="neutral",
-                    formality_level=0.5,
-                    sentence_structure="varied",
-                    vocabulary_level="moderate",
-                    personality_traits=[],
-                    writing_patterns={},
-                    style_rules=style_rules,
-                    few_shot_examples=few_shot_examples,
-                )
 
-        enhanced_reference_docs.append(enhanced_style)
+async def abuild_generation_prompt(
+    output_schema: OutputSchema,
+    reference_docs: list[ReferenceStyle],
+    intent: str | None,
+    focus: str,
+    target_docs: list[Document],
+    provider: str = "anthropic",
+    infer_styles: bool = True,
+    max_prompt_tokens: int | None = None,
+) -> str:
+    """Async version of :func:`build_generation_prompt`."""
 
-    style_info = extract_style_information(enhanced_reference_docs)
+    if infer_styles:
+        reference_docs = await aenhance_reference_styles(reference_docs, provider)
+
+    return _assemble_prompt(
+        output_schema, reference_docs, intent, focus, target_docs, max_prompt_tokens
+    )
+
+
+def build_combined_generation_prompt(
+    output_schemas: list[OutputSchema],
+    reference_docs: list[ReferenceStyle],
+    intent: str | None,
+    focus: str,
+    target_docs: list[Document],
+    provider: str = "anthropic",
+    infer_styles: bool = True,
+    max_prompt_tokens: int | None = None,
+) -> str:
+    """Build one prompt that generates every schema in ``output_schemas``.
+
+    The reference style and target content sections are rendered once; each
+    schema gets its own guidance under the field name it has in the
+    :func:`~agent_style_transfer.schemas.build_combined_schema` model.
+    ``max_prompt_tokens`` works as in :func:`build_generation_prompt`.
+    """
+
+    if infer_styles:
+        reference_docs = enhance_reference_styles(reference_docs, provider)
+
+    requested_outputs = _combined_guidance(output_schemas)
+
+    def render(style_info: str, target_info: str) -> str:
+        return f"""
+You are tasked with creating content that transfers the style from reference
+materials to target content, for several output formats at once.
+
+## Reference Style Information:
+{style_info}
+
+## Target Content Information:
+{target_info}
+
+## Intent and Focus:
+- Intent: {intent or "Not specified"}
+- Focus: {focus}
+
+## Requested Outputs and Writing Style Guidance:
+{requested_outputs}
+
+## Instructions:
+1. Analyze the reference style characteristics carefully
+2. Extract key information from the target content
+3. For every requested output, create content that matches the reference style
+   while conveying the target content's message
+4. Follow each output's writing style guidance above
+5. Return every output in its field of the output schema
+6. Maintain the original intent and focus while adapting to the new style
+
+Please generate the content now:
+"""
+
+    return render(
+        *fit_prompt_sections(render, reference_docs, target_docs, max_prompt_tokens)
+    )
+
+
+def build_cacheable_generation_prompt(
+    output_schemas: list[OutputSchema],
+    reference_docs: list[ReferenceStyle],
+    intent: str | None,
+    focus: str,
+    target_docs: list[Document],
+    max_prompt_tokens: int | None = None,
+) -> tuple[str, str]:
+    """Build the generation prompt as a stable prefix and a per-request suffix.
+
+    Provider prompt caches match on exact prefixes, so this layout puts
+    everything that repeats across requests for the same persona and output
+    types first: the instructions, the writing guidance and the reference
+    style section. The target content, intent and focus follow in the
+    suffix. With several ``output_schemas`` the guidance is rendered as in
+    :func:`build_combined_generation_prompt`.
+
+    ``reference_docs`` must already be enhanced (see
+    :func:`enhance_reference_styles`); ``max_prompt_tokens`` works as in
+    :func:`build_generation_prompt`.
+
+    Returns:
+        The cacheable prefix and the request-specific suffix
+    """
+
+    if len(output_schemas) == 1:
+        goal = "content"
+        guidance = get_writing_guidance(output_schemas[0].output_type)
+        instructions = """\
+1. Analyze the reference style characteristics carefully
+2. Extract key information from the target content
+3. Create content that matches the reference style while conveying the target
+   content's message
+4. Follow the writing style guidance below
+5. Return the content in the exact format specified by the output schema
+6. Maintain the original intent and focus while adapting to the new style"""
+    else:
+        goal = "content, for several output formats at once"
+        guidance = _combined_guidance(output_schemas)
+        instructions = """\
+1. Analyze the reference style characteristics carefully
+2. Extract key information from the target content
+3. For every requested output, create content that matches the reference style
+   while conveying the target content's message
+4. Follow each output's writing style guidance below
+5. Return every output in its field of the output schema
+6. Maintain the original intent and focus while adapting to the new style"""
+
+    def render_prefix(style_info: str) -> str:
+        return f"""
+You are tasked with creating content that transfers the style from reference
+materials to target {goal}.
+
+## Instructions:
+{instructions}
+
+## Writing Style Guidance:
+{guidance}
+
+## Reference Style Information:
+{style_info}
+"""
+
+    def render_suffix(target_info: str) -> str:
+        return f"""
+## Target Content Information:
+{target_info}
+
+## Intent and Focus:
+- Intent: {intent or "Not specified"}
+- Focus: {focus}
+
+Please generate the content now:
+"""
+
+    def render(style_info: str, target_info: str) -> str:
+        return render_prefix(style_info) + render_suffix(target_info)
+
+    style_info, target_info = fit_prompt_sections(
+        render, reference_docs, target_docs, max_prompt_tokens
+    )
+    return render_prefix(style_info), render_suffix(target_info)
+
+
+def _combined_guidance(output_schemas: list[OutputSchema]) -> str:
+    """Writing guidance of every schema under its combined output field."""
+    outputs = []
+    for i, output_schema in enumerate(output_schemas, 1):
+        field = combined_field_name(i, output_schema)
+        outputs.append(f"### `{field}`: {output_schema.name}")
+        outputs.append(f"Type: {output_schema.output_type.value}")
+        outputs.append(get_writing_guidance(output_schema.output_type))
+        outputs.append("")
+    return "\n".join(outputs)
 
-    target_info = extract_target_information(target_docs)
+
+def _assemble_prompt(
+    output_schema: OutputSchema,
+    reference_docs: list[ReferenceStyle],
+    intent: str | None,
+    focus: str,
+    target_docs: list[Document],
+    max_prompt_tokens: int | None = None,
+) -> str:
+    """Render the generation prompt from already enhanced reference styles."""
 
     writing_guidance = get_writing_guidance(output_schema.output_type)
 
-    prompt = f"""
+    def render(style_info: str, target_info: str) -> str:
+        return f"""
 You are tasked with creating content that transfers the style from reference
 materials to target content.
 
@@ -90,7 +545,108 @@ materials to target content.
 Please generate the content now:
 """
 
-    return prompt
+    return render(
+        *fit_prompt_sections(render, reference_docs, target_docs, max_prompt_tokens)
+    )
+
+
+def fit_prompt_sections(
+    render: Callable[[str, str], str],
+    reference_docs: list[ReferenceStyle],
+    target_docs: list[Document],
+    max_prompt_tokens: int | None = None,
+) -> tuple[str, str]:
+    """Render the style and target sections so the prompt fits a token budget.
+
+    The instructions and writing guidance rendered by ``render`` are always
+    kept whole; the reference style and target content sections share the
+    rest of the budget. The lowest-value parts are trimmed first:
+
+    1. target document metadata and reference document listings
+    2. few-shot examples beyond the first of each reference style, then the
+       remaining ones if the style section still takes more than
+       :data:`STYLE_BUDGET_SHARE` of the section budget
+    3. target document content, truncated at sentence boundaries and split
+       across documents in proportion to their length
+
+    Token counts use the local estimator in
+    :mod:`agent_style_transfer.utils.tokens`.
+
+    Args:
+        render: Builds the full prompt from the style and target sections
+        reference_docs: Enhanced reference styles
+        target_docs: Target documents
+        max_prompt_tokens: Prompt token budget. ``None`` disables trimming.
+
+    Returns:
+        The rendered style and target sections
+    """
+
+    style_info = extract_style_information(reference_docs)
+    target_info = extract_target_information(target_docs)
+    if max_prompt_tokens is None:
+        return style_info, target_info
+
+    def fits() -> bool:
+        return estimate_tokens(render(style_info, target_info)) <= max_prompt_tokens
+
+    if fits():
+        return style_info, target_info
+
+    # 1. Metadata
+    style_info = extract_style_information(reference_docs, include_documents=False)
+    target_info = extract_target_information(target_docs, include_metadata=False)
+    if fits():
+        return style_info, target_info
+
+    # 2. Extra examples
+    style_info = extract_style_information(
+        reference_docs, max_examples=1, include_documents=False
+    )
+    if fits():
+        return style_info, target_info
+    available = max_prompt_tokens - estimate_tokens(render("", ""))
+    if estimate_tokens(style_info) > available * STYLE_BUDGET_SHARE:
+        style_info = extract_style_information(
+            reference_docs, max_examples=0, include_documents=False
+        )
+        if fits():
+            return style_info, target_info
+
+    # 3. Content, split across documents in proportion to their length
+    empty_docs = [doc.model_copy(update={"content": ""}) for doc in target_docs]
+    content_budget = max(
+        0,
+        available
+        - estimate_tokens(style_info)
+        - estimate_tokens(
+            extract_target_information(empty_docs, include_metadata=False)
+        ),
+    )
+    content_tokens = [estimate_tokens(doc.content) for doc in target_docs]
+    total_tokens = sum(content_tokens) or 1
+
+    def truncate_content(budget: int) -> str:
+        truncated_docs = [
+            doc.model_copy(
+                update={
+                    "content": truncate_to_tokens(
+                        doc.content, budget * tokens // total_tokens
+                    )
+                }
+            )
+            for doc, tokens in zip(target_docs, content_tokens)
+        ]
+        return extract_target_information(truncated_docs, include_metadata=False)
+
+    target_info = truncate_content(content_budget)
+    # Section estimates don't add up exactly; shave off any overshoot
+    while content_budget and not fits():
+        overshoot = estimate_tokens(render(style_info, target_info)) - max_prompt_tokens
+        content_budget = max(0, content_budget - overshoot)
+        target_info = truncate_content(content_budget)
+
+    return style_info, target_info
 
 
 def get_writing_guidance(output_type: str) -> str:
@@ -124,8 +680,18 @@ def get_writing_guidance(output_type: str) -> str:
     )
 
 
-def extract_style_information(reference_docs: list[ReferenceStyle]) -> str:
-    """Extract and format style information from reference documents."""
+def extract_style_information(
+    reference_docs: list[ReferenceStyle],
+    max_examples: int | None = None,
+    include_documents: bool = True,
+) -> str:
+    """Extract and format style information from reference documents.
+
+    Args:
+        reference_docs: Reference styles to describe
+        max_examples: Maximum few-shot examples per style (all if None)
+        include_documents: Whether to list each style's reference documents
+    """
     style_info = []
 
     for i, ref_style in enumerate(reference_docs, 1):
@@ -160,15 +726,16 @@ def extract_style_information(reference_docs: list[ReferenceStyle]) -> str:
                     style_info.append(f"  - {rule}")
 
             # NEW: Include few-shot examples
-            if style_def.few_shot_examples:
+            examples = style_def.few_shot_examples[:max_examples]
+            if examples:
                 style_info.append("Examples:")
-                for j, example in enumerate(style_def.few_shot_examples, 1):
+                for j, example in enumerate(examples, 1):
                     style_info.append(f"  Example {j}:")
                     style_info.append(f"    Input: {example.input}")
                     style_info.append(f"    Output: {example.output}")
                     style_info.append("")
 
-        if ref_style.documents:
+        if ref_style.documents and include_documents:
             style_info.append(
                 f"Reference Documents: {len(ref_style.documents)} documents"
             )
@@ -180,8 +747,15 @@ def extract_style_information(reference_docs: list[ReferenceStyle]) -> str:
     return "\n".join(style_info)
 
 
-def extract_target_information(target_docs: list[Document]) -> str:
-    """Extract and format target content information."""
+def extract_target_information(
+    target_docs: list[Document], include_metadata: bool = True
+) -> str:
+    """Extract and format target content information.
+
+    Args:
+        target_docs: Target documents to describe
+        include_metadata: Whether to list each document's metadata
+    """
     target_info = []
 
     for i, doc in enumerate(target_docs, 1):
@@ -194,7 +768,7 @@ def extract_target_information(target_docs: list[Document]) -> str:
         if doc.date_published:
             target_info.append(f"Date: {doc.date_published}")
 
-        if doc.metadata:
+        if doc.metadata and include_metadata:
             target_info.append("Metadata:")
             for key, value in doc.metadata.items():
                 target_info.append(f"  - {key}: {value}")
@@ -209,7 +783,15 @@ def extract_target_information(target_docs: list[Document]) -> str:
 
 
 def get_max_tokens(output_schema: OutputSchema) -> int:
-    """Determine appropriate max_tokens based on output schema."""
+    """Determine appropriate max_tokens based on output schema.
+
+    ``output_schema.max_length`` (in words) overrides the per output type
+    default. Either way the limit leaves room for the structured output
+    framing (the tool call JSON around the content).
+    """
+    if output_schema.max_length:
+        return words_to_tokens(output_schema.max_length) + STRUCTURED_OUTPUT_TOKENS
+
     output_type = output_schema.output_type
 
     token_limits = {
@@ -220,4 +802,4 @@ def get_max_tokens(output_schema: OutputSchema) -> int:
         "blog_post": 2000,
     }
 
-    return token_limits.get(output_type, 2000)
+    return token_limits.get(output_type, 2000) + STRUCTURED_OUTPUT_TOKENS
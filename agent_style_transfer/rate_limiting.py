@@ -0,0 +1,318 @@
+"""Provider-aware rate limiting with retry and backoff for LLM calls.
+
+Budgets are configured per provider (optionally per model) with
+:func:`configure_rate_limit`. Models returned by ``get_llm`` for a configured
+provider are wrapped in :class:`RateLimitedModel`, which waits for request and
+token budget before every call and retries 429/5xx responses with exponential
+backoff and full jitter, honoring ``Retry-After`` when the provider sends it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+from agent_style_transfer.utils.tokens import estimate_input_tokens
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter for retryable provider errors."""
+
+    max_retries: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        """Seconds to wait before retry number ``attempt`` (starting at 0)."""
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets for one provider/model.
+
+    Both budgets are token buckets that refill continuously. Callers reserve
+    capacity up front and wait until their reservation is covered, so waiters
+    are served in arrival order. Token reservations use a local estimate and
+    are corrected with the provider's reported usage afterwards.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        retry_policy: RetryPolicy | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._updated = clock()
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+
+        # Metrics
+        self.requests = 0
+        self.retries = 0
+        self.queue_wait_seconds = 0.0
+        self.backoff_seconds = 0.0
+
+    def reserve(self, tokens: int = 0) -> float:
+        """Reserve budget for one request and return how long to wait for it."""
+        with self._lock:
+            now = self._clock()
+            elapsed = now - self._updated
+            self._updated = now
+            wait = 0.0
+
+            if self.requests_per_minute:
+                rate = self.requests_per_minute / 60
+                self._requests = min(
+                    self.requests_per_minute, self._requests + elapsed * rate
+                )
+                self._requests -= 1
+                if self._requests < 0:
+                    wait = max(wait, -self._requests / rate)
+
+            if self.tokens_per_minute:
+                rate = self.tokens_per_minute / 60
+                self._tokens = min(
+                    self.tokens_per_minute, self._tokens + elapsed * rate
+                )
+                self._tokens -= tokens
+                if self._tokens < 0:
+                    wait = max(wait, -self._tokens / rate)
+
+            self.requests += 1
+            self.queue_wait_seconds += wait
+            return wait
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """Correct the token bucket once the real usage of a call is known."""
+        if not self.tokens_per_minute or actual_tokens is None:
+            return
+        with self._lock:
+            self._tokens -= actual_tokens - estimated_tokens
+
+    def record_backoff(self, seconds: float) -> None:
+        with self._lock:
+            self.retries += 1
+            self.backoff_seconds += seconds
+
+    def stats(self) -> dict[str, float]:
+        """Return request, retry and waiting-time metrics."""
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "queue_wait_seconds": self.queue_wait_seconds,
+            "backoff_seconds": self.backoff_seconds,
+        }
+
+
+class RateLimitedModel:
+    """Wrap a chat model or runnable with a :class:`RateLimiter`.
+
+    ``invoke``/``ainvoke``/``stream``/``astream`` wait for budget and retry
+    retryable errors. Methods that derive a new runnable (``bind_tools``,
+    ``with_structured_output``, ``bind``, ...) return a wrapped runnable that
+    shares the same limiter; everything else is delegated unchanged.
+    """
+
+    _DERIVING_METHODS = frozenset(
+        {"bind", "bind_tools", "with_structured_output", "with_config"}
+    )
+
+    def __init__(self, runnable: Any, limiter: RateLimiter) -> None:
+        self.runnable = runnable
+        self.limiter = limiter
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.runnable, name)
+        if name in self._DERIVING_METHODS:
+
+            def derive(*args, **kwargs):
+                return RateLimitedModel(attr(*args, **kwargs), self.limiter)
+
+            return derive
+        return attr
+
+    def __or__(self, other: Any) -> Any:
+        return RateLimitedModel(self.runnable | other, self.limiter)
+
+    def invoke(self, input: Any, config: Any = None, **kwargs) -> Any:
+        estimated = estimate_input_tokens(input)
+        for attempt in range(self.limiter.retry_policy.max_retries + 1):
+            time.sleep(self.limiter.reserve(estimated))
+            try:
+                result = self.runnable.invoke(input, config, **kwargs)
+            except Exception as e:
+                time.sleep(self._backoff(attempt, e))
+                continue
+            self.limiter.record_usage(estimated, _usage_tokens(result))
+            return result
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs) -> Any:
+        estimated = estimate_input_tokens(input)
+        for attempt in range(self.limiter.retry_policy.max_retries + 1):
+            await asyncio.sleep(self.limiter.reserve(estimated))
+            try:
+                result = await self.runnable.ainvoke(input, config, **kwargs)
+            except Exception as e:
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            self.limiter.record_usage(estimated, _usage_tokens(result))
+            return result
+
+    def stream(self, input: Any, config: Any = None, **kwargs) -> Iterator[Any]:
+        estimated = estimate_input_tokens(input)
+        for attempt in range(self.limiter.retry_policy.max_retries + 1):
+            time.sleep(self.limiter.reserve(estimated))
+            started = False
+            try:
+                for chunk in self.runnable.stream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                # Chunks already handed out can't be taken back
+                if started:
+                    raise
+                time.sleep(self._backoff(attempt, e))
+                continue
+            return
+
+    async def astream(
+        self, input: Any, config: Any = None, **kwargs
+    ) -> AsyncIterator[Any]:
+        estimated = estimate_input_tokens(input)
+        for attempt in range(self.limiter.retry_policy.max_retries + 1):
+            await asyncio.sleep(self.limiter.reserve(estimated))
+            started = False
+            try:
+                async for chunk in self.runnable.astream(input, config, **kwargs):
+                    started = True
+                    yield chunk
+            except Exception as e:
+                if started:
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            return
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Return the delay before retrying, or re-raise ``error``."""
+        policy = self.limiter.retry_policy
+        if attempt >= policy.max_retries or not is_retryable(error):
+            raise error
+        delay = policy.backoff(attempt, error)
+        self.limiter.record_backoff(delay)
+        return delay
+
+
+_limiters: dict[tuple[str, str | None], RateLimiter] = {}
+
+
+def configure_rate_limit(
+    provider: str,
+    model: str | None = None,
+    requests_per_minute: float | None = None,
+    tokens_per_minute: float | None = None,
+    retry_policy: RetryPolicy | None = None,
+) -> RateLimiter:
+    """Register request/token budgets for a provider, or one of its models.
+
+    Model-specific limits take precedence over provider-wide ones. Passing no
+    budgets still enables retries with backoff for that provider/model.
+    """
+    limiter = RateLimiter(requests_per_minute, tokens_per_minute, retry_policy)
+    _limiters[(provider, model)] = limiter
+    return limiter
+
+
+def get_rate_limiter(provider: str, model: str | None = None) -> RateLimiter | None:
+    """Return the limiter that applies to ``provider``/``model``, if any."""
+    return _limiters.get((provider, model)) or _limiters.get((provider, None))
+
+
+def clear_rate_limits() -> None:
+    """Remove every configured rate limit."""
+    _limiters.clear()
+
+
+def get_rate_limit_stats() -> dict[str, dict[str, float]]:
+    """Return metrics of every configured limiter keyed by ``provider[/model]``."""
+    return {
+        f"{provider}/{model}" if model else provider: limiter.stats()
+        for (provider, model), limiter in _limiters.items()
+    }
+
+
+def rate_limited(llm: Any, provider: str, model: str | None = None) -> Any:
+    """Wrap ``llm`` if a rate limit is configured for ``provider``/``model``."""
+    limiter = get_rate_limiter(provider, model)
+    if limiter is None:
+        return llm
+    return RateLimitedModel(llm, limiter)
+
+
+def get_status_code(error: Exception) -> int | None:
+    """Extract an HTTP status code from a provider SDK exception."""
+    for source in (error, getattr(error, "response", None)):
+        for attr in ("status_code", "code"):
+            value = getattr(source, attr, None)
+            if isinstance(value, int):
+                return value
+    return None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether ``error`` is a throttling or transient server error."""
+    return get_status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def get_retry_after(error: Exception) -> float | None:
+    """Return the provider's requested retry delay in seconds, if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return max(0.0, float(retry_after))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _usage_tokens(result: Any) -> int | None:
+    """Return total tokens reported by the provider for ``result``, if known."""
+    if isinstance(result, dict):
+        result = result.get("raw", result)
+    usage = getattr(result, "usage_metadata", None)
+    if usage:
+        return usage.get("total_tokens")
+    return None
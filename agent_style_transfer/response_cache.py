@@ -0,0 +1,189 @@
+"""Opt-in cache of generated structured output for deterministic settings.
+
+With ``temperature=0`` (or a fixed seed) the same prompt sent to the same
+provider/model for the same output schema yields the same answer, so reruns
+of an unchanged request can be served locally. Entries are keyed on the
+final prompt messages, the schema, the provider, the model and its
+generation settings, and hold the generated output as JSON.
+
+Two backends are provided: :class:`InMemoryResponseCache` (process-local
+LRU) and :class:`SQLiteResponseCache` (persistent, shared across runs).
+Subclass :class:`ResponseCache` and implement ``_get``/``_set``/``_clear``/
+``__len__`` to plug in another store; a subclass missing one of them can't
+be instantiated.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+
+from agent_style_transfer.sqlite_cache import SQLiteCache
+
+
+def response_cache_key(
+    messages: list,
+    schema: type[BaseModel],
+    provider: str,
+    model: str | None,
+    temperature: float | None,
+    **params: Any,
+) -> str:
+    """Hash the inputs that determine a generated response.
+
+    Args:
+        messages: Final prompt messages sent to the model
+        schema: Structured output schema class
+        provider: Model provider
+        model: Model name
+        temperature: Model temperature
+        **params: Other generation settings that change the output
+            (seed, max tokens, ...)
+    """
+    payload = {
+        "messages": [
+            [getattr(m, "type", None), getattr(m, "content", m)] for m in messages
+        ],
+        "schema": [
+            f"{schema.__module__}.{schema.__qualname__}",
+            schema.model_json_schema(),
+        ],
+        "provider": provider,
+        "model": model,
+        "temperature": temperature,
+        "params": params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def is_deterministic(llm) -> bool:
+    """Whether ``llm`` is configured for reproducible output.
+
+    That is the case with a temperature of 0 or a fixed sampling seed.
+    """
+    params = getattr(llm, "_identifying_params", {}) or {}
+    model_kwargs = params.get("model_kwargs") or {}
+    if params.get("temperature", getattr(llm, "temperature", None)) == 0:
+        return True
+    seed = params.get("seed", model_kwargs.get("seed", getattr(llm, "seed", None)))
+    return seed is not None
+
+
+class ResponseCache(ABC):
+    """Base class of response cache backends with hit/miss counters.
+
+    Values are JSON strings of the generated structured output.
+    """
+
+    def __init__(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> str | None:
+        """Return the cached response for ``key``, or None on a miss."""
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store the response JSON ``value`` under ``key``."""
+        with self._lock:
+            self._set(key, value)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the hit/miss counters."""
+        with self._lock:
+            self._clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, float]:
+        """Return hit/miss counters and the hit rate."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    @abstractmethod
+    def _get(self, key: str) -> str | None:
+        """Return the stored value for ``key``; called with the lock held."""
+
+    @abstractmethod
+    def _set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key``; called with the lock held."""
+
+    @abstractmethod
+    def _clear(self) -> None:
+        """Remove every entry; called with the lock held."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Return the number of stored entries."""
+
+
+class InMemoryResponseCache(ResponseCache):
+    """Process-local LRU response cache.
+
+    Args:
+        max_entries: Maximum number of stored responses before LRU eviction.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        super().__init__()
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, str] = OrderedDict()
+
+    def _get(self, key: str) -> str | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def _set(self, key: str, value: str) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteResponseCache(SQLiteCache, ResponseCache):
+    """On-disk LRU/TTL response cache.
+
+    Storage, eviction and counters come from
+    :class:`~agent_style_transfer.sqlite_cache.SQLiteCache`.
+
+    Args:
+        path: SQLite database file; parent directories are created as needed.
+            Use ``":memory:"`` for a process-local cache.
+        max_entries: Maximum number of stored responses before LRU eviction.
+        ttl_seconds: Time-to-live of an entry. ``None`` disables expiry.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 10_000,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        super().__init__(path, "responses", max_entries, ttl_seconds)
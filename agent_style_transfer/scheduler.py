@@ -0,0 +1,59 @@
+"""Concurrency scheduling for batches of style transfer work."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+
+class ConcurrencyScheduler:
+    """Caps in-flight LLM work globally and per provider.
+
+    A single scheduler can be shared by several concurrent batches so the
+    limits hold across all of them.
+
+    Args:
+        max_concurrency: Maximum number of units of work running at once.
+        per_provider_limits: Optional extra caps keyed by provider name
+            (e.g. ``{"anthropic": 4}``). Providers without an entry are only
+            bound by ``max_concurrency``.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        per_provider_limits: dict[str, int] | None = None,
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.per_provider_limits = dict(per_provider_limits or {})
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._global = asyncio.Semaphore(max_concurrency)
+        self._providers = {
+            provider: asyncio.Semaphore(max(1, limit))
+            for provider, limit in self.per_provider_limits.items()
+        }
+
+    @asynccontextmanager
+    async def slot(self, provider: str) -> AsyncIterator[None]:
+        """Hold one unit of capacity for ``provider`` while the block runs."""
+        provider_semaphore = self._providers.get(provider)
+
+        # Wait on the provider cap first so a throttled provider doesn't
+        # hold global slots that other providers could use.
+        if provider_semaphore:
+            await provider_semaphore.acquire()
+        try:
+            async with self._global:
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if provider_semaphore:
+                provider_semaphore.release()
@@ -11,7 +11,17 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from pydantic import BaseModel, Field, HttpUrl, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    HttpUrl,
+    PrivateAttr,
+    SerializeAsAny,
+    computed_field,
+    create_model,
+    field_validator,
+    model_validator,
+)
 
 
 class ContentType(str, Enum):
@@ -302,9 +312,19 @@ class OutputSchema(BaseModel):
 
 
 class StyleTransferResponse(BaseModel):
-    """Response from style transfer."""
+    """Response from style transfer.
 
-    processed_content: str = Field(description="The processed content")
+    The generated schema object is kept as ``output``; ``processed_content``
+    is its JSON form, produced on first access. Responses can also be built
+    from ``processed_content`` alone (e.g. when loaded from JSON), in which
+    case ``output`` is None.
+    """
+
+    output: SerializeAsAny[BaseModel] | None = Field(
+        default=None,
+        exclude=True,
+        description="The generated output schema object",
+    )
     applied_style: str = Field(description="Name of the applied style")
     output_schema: OutputSchema | None = Field(
         default=None,
@@ -314,6 +334,89 @@ class StyleTransferResponse(BaseModel):
         default_factory=dict,
         description="Additional metadata about the processing",
     )
+    status: str = Field(
+        default="completed",
+        description=(
+            "'completed', 'timeout' if the request deadline expired before "
+            "the content was generated, or 'error' if a batch unit failed "
+            "(processed_content is then empty)"
+        ),
+    )
+
+    _processed_content: str | None = PrivateAttr(default=None)
+
+    @model_validator(mode="wrap")
+    @classmethod
+    def _accept_processed_content(cls, data: Any, handler) -> StyleTransferResponse:
+        """Keep a given ``processed_content`` instead of rendering ``output``."""
+        content = None
+        if isinstance(data, dict) and "processed_content" in data:
+            data = dict(data)
+            content = data.pop("processed_content")
+        response = handler(data)
+        if content is not None:
+            response._processed_content = content
+        return response
+
+    @computed_field(description="The processed content")
+    @property
+    def processed_content(self) -> str:
+        if self._processed_content is None:
+            self._processed_content = (
+                self.output.model_dump_json(indent=2) if self.output else ""
+            )
+        return self._processed_content
+
+
+class StyleTransferStreamEvent(BaseModel):
+    """Incremental update from a streaming style transfer."""
+
+    event: str = Field(
+        description=(
+            "Event type: 'delta' (new text of a string field), 'item' (a "
+            "completed list entry) or 'final' (the validated response)"
+        ),
+    )
+    schema_index: int | None = Field(
+        default=None,
+        description="Position of the schema in the request's target_schemas",
+    )
+    field: str | None = Field(
+        default=None,
+        description="Output field the event refers to (e.g. 'markdown', 'tweets')",
+    )
+    text: str | None = Field(default=None, description="New text for 'delta' events")
+    item: Any = Field(default=None, description="Completed entry for 'item' events")
+    response: StyleTransferResponse | None = Field(
+        default=None,
+        description="Validated response for 'final' events",
+    )
+
+
+class BatchJob(BaseModel):
+    """Style transfer requests submitted to a provider batch API.
+
+    Serializable, so a job can be saved after submission and collected from
+    another process once the provider has finished it.
+    """
+
+    job_id: str = Field(description="Identifier of the batch at the backend")
+    provider: str = Field(description="Provider whose batch API runs the job")
+    model: str = Field(description="Model the requests are generated with")
+    requests: list[StyleTransferRequest] = Field(
+        description="Submitted requests, in submission order"
+    )
+    status: str = Field(
+        default="in_progress",
+        description=(
+            "Job status: 'in_progress', 'completed', 'failed', 'expired' or "
+            "'cancelled'"
+        ),
+    )
+    errors: dict[str, str] = Field(
+        default_factory=dict,
+        description="Error message of every failed item, keyed by custom ID",
+    )
 
 
 class OutputType(str, Enum):
@@ -344,3 +447,33 @@ class OutputType(str, Enum):
         }
 
         return schema_map[self]
+
+
+def combined_field_name(index: int, output_schema: OutputSchema) -> str:
+    """Name of the ``index``-th (1-based) schema's field in a combined output."""
+    return f"{output_schema.output_type.value}_{index}"
+
+
+def build_combined_schema(output_schemas: list[OutputSchema]) -> type[BaseModel]:
+    """Build one structured output model holding every requested schema.
+
+    Each output schema becomes a required field named by
+    :func:`combined_field_name`, so all of them can be generated in one call.
+    """
+    fields = {
+        combined_field_name(i, output_schema): (
+            output_schema.output_type.get_schema(),
+            Field(
+                description=(
+                    f"Content for '{output_schema.name}' "
+                    f"({output_schema.output_type.value})"
+                )
+            ),
+        )
+        for i, output_schema in enumerate(output_schemas, 1)
+    }
+    return create_model(
+        "CombinedOutput",
+        __doc__="Content for every requested output schema.",
+        **fields,
+    )
@@ -0,0 +1,160 @@
+"""Single-flight coalescing of identical in-flight LLM calls.
+
+When several callers issue the same LLM call concurrently (same provider,
+model, parameters and prompt), only the first one reaches the provider; the
+others wait for it and share its result. Nothing is cached: once the call
+finishes, the next identical call goes out again.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import weakref
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+from agent_style_transfer.llm_provider_setup import DEFAULT_MODELS
+
+T = TypeVar("T")
+
+
+class _Call:
+    """A synchronous call in flight and the threads waiting on it."""
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class _Flight:
+    """An asynchronous call in flight and the number of tasks awaiting it."""
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    :meth:`do` coalesces blocking calls across threads and :meth:`ado`
+    coalesces coroutines within an event loop. A caller that is cancelled
+    does not cancel the shared call unless it was the last one waiting.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+        # Tasks belong to their event loop, so flights are scoped per loop
+        self._flights: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, _Flight]
+        ] = weakref.WeakKeyDictionary()
+
+        # Metrics
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: str, fn: Callable[[], T]) -> T:
+        """Run ``fn()``, or wait for the identical call already in flight."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await ``fn()``, or join the identical call already in flight."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            flights = self._flights.setdefault(loop, {})
+            flight = flights.get(key)
+            if flight is None:
+                flight = flights[key] = _Flight(loop.create_task(fn()))
+                flight.task.add_done_callback(
+                    lambda _: self._forget(flights, key, flight)
+                )
+                self.calls += 1
+            else:
+                self.shared += 1
+            flight.waiters += 1
+
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+                if abandoned and flights.get(key) is flight:
+                    del flights[key]
+            if abandoned:
+                flight.task.cancel()
+
+    def stats(self) -> dict[str, int]:
+        """Return how many calls were made and how many callers shared one."""
+        return {"calls": self.calls, "shared": self.shared}
+
+    def _forget(self, flights: dict[str, _Flight], key: str, flight: _Flight) -> None:
+        with self._lock:
+            if flights.get(key) is flight:
+                del flights[key]
+
+
+_single_flight = SingleFlight()
+
+
+def flight_key(*parts: Any) -> str:
+    """Hash the inputs that make two LLM calls identical into a flight key."""
+    payload = json.dumps(parts, sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def llm_call_key(
+    operation: str, provider: str, model: str | None, prompt: Any, **params: Any
+) -> str:
+    """Flight key for an LLM call of ``operation`` with ``prompt``.
+
+    ``model`` defaults to the provider's default model so that explicit and
+    implicit defaults coalesce; ``params`` holds anything else that changes
+    the output (temperature, schema, ...).
+    """
+    model = model or DEFAULT_MODELS.get(provider)
+    return flight_key(operation, provider, model, params, prompt)
+
+
+def coalesce(key: str, fn: Callable[[], T]) -> T:
+    """Run ``fn()`` through the shared :class:`SingleFlight` (blocking)."""
+    return _single_flight.do(key, fn)
+
+
+async def acoalesce(key: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """Await ``fn()`` through the shared :class:`SingleFlight`."""
+    return await _single_flight.ado(key, fn)
+
+
+def get_single_flight_stats() -> dict[str, int]:
+    """Return metrics of the shared :class:`SingleFlight`."""
+    return _single_flight.stats()
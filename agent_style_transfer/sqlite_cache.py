@@ -0,0 +1,174 @@
+"""SQLite backed key/value stores shared by the persistent caches.
+
+:class:`SQLiteStore` keeps string values in one table per store and owns the
+connection and its lock. :class:`SQLiteCache` adds LRU/TTL eviction on top:
+entries older than the TTL are dropped on access and on writes, and the
+least recently used entries are evicted once the table grows past
+``max_entries``. Subclasses convert their values to and from strings.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class SQLiteStore:
+    """Table of string values keyed by string, safe to share across threads.
+
+    Args:
+        path: SQLite database file; parent directories are created as needed.
+            Use ``":memory:"`` for a process-local store.
+        table: Name of the table holding the entries.
+    """
+
+    def __init__(self, path: str | Path, table: str) -> None:
+        super().__init__()
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._clear()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            row = self._conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()
+        return row[0]
+
+    # The helpers below expect the caller to hold ``_lock``; all but
+    # ``_clear`` leave the commit to the caller
+
+    def _read(self, key: str) -> tuple[str, float] | None:
+        """Return the value and creation time stored under ``key``."""
+        return self._conn.execute(
+            f"SELECT value, created_at FROM {self._table} WHERE key = ?", (key,)
+        ).fetchone()
+
+    def _write(self, key: str, value: str, now: float) -> None:
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO {self._table} "
+            "(key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, now, now),
+        )
+
+    def _clear(self) -> None:
+        self._conn.execute(f"DELETE FROM {self._table}")
+        self._conn.commit()
+
+    def _delete(self, key: str) -> None:
+        self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+
+    def _touch(self, key: str, now: float) -> None:
+        self._conn.execute(
+            f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?", (now, key)
+        )
+
+
+class SQLiteCache(SQLiteStore):
+    """On-disk LRU/TTL cache of string values with hit/miss counters.
+
+    Args:
+        path: SQLite database file; parent directories are created as needed.
+            Use ``":memory:"`` for a process-local cache.
+        table: Name of the table holding the entries.
+        max_entries: Maximum number of stored entries before LRU eviction.
+        ttl_seconds: Time-to-live of an entry. ``None`` disables expiry.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        table: str,
+        max_entries: int = 10_000,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        super().__init__(path, table)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._last_tick = 0.0
+
+    def get(self, key: str) -> str | None:
+        """Return the cached value for ``key``, or None on a miss."""
+        with self._lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store ``value`` under ``key`` and enforce the size cap."""
+        with self._lock:
+            self._set(key, value)
+
+    def clear(self) -> None:
+        """Remove every entry and reset the hit/miss counters."""
+        with self._lock:
+            self._clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _get(self, key: str) -> str | None:
+        now = self._now()
+        row = self._read(key)
+        if row is None:
+            return None
+        if self._expired(row[1], now):
+            self._delete(key)
+            self._conn.commit()
+            return None
+
+        self._touch(key, now)
+        self._conn.commit()
+        return row[0]
+
+    def _set(self, key: str, value: str) -> None:
+        now = self._now()
+        self._write(key, value, now)
+        self._evict(now)
+        self._conn.commit()
+
+    def _now(self) -> float:
+        # Strictly increasing timestamps keep LRU order stable for rapid calls
+        self._last_tick = max(time.time(), self._last_tick + 1e-6)
+        return self._last_tick
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def _evict(self, now: float) -> None:
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                f"DELETE FROM {self._table} WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+        self._conn.execute(
+            f"DELETE FROM {self._table} WHERE key IN ("
+            f"SELECT key FROM {self._table} ORDER BY accessed_at DESC "
+            "LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
@@ -0,0 +1,63 @@
+"""Persistent, content-addressed cache for inferred writing styles.
+
+Style inference is deterministic enough to reuse: the same persona documents
+sent to the same provider/model with the same inference prompts produce an
+equivalent ``WritingStyle``. Entries are stored in SQLite and evicted by TTL
+and least-recent use once the cache grows past ``max_entries``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+
+from agent_style_transfer.llm_provider_setup import DEFAULT_MODELS
+from agent_style_transfer.schemas import Document, WritingStyle
+from agent_style_transfer.sqlite_cache import SQLiteCache
+from agent_style_transfer.writing_style_inferrer import INFERENCE_PROMPT_VERSION
+
+
+def style_cache_key(
+    documents: list[Document],
+    provider: str,
+    model: str | None = None,
+    prompt_version: str = INFERENCE_PROMPT_VERSION,
+) -> str:
+    """Hash the inputs that determine the inferred style."""
+    payload = {
+        "documents": [[doc.title, doc.content] for doc in documents],
+        "provider": provider,
+        "model": model or DEFAULT_MODELS.get(provider),
+        "prompt_version": prompt_version,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class StyleProfileCache(SQLiteCache):
+    """On-disk LRU/TTL cache of inferred ``WritingStyle`` profiles.
+
+    Args:
+        path: SQLite database file; parent directories are created as needed.
+            Use ``":memory:"`` for a process-local cache.
+        max_entries: Maximum number of stored profiles before LRU eviction.
+        ttl_seconds: Time-to-live of an entry. ``None`` disables expiry.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: int = 10_000,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        super().__init__(path, "style_profiles", max_entries, ttl_seconds)
+
+    def get(self, key: str) -> WritingStyle | None:
+        """Return the cached style for ``key``, or None on a miss."""
+        value = super().get(key)
+        return WritingStyle.model_validate_json(value) if value is not None else None
+
+    def set(self, key: str, style: WritingStyle) -> None:
+        """Store ``style`` under ``key`` and enforce the size cap."""
+        super().set(key, style.model_dump_json())
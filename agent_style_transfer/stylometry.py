@@ -0,0 +1,371 @@
+"""LLM-free stylometric profiling of reference documents.
+
+Surface statistics (sentence lengths, word length, vocabulary richness,
+readability and punctuation, emoji and hashtag rates) are computed locally
+with NumPy and mapped to the measurable fields of a
+:class:`~agent_style_transfer.schemas.WritingStyle`. Profiling a persona
+takes milliseconds and no network call, so it can stand in for LLM style
+inference or ground it.
+
+Statistics are kept as additive counts in :class:`StyleStats`, so the stats
+of separate documents can be merged without looking at the text again.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from agent_style_transfer.schemas import Document, WritingStyle
+
+# Sentences are counted up to this many words; longer ones share the last bin
+MAX_SENTENCE_WORDS = 100
+
+# Words per segment of the (length independent) type-token ratio
+TTR_SEGMENT_WORDS = 100
+
+# Measurements a locally estimated style keeps in its ``writing_patterns``;
+# the full set only grounds LLM inference (see :func:`style_measurements`)
+STYLE_PATTERNS = ("avg_sentence_words", "avg_word_length", "flesch_reading_ease")
+
+_URL = re.compile(r"https?://\S+|www\.\S+")
+_HASHTAG = re.compile(r"(?<![\w#])#\w+")
+_MENTION = re.compile(r"(?<![\w@])@\w+")
+_EMOJI = re.compile("[\U0001f1e6-\U0001f1ff\U0001f300-\U0001faff\u2600-\u27bf]")
+_WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*|\d+(?:[.,]\d+)*")
+_SENTENCE_END = re.compile(r"[.!?…]+(?=\s|$)|\n\s*\n|\n(?=\s*[-*•])")
+
+# Marks counted per 100 words, by name
+_MARKS = {
+    "exclamations": re.compile(r"!"),
+    "questions": re.compile(r"\?"),
+    "commas": re.compile(r","),
+    "semicolons": re.compile(r";"),
+    "dashes": re.compile(r"—|–| - |--"),
+    "ellipses": re.compile(r"\.\.\.|…"),
+}
+
+_FIRST_PERSON = ["i", "me", "my", "mine", "we", "us", "our", "ours"]
+_SECOND_PERSON = ["you", "your", "yours"]
+_VOWELS = np.array([ord(c) for c in "aeiouy"], dtype=np.uint32)
+
+
+@dataclass
+class StyleStats:
+    """Additive surface statistics of one or more documents.
+
+    Use :func:`profile_text` or :func:`profile_documents` to compute them,
+    :meth:`merge` to combine them and :meth:`features` to read them.
+    """
+
+    documents: int = 0
+    words: int = 0
+    letters: int = 0
+    syllables: int = 0
+    # Number of sentences of each length in words, up to MAX_SENTENCE_WORDS
+    sentence_lengths: np.ndarray = field(
+        default_factory=lambda: np.zeros(MAX_SENTENCE_WORDS + 1, dtype=np.int64)
+    )
+    ttr_segments: int = 0
+    ttr_sum: float = 0.0
+    counts: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def sentences(self) -> int:
+        return int(self.sentence_lengths.sum())
+
+    def merge(self, other: StyleStats) -> StyleStats:
+        """Return the stats of both documents sets combined."""
+        return StyleStats(
+            documents=self.documents + other.documents,
+            words=self.words + other.words,
+            letters=self.letters + other.letters,
+            syllables=self.syllables + other.syllables,
+            sentence_lengths=self.sentence_lengths + other.sentence_lengths,
+            ttr_segments=self.ttr_segments + other.ttr_segments,
+            ttr_sum=self.ttr_sum + other.ttr_sum,
+            counts={
+                key: self.counts.get(key, 0) + other.counts.get(key, 0)
+                for key in self.counts.keys() | other.counts.keys()
+            },
+        )
+
+    def to_dict(self) -> dict:
+        """Return a JSON serializable copy of the stats."""
+        return {
+            "documents": self.documents,
+            "words": self.words,
+            "letters": self.letters,
+            "syllables": self.syllables,
+            "sentence_lengths": self.sentence_lengths.tolist(),
+            "ttr_segments": self.ttr_segments,
+            "ttr_sum": self.ttr_sum,
+            "counts": dict(self.counts),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> StyleStats:
+        """Rebuild stats saved with :meth:`to_dict`."""
+        return cls(
+            **{
+                **data,
+                "sentence_lengths": np.array(data["sentence_lengths"], dtype=np.int64),
+                "counts": dict(data["counts"]),
+            }
+        )
+
+    def features(self) -> dict[str, float]:
+        """Return the derived features; rates are per 100 words."""
+        if not self.words:
+            return {}
+
+        lengths = np.arange(MAX_SENTENCE_WORDS + 1)
+        sentences = max(self.sentences, 1)
+        mean = float((lengths * self.sentence_lengths).sum() / sentences)
+        variance = float(
+            (self.sentence_lengths * (lengths - mean) ** 2).sum() / sentences
+        )
+        cumulative = np.cumsum(self.sentence_lengths)
+
+        def percentile(q: float) -> float:
+            return float(np.searchsorted(cumulative, q * cumulative[-1]))
+
+        words_per_sentence = self.words / sentences
+        syllables_per_word = self.syllables / self.words
+        features = {
+            "avg_sentence_words": mean,
+            "sentence_words_std": variance**0.5,
+            "sentence_words_p10": percentile(0.1),
+            "sentence_words_p50": percentile(0.5),
+            "sentence_words_p90": percentile(0.9),
+            "avg_word_length": self.letters / self.words,
+            "syllables_per_word": syllables_per_word,
+            "type_token_ratio": self.ttr_sum / max(self.ttr_segments, 1),
+            "flesch_reading_ease": 206.835
+            - 1.015 * words_per_sentence
+            - 84.6 * syllables_per_word,
+        }
+        for key, count in sorted(self.counts.items()):
+            features[f"{key}_per_100_words"] = 100 * count / self.words
+        return features
+
+
+def profile_text(text: str | None) -> StyleStats:
+    """Compute the surface statistics of one text."""
+    text = text or ""
+    counts = {
+        "urls": len(_URL.findall(text)),
+        "hashtags": len(_HASHTAG.findall(text)),
+        "mentions": len(_MENTION.findall(text)),
+        "emojis": len(_EMOJI.findall(text)),
+    }
+    # Links, tags and mentions are not prose
+    prose = _MENTION.sub(" ", _HASHTAG.sub(" ", _URL.sub(" ", text)))
+    counts.update(
+        {name: len(pattern.findall(prose)) for name, pattern in _MARKS.items()}
+    )
+
+    matches = list(_WORD.finditer(prose))
+    words = [match.group() for match in matches]
+    stats = StyleStats(documents=1, counts=counts)
+    if not words:
+        return stats
+
+    original = np.array(words)
+    lower = np.char.replace(np.char.lower(original), "’", "'")
+    letters, syllables = _letters_and_syllables(lower)
+    counts["contractions"] = int((np.char.find(lower, "'") >= 0).sum())
+    counts["first_person"] = int(np.isin(lower, _FIRST_PERSON).sum())
+    counts["second_person"] = int(np.isin(lower, _SECOND_PERSON).sum())
+    counts["all_caps_words"] = int(
+        (np.char.isupper(original) & (np.char.str_len(original) > 1)).sum()
+    )
+
+    # Words per sentence: the sentence of a word is the number of sentence
+    # ends before it
+    starts = np.fromiter((match.start() for match in matches), dtype=np.int64)
+    ends = np.fromiter(
+        (match.end() for match in _SENTENCE_END.finditer(prose)), dtype=np.int64
+    )
+    per_sentence = np.bincount(np.searchsorted(ends, starts, side="right"))
+    per_sentence = np.minimum(per_sentence[per_sentence > 0], MAX_SENTENCE_WORDS)
+
+    stats.words = len(words)
+    stats.letters = int(letters.sum())
+    stats.syllables = int(syllables.sum())
+    stats.sentence_lengths = np.bincount(
+        per_sentence, minlength=MAX_SENTENCE_WORDS + 1
+    ).astype(np.int64)
+    stats.ttr_segments, stats.ttr_sum = _segment_ttr(lower)
+    return stats
+
+
+def profile_documents(documents: str | list[Document]) -> StyleStats:
+    """Compute the merged surface statistics of a text or documents."""
+    if isinstance(documents, str):
+        return profile_text(documents)
+
+    stats = StyleStats()
+    for doc in documents or []:
+        if doc.content and doc.content.strip():
+            stats = stats.merge(profile_text(doc.content))
+    return stats
+
+
+def style_from_stats(stats: StyleStats) -> WritingStyle | None:
+    """Estimate a writing style from surface statistics.
+
+    Formality, sentence structure and vocabulary level are derived from the
+    features, ``writing_patterns`` holds the few measurements of
+    :data:`STYLE_PATTERNS` and a few style rules describe the clearest
+    habits. Tone is a coarse guess and personality traits are left empty.
+    Returns None without any words.
+    """
+    features = stats.features()
+    if not features:
+        return None
+
+    formality = _formality(features)
+    return WritingStyle(
+        tone=_tone(features, formality),
+        formality_level=round(formality, 2),
+        sentence_structure=_sentence_structure(features),
+        vocabulary_level=_vocabulary_level(features),
+        writing_patterns={key: round(features[key], 1) for key in STYLE_PATTERNS},
+        style_rules=_style_rules(features),
+    )
+
+
+def style_measurements(stats: StyleStats) -> dict[str, float]:
+    """Measurements shown to the LLM inference call to ground its estimates.
+
+    Rates of marks that never occur are left out.
+    """
+    return {
+        key: round(value, 2)
+        for key, value in stats.features().items()
+        if value or not key.endswith("_per_100_words")
+    }
+
+
+def infer_local_style(documents: str | list[Document]) -> WritingStyle | None:
+    """Profile a text or documents and estimate their writing style locally."""
+    return style_from_stats(profile_documents(documents))
+
+
+def _letters_and_syllables(words: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Letters and estimated syllables of each (lower case) word.
+
+    Syllables are vowel groups, minus a silent final "e", at least one per
+    word. All words are processed as one array of code points.
+    """
+    joined = " ".join(words.tolist())
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32)
+    separator = codes == ord(" ")
+    word_ids = np.cumsum(separator)
+    letters = np.bincount(word_ids[~separator], minlength=len(words))
+
+    vowel = np.isin(codes, _VOWELS)
+    group_start = vowel & ~np.concatenate(([False], vowel[:-1]))
+    syllables = np.bincount(word_ids, weights=group_start, minlength=len(words))
+
+    last = np.flatnonzero(~separator & np.concatenate((separator[1:], [True])))
+    before_last = codes[np.maximum(last - 1, 0)]
+    silent_e = (codes[last] == ord("e")) & (before_last != ord("l"))
+    syllables = syllables - (silent_e & (syllables > 1))
+    return letters, np.maximum(syllables, 1)
+
+
+def _segment_ttr(words: np.ndarray) -> tuple[int, float]:
+    """Number of segments and sum of their type-token ratios."""
+    _, word_ids = np.unique(words, return_inverse=True)
+    segments = np.arange(len(words)) // TTR_SEGMENT_WORDS
+    pairs = np.unique(segments * (word_ids.max() + 1) + word_ids)
+    types = np.bincount(pairs // (word_ids.max() + 1))
+    tokens = np.bincount(segments)
+    return len(tokens), float((types / tokens).sum())
+
+
+def _formality(features: dict[str, float]) -> float:
+    """Estimate formality from 0.0 to 1.0.
+
+    Long words and sentences raise it; contractions, exclamations, emojis and
+    personal pronouns lower it.
+    """
+    word_length = np.clip((features["avg_word_length"] - 4.5) / 1.5, -1, 1)
+    sentence_length = np.clip((features["avg_sentence_words"] - 15) / 10, -1, 1)
+    contractions = min(_rate(features, "contractions") / 3, 1)
+    exclamations = min(
+        (_rate(features, "exclamations") + _rate(features, "emojis")) / 3, 1
+    )
+    pronouns = min(
+        (_rate(features, "first_person") + _rate(features, "second_person")) / 5, 1
+    )
+    score = (
+        0.5
+        + 0.25 * word_length
+        + 0.15 * sentence_length
+        - 0.1 * contractions
+        - 0.1 * exclamations
+        - 0.05 * pronouns
+    )
+    return float(np.clip(score, 0.0, 1.0))
+
+
+def _tone(features: dict[str, float], formality: float) -> str:
+    if _rate(features, "exclamations") + _rate(features, "emojis") > 2:
+        return "enthusiastic"
+    if formality >= 0.7:
+        return "formal"
+    if formality <= 0.35:
+        return "casual"
+    return "neutral"
+
+
+def _sentence_structure(features: dict[str, float]) -> str:
+    mean = features["avg_sentence_words"]
+    if mean < 10:
+        return "short"
+    if mean > 25:
+        return "long"
+    if features["sentence_words_std"] > 0.6 * mean:
+        return "varied"
+    return "medium"
+
+
+def _vocabulary_level(features: dict[str, float]) -> str:
+    reading_ease = features["flesch_reading_ease"]
+    if reading_ease >= 70:
+        return "simple"
+    if reading_ease >= 50:
+        return "moderate"
+    if reading_ease >= 30:
+        return "advanced"
+    return "technical"
+
+
+def _style_rules(features: dict[str, float]) -> list[str]:
+    rules = [
+        f"Keep sentences around {features['sentence_words_p50']:.0f} words "
+        f"(mostly {features['sentence_words_p10']:.0f}-"
+        f"{features['sentence_words_p90']:.0f})"
+    ]
+    habits = [
+        ("emojis", 0.5, "Use emojis"),
+        ("hashtags", 0.5, "Use hashtags"),
+        ("exclamations", 1, "Use exclamation marks"),
+        ("questions", 1, "Ask the reader questions"),
+        ("second_person", 2, "Address the reader directly as 'you'"),
+        ("contractions", 2, "Use contractions"),
+    ]
+    for key, threshold, rule in habits:
+        rate = _rate(features, key)
+        if rate >= threshold:
+            rules.append(f"{rule} (about {rate:.1f} per 100 words)")
+    return rules
+
+
+def _rate(features: dict[str, float], key: str) -> float:
+    return features.get(f"{key}_per_100_words", 0.0)
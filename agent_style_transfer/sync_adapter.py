@@ -0,0 +1,152 @@
+"""Run models without native async support on a bounded thread pool.
+
+Calling a blocking ``invoke`` inside a coroutine freezes the event loop for
+every other request in flight. Models that only implement the synchronous
+API are instead run on a dedicated, bounded thread pool, so one sync
+provider can use at most ``max_workers`` threads and never blocks the loop.
+Use :func:`configure_sync_executor` to size the pool and
+:func:`get_sync_executor_stats` to see how many calls took this path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+# Default number of threads for models without native async support
+DEFAULT_MAX_SYNC_WORKERS = 4
+
+# Attributes under which wrappers (bindings, rate limiters) keep their model
+_WRAPPED_ATTRS = ("bound", "runnable")
+
+
+class SyncModelExecutor:
+    """Bounded thread pool for blocking model calls, with call counters.
+
+    Args:
+        max_workers: Maximum number of blocking calls running at once; more
+            calls wait in the pool's queue.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_SYNC_WORKERS) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.calls = 0
+        self.queued = 0
+        self.running = 0
+        self.peak_running = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run ``fn(*args, **kwargs)`` on the pool without blocking the loop."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="sync-model",
+                )
+            executor = self._executor
+            self.calls += 1
+            self.queued += 1
+
+        # Keep context variables (tracing, callbacks) in the worker thread
+        context = contextvars.copy_context()
+
+        def call() -> T:
+            with self._lock:
+                self.queued -= 1
+                self.running += 1
+                self.peak_running = max(self.peak_running, self.running)
+            try:
+                return context.run(fn, *args, **kwargs)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        future = executor.submit(call)
+        # Cancelling the caller only cancels calls that haven't started yet;
+        # started ones keep their thread until they return
+        future.add_done_callback(self._forget_cancelled)
+        return await asyncio.wrap_future(future)
+
+    def _forget_cancelled(self, future) -> None:
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def stats(self) -> dict[str, int]:
+        """Return pool size, call counters and the peak number of busy threads."""
+        return {
+            "max_workers": self.max_workers,
+            "calls": self.calls,
+            "queued": self.queued,
+            "running": self.running,
+            "peak_running": self.peak_running,
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads; the pool is recreated on the next call."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_sync_executor = SyncModelExecutor()
+
+
+def configure_sync_executor(
+    max_workers: int = DEFAULT_MAX_SYNC_WORKERS,
+) -> SyncModelExecutor:
+    """Replace the shared pool with one of ``max_workers`` threads."""
+    global _sync_executor
+    previous, _sync_executor = _sync_executor, SyncModelExecutor(max_workers)
+    previous.shutdown(wait=False)
+    return _sync_executor
+
+
+def get_sync_executor_stats() -> dict[str, int]:
+    """Return metrics of the shared :class:`SyncModelExecutor`."""
+    return _sync_executor.stats()
+
+
+def supports_async(runnable: Any) -> bool:
+    """Whether ``runnable`` has a native (non-blocking) async implementation.
+
+    Chat models count as async when they implement ``_agenerate``; LangChain
+    otherwise runs their blocking ``_generate`` on the loop's default
+    executor. Bindings and rate limiting wrappers are looked through.
+    """
+    if not hasattr(runnable, "ainvoke"):
+        return False
+    model = runnable
+    while True:
+        inner = next(
+            (getattr(model, a) for a in _WRAPPED_ATTRS if hasattr(model, a)), None
+        )
+        if inner is None or inner is model:
+            break
+        model = inner
+    # Imported here: the chat model base class is slow to import
+    from langchain_core.language_models.chat_models import BaseChatModel
+
+    if isinstance(model, BaseChatModel):
+        return type(model)._agenerate is not BaseChatModel._agenerate
+    return True
+
+
+async def ainvoke_model(runnable: Any, model_input: Any, **kwargs: Any) -> Any:
+    """Invoke ``runnable`` natively async, or on the shared sync pool."""
+    if supports_async(runnable):
+        return await runnable.ainvoke(model_input, **kwargs)
+    return await _sync_executor.run(runnable.invoke, model_input, **kwargs)
@@ -6,13 +6,27 @@ from agent_style_transfer.utils.evaluation import (
     format_result,
     get_text_content,
 )
+from agent_style_transfer.utils.json_stream import IncrementalJSONParser
 from agent_style_transfer.utils.pydantic_utils import get_text_fields, is_text_field
+from agent_style_transfer.utils.tokens import (
+    chunk_text,
+    estimate_input_tokens,
+    estimate_tokens,
+    truncate_to_tokens,
+    words_to_tokens,
+)
 
 __all__ = [
+    "IncrementalJSONParser",
+    "chunk_text",
     "create_llm_evaluator",
+    "estimate_input_tokens",
+    "estimate_tokens",
     "extract_content",
     "format_result",
     "get_text_content",
     "get_text_fields",
     "is_text_field",
+    "truncate_to_tokens",
+    "words_to_tokens",
 ]
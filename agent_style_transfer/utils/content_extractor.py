@@ -1,26 +1,32 @@
 """Content extraction utilities for style transfer schemas."""
 
 import json
+from typing import Any
+
+from pydantic import BaseModel
 
 from agent_style_transfer.schemas import OutputSchema
 from agent_style_transfer.utils.pydantic_utils import get_text_fields
 
 
-def extract_content(content_json: str, output_schema: OutputSchema) -> str:
-    """Extract content from JSON output based on the output schema.
+def extract_content(content: str | BaseModel, output_schema: OutputSchema) -> str:
+    """Extract content from schema output based on the output schema.
 
     Args:
-        content_json: JSON string containing the schema output
+        content: The generated output object, or its JSON string
         output_schema: The output schema object that defines the structure
 
     Returns:
         Extracted text content as a string
 
     Raises:
-        json.JSONDecodeError: If content_json is not valid JSON
+        json.JSONDecodeError: If content is not valid JSON
     """
+    if isinstance(content, BaseModel):
+        return extract_text(content)
+
     try:
-        content_data = json.loads(content_json)
+        content_data = json.loads(content)
 
         # Use the schema's output_type to determine extraction strategy
         output_type = output_schema.output_type
@@ -31,27 +37,82 @@ def extract_content(content_json: str, output_schema: OutputSchema) -> str:
         # Get the schema field names that contain text content
         text_fields = get_text_fields(schema_class)
 
-        # Extract text from the identified fields
-        extracted_parts = []
-        for field_name in text_fields:
-            if field_name in content_data:
-                value = content_data[field_name]
-                if isinstance(value, str) and value.strip():
-                    extracted_parts.append(value.strip())
-                elif isinstance(value, list):
-                    # Handle list fields (like tweets in a thread)
-                    list_texts = []
-                    for item in value:
-                        if isinstance(item, dict) and "text" in item:
-                            list_texts.append(item["text"])
-                    if list_texts:
-                        extracted_parts.append("\n\n".join(list_texts))
-
-        if extracted_parts:
-            return "\n\n".join(extracted_parts)
+        extracted = _join_text_fields(
+            {
+                field_name: content_data[field_name]
+                for field_name in text_fields
+                if field_name in content_data
+            }
+        )
+
+        if extracted:
+            return extracted
         else:
             # Fallback for unknown types or empty content
             return str(content_data)
 
     except (json.JSONDecodeError, KeyError):
-        return content_json
+        return content
+
+
+def extract_text(output: BaseModel) -> str:
+    """Extract text content directly from a generated output object.
+
+    Gives the same result as :func:`extract_content` on the object's JSON,
+    without serializing and parsing it.
+    """
+    extracted = _join_text_fields(
+        {
+            field_name: getattr(output, field_name)
+            for field_name in get_text_fields(type(output))
+        }
+    )
+    if extracted:
+        return extracted
+    # Fallback for unknown types or empty content
+    return str(output.model_dump(mode="json"))
+
+
+def response_text(response: Any) -> str:
+    """Normalize the different LLM response shapes into plain text.
+
+    Accepts chat model messages, dicts and plain values. Multi-part content
+    (a list of strings or ``{"type": "text", "text": ...}`` blocks) is
+    joined.
+    """
+    if isinstance(response, dict):
+        content = response.get("content", response.get("text", str(response)))
+    else:
+        content = getattr(response, "content", response)
+
+    if isinstance(content, list):
+        return "".join(_part_text(part) for part in content)
+    return _part_text(content)
+
+
+def _part_text(part: Any) -> str:
+    """Return the text of one content part."""
+    if isinstance(part, str):
+        return part
+    if isinstance(part, dict):
+        return str(part.get("text", part.get("content", "")))
+    return str(part)
+
+
+def _join_text_fields(values: dict[str, Any]) -> str:
+    """Join the non-empty text of the given field values."""
+    extracted_parts = []
+    for value in values.values():
+        if isinstance(value, str) and value.strip():
+            extracted_parts.append(value.strip())
+        elif isinstance(value, list):
+            # Handle list fields (like tweets in a thread)
+            list_texts = []
+            for item in value:
+                if isinstance(item, dict) and "text" in item:
+                    list_texts.append(item["text"])
+                elif isinstance(item, BaseModel) and hasattr(item, "text"):
+                    list_texts.append(item.text)
+            if list_texts:
+                extracted_parts.append("\n\n".join(list_texts))
+    return "\n\n".join(extracted_parts)
@@ -4,6 +4,7 @@ from typing import Any
 
 from agent_style_transfer.llm_provider_setup import get_llm
 from agent_style_transfer.schemas import StyleTransferRequest, StyleTransferResponse
+from agent_style_transfer.single_flight import coalesce, llm_call_key
 from agent_style_transfer.utils.content_extractor import extract_content
 
 
@@ -16,7 +17,11 @@ def get_text_content(
     request: StyleTransferRequest, response: StyleTransferResponse
 ) -> tuple[str, str]:
     """Extract generated and original text content."""
-    generated_text = extract_content(response.processed_content, response.output_schema)
+    # Read the typed output when available instead of re-parsing its JSON
+    content = response.output
+    if content is None:
+        content = response.processed_content
+    generated_text = extract_content(content, response.output_schema)
 
     # Get original content, return empty string if content is not available
     original_content = request.target_content[0]
@@ -52,7 +57,11 @@ def create_llm_evaluator(
                 full_prompt += f"\nReference: {reference_outputs}"
 
             # Get evaluation response
-            response = llm.invoke(full_prompt)
+            # Identical evaluations running concurrently share one call
+            key = llm_call_key(
+                "evaluate", provider, model, full_prompt, temperature=0.1
+            )
+            response = coalesce(key, lambda: llm.invoke(full_prompt))
             evaluation_text = response.content
 
             # Extract score from response (look for number 0-5)
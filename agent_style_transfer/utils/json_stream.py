@@ -0,0 +1,212 @@
+"""Incremental JSON parsing for streamed structured output."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+# Parser states
+_VALUE = "value"
+_VALUE_OR_END = "value_or_end"
+_KEY = "key"
+_KEY_OR_END = "key_or_end"
+_COLON = "colon"
+_AFTER_VALUE = "after_value"
+_STRING = "string"
+_LITERAL = "literal"
+_DONE = "done"
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+_LITERAL_END = set(",]} \t\r\n")
+
+JSONPath = tuple[str | int, ...]
+JSONEvent = tuple[str, JSONPath, Any]
+
+
+class IncrementalJSONParser:
+    """Parse a JSON document fed in arbitrary chunks, one character at a time.
+
+    Every character is examined once, so parsing a streamed document costs
+    O(n) overall instead of re-parsing the growing buffer on every chunk.
+    :meth:`feed` returns the events produced by a chunk:
+
+    - ``("delta", path, text)``: new characters of a string value at ``path``
+    - ``("value", path, value)``: a value at ``path`` is complete
+
+    Paths are tuples of object keys and array indices from the root, so the
+    root value itself completes with the empty path ``()``.
+    """
+
+    def __init__(self) -> None:
+        self.root: Any = None
+        # Each frame is [container, path, current_key]
+        self._stack: list[list] = []
+        self._state = _VALUE
+        self._string: list[str] = []
+        self._string_is_key = False
+        self._delta_start = 0
+        self._escape: str | None = None
+        self._high_surrogate: str | None = None
+        self._literal: list[str] = []
+
+    @property
+    def done(self) -> bool:
+        """Whether the root value has been fully parsed."""
+        return self._state == _DONE
+
+    def feed(self, chunk: str) -> list[JSONEvent]:
+        """Consume ``chunk`` and return the events it completes."""
+        events: list[JSONEvent] = []
+        for char in chunk:
+            self._consume(char, events)
+
+        # Flush the partial text of an open string value once per chunk
+        if self._state == _STRING and not self._string_is_key:
+            self._flush_delta(events)
+
+        return events
+
+    def _consume(self, char: str, events: list[JSONEvent]) -> None:
+        state = self._state
+
+        if state == _STRING:
+            self._consume_string(char, events)
+            return
+
+        if state == _LITERAL:
+            if char not in _LITERAL_END:
+                self._literal.append(char)
+                return
+            literal = "".join(self._literal)
+            self._literal = []
+            self._complete(json.loads(literal), events)
+            state = self._state
+
+        if char.isspace() or state == _DONE:
+            return
+
+        if state in (_VALUE, _VALUE_OR_END):
+            if char == "]" and state == _VALUE_OR_END:
+                self._close(events)
+            elif char == "{":
+                self._open({}, events)
+                self._state = _KEY_OR_END
+            elif char == "[":
+                self._open([], events)
+                self._state = _VALUE_OR_END
+            elif char == '"':
+                self._start_string(is_key=False)
+            else:
+                self._literal.append(char)
+                self._state = _LITERAL
+        elif state in (_KEY, _KEY_OR_END):
+            if char == "}" and state == _KEY_OR_END:
+                self._close(events)
+            elif char == '"':
+                self._start_string(is_key=True)
+            else:
+                raise ValueError(f"Expected object key, got {char!r}")
+        elif state == _COLON:
+            if char != ":":
+                raise ValueError(f"Expected ':', got {char!r}")
+            self._state = _VALUE
+        elif state == _AFTER_VALUE:
+            container = self._stack[-1][0]
+            if char == ",":
+                self._state = _KEY if isinstance(container, dict) else _VALUE
+            elif char in "}]":
+                self._close(events)
+            else:
+                raise ValueError(f"Expected ',' or closing bracket, got {char!r}")
+
+    def _consume_string(self, char: str, events: list[JSONEvent]) -> None:
+        if self._escape is not None:
+            self._escape += char
+            if self._escape[0] != "u":
+                self._append_char(_ESCAPES.get(char, char))
+                self._escape = None
+            elif len(self._escape) == 5:
+                self._append_char(chr(int(self._escape[1:], 16)))
+                self._escape = None
+        elif char == "\\":
+            self._escape = ""
+        elif char == '"':
+            value = "".join(self._string)
+            self._string = []
+            if self._string_is_key:
+                self._stack[-1][2] = value
+                self._state = _COLON
+            else:
+                self._flush_delta(events, value)
+                self._complete(value, events)
+        else:
+            self._string.append(char)
+
+    def _append_char(self, char: str) -> None:
+        # Join UTF-16 surrogate pairs from consecutive \\u escapes
+        if "\ud800" <= char <= "\udbff":
+            self._high_surrogate = char
+            return
+        if self._high_surrogate and "\udc00" <= char <= "\udfff":
+            pair = self._high_surrogate + char
+            char = pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        self._high_surrogate = None
+        self._string.append(char)
+
+    def _start_string(self, is_key: bool) -> None:
+        self._state = _STRING
+        self._string_is_key = is_key
+        self._delta_start = 0
+
+    def _flush_delta(self, events: list[JSONEvent], value: str | None = None) -> None:
+        text = value if value is not None else "".join(self._string)
+        if len(text) > self._delta_start:
+            events.append(("delta", self._child_path(), text[self._delta_start :]))
+            self._delta_start = len(text)
+
+    def _child_path(self) -> JSONPath:
+        if not self._stack:
+            return ()
+        container, path, key = self._stack[-1]
+        if isinstance(container, dict):
+            return (*path, key)
+        return (*path, len(container))
+
+    def _open(self, container: dict | list, events: list[JSONEvent]) -> None:
+        path = self._child_path()
+        if self._stack:
+            self._attach(container)
+        else:
+            self.root = container
+        self._stack.append([container, path, None])
+
+    def _close(self, events: list[JSONEvent]) -> None:
+        container, path, _ = self._stack.pop()
+        events.append(("value", path, container))
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+    def _complete(self, value: Any, events: list[JSONEvent]) -> None:
+        path = self._child_path()
+        if self._stack:
+            self._attach(value)
+            self._state = _AFTER_VALUE
+        else:
+            self.root = value
+            self._state = _DONE
+        events.append(("value", path, value))
+
+    def _attach(self, value: Any) -> None:
+        container, _, key = self._stack[-1]
+        if isinstance(container, dict):
+            container[key] = value
+        else:
+            container.append(value)
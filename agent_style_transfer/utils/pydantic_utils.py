@@ -1,5 +1,6 @@
 """General-purpose utilities for working with Pydantic models."""
 
+from functools import lru_cache
 from typing import Union, get_args, get_origin
 
 from pydantic import BaseModel
@@ -7,11 +8,17 @@ from pydantic import BaseModel
 
 def get_text_fields(schema_class: type[BaseModel]) -> list[str]:
     """Get all string fields from a Pydantic schema class."""
-    return [
+    return list(_text_fields(schema_class))
+
+
+@lru_cache(maxsize=256)
+def _text_fields(schema_class: type[BaseModel]) -> tuple[str, ...]:
+    # Schema classes don't change, so their text fields are computed once
+    return tuple(
         field_name
         for field_name, field_info in schema_class.model_fields.items()
         if is_text_field(field_info.annotation)
-    ]
+    )
 
 
 def is_text_field(annotation) -> bool:
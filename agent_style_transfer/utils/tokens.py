@@ -0,0 +1,115 @@
+"""Local token estimation helpers.
+
+These are cheap heuristics (roughly four characters per token for English
+prose) used for budgeting, not exact provider token counts.
+"""
+
+import math
+import re
+from typing import Any
+
+CHARS_PER_TOKEN = 4
+TOKENS_PER_WORD = 4 / 3
+
+# Appended to text shortened by truncate_to_tokens
+TRUNCATION_MARKER = " [...]"
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def estimate_tokens(text: str | None) -> int:
+    """Estimate the number of tokens in ``text``."""
+    if not text:
+        return 0
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str | None, max_tokens: int) -> str:
+    """Shorten ``text`` to about ``max_tokens`` tokens at a sentence boundary.
+
+    Whole sentences are kept from the start of the text. If not even the
+    first sentence fits, the text is cut at the last word boundary instead.
+    Shortened text ends with :data:`TRUNCATION_MARKER`.
+    """
+    if not text or estimate_tokens(text) <= max_tokens:
+        return text or ""
+
+    max_chars = max_tokens * CHARS_PER_TOKEN - len(TRUNCATION_MARKER)
+    if max_chars <= 0:
+        return ""
+
+    kept = ""
+    for match in _SENTENCE_END.finditer(text):
+        if match.start() > max_chars:
+            break
+        kept = text[: match.start()]
+    if not kept:
+        # Not even one sentence fits, cut at a word boundary
+        head = text[:max_chars]
+        kept = head.rsplit(None, 1)[0] if " " in head.strip() else head
+
+    return kept.rstrip() + TRUNCATION_MARKER
+
+
+def chunk_text(text: str | None, chunk_tokens: int) -> list[str]:
+    """Split ``text`` into chunks of about ``chunk_tokens`` tokens.
+
+    Chunks are packed from whole paragraphs; a paragraph larger than a chunk
+    is split between sentences, and a sentence larger than a chunk between
+    words.
+    """
+    if not text or not text.strip():
+        return []
+    if chunk_tokens < 1:
+        raise ValueError("chunk_tokens must be at least 1")
+
+    pieces = []
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        if estimate_tokens(paragraph) <= chunk_tokens:
+            pieces.append((paragraph, "\n\n"))
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            if estimate_tokens(sentence) <= chunk_tokens:
+                pieces.append((sentence, " "))
+            else:
+                pieces.extend((word, " ") for word in sentence.split())
+        pieces[-1] = (pieces[-1][0], "\n\n")
+
+    chunks = []
+    current = ""
+    for piece, separator in pieces:
+        candidate = current + piece
+        if current and estimate_tokens(candidate) > chunk_tokens:
+            chunks.append(current.strip())
+            candidate = piece
+        current = candidate + separator
+    if current.strip():
+        chunks.append(current.strip())
+    return chunks
+
+
+def words_to_tokens(words: int) -> int:
+    """Estimate the number of tokens needed for ``words`` words."""
+    return math.ceil(words * TOKENS_PER_WORD)
+
+
+def estimate_input_tokens(model_input: Any) -> int:
+    """Estimate tokens for a chat model input (string, messages or prompt value)."""
+    if isinstance(model_input, str):
+        return estimate_tokens(model_input)
+    if hasattr(model_input, "to_messages"):
+        model_input = model_input.to_messages()
+    if isinstance(model_input, list | tuple):
+        return sum(estimate_input_tokens(item) for item in model_input)
+    if isinstance(model_input, dict):
+        return estimate_input_tokens(model_input.get("content", ""))
+    content = getattr(model_input, "content", None)
+    if isinstance(content, str):
+        return estimate_tokens(content)
+    if isinstance(content, list):
+        return sum(
+            estimate_tokens(part if isinstance(part, str) else part.get("text", ""))
+            for part in content
+        )
+    return estimate_tokens(str(model_input))
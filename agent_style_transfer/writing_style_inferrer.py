@@ -1,7 +1,186 @@
 """Writing style inference utilities for extracting style rules and examples from documents."""
 
+import asyncio
+import json
+import logging
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from pydantic import ValidationError
+
 from agent_style_transfer.llm_provider_setup import get_llm
-from agent_style_transfer.schemas import Document, FewShotExample
+from agent_style_transfer.schemas import Document, FewShotExample, WritingStyle
+from agent_style_transfer.single_flight import acoalesce, coalesce, llm_call_key
+from agent_style_transfer.sync_adapter import ainvoke_model
+from agent_style_transfer.utils.content_extractor import response_text
+
+logger = logging.getLogger(__name__)
+
+# Default cap on concurrent per-document LLM calls
+DEFAULT_MAX_CONCURRENCY = 5
+
+# Temperature of the inference calls
+INFERENCE_TEMPERATURE = 0.3
+
+# Bump whenever the inference prompts or parsing change, to invalidate caches
+INFERENCE_PROMPT_VERSION = "4"
+
+# Characters of each document shown to the combined style inference call
+DOCUMENT_EXCERPT_CHARS = 500
+
+# Most style rules a WritingStyle holds
+MAX_STYLE_RULES = 10
+
+
+def infer_writing_style(
+    content: str | list[Document],
+    provider: str = "google_genai",
+    model: str = None,
+    batch_size: int | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    measurements: dict[str, Any] | None = None,
+) -> WritingStyle | None:
+    """
+    Infer a complete writing style from documents with one structured call.
+
+    Tone, formality, sentence structure, vocabulary, personality traits,
+    style rules and one few-shot example per document all come from a single
+    ``WritingStyle`` structured output, with every document shown the same
+    way. For very large persona sets, ``batch_size`` splits the documents
+    into batches inferred concurrently and merged with
+    :func:`merge_writing_styles`.
+
+    Args:
+        content: Text to analyze, or the reference documents of a persona
+        provider: LLM provider (openai, anthropic, google_genai)
+        model: Model name (optional, uses provider default)
+        batch_size: Maximum number of documents per call. None puts every
+            document in one call.
+        max_concurrency: Maximum number of batch calls in flight at once
+        measurements: Locally measured statistics of the documents (see
+            :mod:`agent_style_transfer.stylometry`), shown to the model to
+            ground its estimates
+
+    Returns:
+        The inferred writing style, or None if there is no content to analyze
+        or the model returned no valid style
+    """
+    batches = _inference_batches(content, batch_size)
+    if not batches:
+        return None
+
+    llm = _bind_writing_style(
+        get_llm(provider, model, temperature=INFERENCE_TEMPERATURE)
+    )
+
+    def analyze(excerpts: list[tuple[str, str]]) -> WritingStyle | None:
+        prompt = _build_writing_style_prompt(excerpts, measurements)
+        response = coalesce(
+            _inference_key("writing_style", provider, model, prompt),
+            lambda: llm.invoke(prompt),
+        )
+        return _parse_writing_style(response)
+
+    if len(batches) == 1:
+        styles = [analyze(batches[0])]
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            styles = list(executor.map(analyze, batches))
+
+    return merge_writing_styles(styles, [len(batch) for batch in batches])
+
+
+async def ainfer_writing_style(
+    content: str | list[Document],
+    provider: str = "google_genai",
+    model: str = None,
+    batch_size: int | None = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    measurements: dict[str, Any] | None = None,
+) -> WritingStyle | None:
+    """Async version of :func:`infer_writing_style` that does not block the loop."""
+    batches = _inference_batches(content, batch_size)
+    if not batches:
+        return None
+
+    llm = _bind_writing_style(
+        get_llm(provider, model, temperature=INFERENCE_TEMPERATURE)
+    )
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def analyze(excerpts: list[tuple[str, str]]) -> WritingStyle | None:
+        prompt = _build_writing_style_prompt(excerpts, measurements)
+        async with semaphore:
+            response = await acoalesce(
+                _inference_key("writing_style", provider, model, prompt),
+                lambda: ainvoke_model(llm, prompt),
+            )
+        return _parse_writing_style(response)
+
+    styles = await asyncio.gather(*(analyze(batch) for batch in batches))
+
+    return merge_writing_styles(styles, [len(batch) for batch in batches])
+
+
+def merge_writing_styles(
+    styles: list[WritingStyle | None], weights: list[float] | None = None
+) -> WritingStyle | None:
+    """
+    Merge writing styles inferred from different batches of documents.
+
+    The most common tone, sentence structure and vocabulary level win (the
+    earliest on ties) and formality is averaged by ``weights`` (e.g. the
+    documents behind each style). Traits, patterns and rules are combined
+    without duplicates, earlier styles first; examples are concatenated.
+
+    Args:
+        styles: Styles to merge; None entries are skipped
+        weights: Weight of each style. Defaults to equal weights.
+
+    Returns:
+        The merged style, or None if no style is given
+    """
+    weighted = [
+        (style, weight)
+        for style, weight in zip(styles, weights or [1] * len(styles))
+        if style is not None
+    ]
+    if not weighted:
+        return None
+    if len(weighted) == 1:
+        return weighted[0][0]
+
+    def most_common(field: str) -> str:
+        votes = Counter()
+        for style, weight in weighted:
+            votes[getattr(style, field)] += weight
+        return max(votes, key=votes.get)
+
+    total_weight = sum(weight for _, weight in weighted) or len(weighted)
+    writing_patterns = {}
+    for style, _ in reversed(weighted):
+        writing_patterns.update(style.writing_patterns)
+
+    return WritingStyle(
+        tone=most_common("tone"),
+        formality_level=sum(
+            style.formality_level * weight for style, weight in weighted
+        )
+        / total_weight,
+        sentence_structure=most_common("sentence_structure"),
+        vocabulary_level=most_common("vocabulary_level"),
+        personality_traits=_unique(
+            trait for style, _ in weighted for trait in style.personality_traits
+        ),
+        writing_patterns=writing_patterns,
+        style_rules=_unique(
+            rule for style, _ in weighted for rule in style.style_rules
+        )[:MAX_STYLE_RULES],
+        few_shot_examples=[
+            example for style, _ in weighted for example in style.few_shot_examples
+        ],
+    )
 
 
 def infer_style_rules(
@@ -18,11 +197,233 @@ def infer_style_rules(
     Returns:
         List of style rules inferred from the documents
     """
-    if not documents:
+    prompt = _build_style_rules_prompt(documents)
+    if prompt is None:
+        return []
+
+    # Get LLM instance
+    llm = get_llm(provider, model, temperature=INFERENCE_TEMPERATURE)
+
+    # Concurrent identical inferences share one call
+    response = coalesce(
+        _inference_key("style_rules", provider, model, prompt),
+        lambda: llm.invoke(prompt),
+    )
+
+    return _parse_style_rules(response_text(response))
+
+
+async def ainfer_style_rules(
+    documents: list[Document], provider: str = "google_genai", model: str = None
+) -> list[str]:
+    """Async version of :func:`infer_style_rules` that does not block the loop."""
+    prompt = _build_style_rules_prompt(documents)
+    if prompt is None:
+        return []
+
+    llm = get_llm(provider, model, temperature=INFERENCE_TEMPERATURE)
+
+    response = await acoalesce(
+        _inference_key("style_rules", provider, model, prompt),
+        lambda: ainvoke_model(llm, prompt),
+    )
+
+    return _parse_style_rules(response_text(response))
+
+
+def infer_few_shot_examples(
+    documents: list[Document],
+    provider: str = "google_genai",
+    model: str = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[FewShotExample]:
+    """
+    Infer few-shot examples from a list of documents using LLM analysis.
+
+    Documents are analyzed concurrently on a thread pool; examples are returned
+    in the same order as their source documents.
+
+    Args:
+        documents: List of reference documents to analyze
+        provider: LLM provider (openai, anthropic, google_genai)
+        model: Model name (optional, uses provider default)
+        max_concurrency: Maximum number of LLM calls in flight at once
+
+    Returns:
+        List of few-shot examples inferred from the documents
+    """
+    usable_docs = [doc for doc in documents or [] if doc.title and doc.content]
+    if not usable_docs:
         return []
 
     # Get LLM instance
-    llm = get_llm(provider, model, temperature=0.3)
+    llm = get_llm(provider, model, temperature=INFERENCE_TEMPERATURE)
+
+    def analyze(doc: Document) -> FewShotExample | None:
+        prompt = _build_few_shot_prompt(doc)
+        response = coalesce(
+            _inference_key("few_shot", provider, model, prompt),
+            lambda: llm.invoke(prompt),
+        )
+        return _parse_few_shot_example(response_text(response))
+
+    # Analyze each document to create meaningful examples
+    with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+        results = list(executor.map(analyze, usable_docs))
+
+    return [example for example in results if example]
+
+
+async def ainfer_few_shot_examples(
+    documents: list[Document],
+    provider: str = "google_genai",
+    model: str = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+) -> list[FewShotExample]:
+    """Async version of :func:`infer_few_shot_examples` that does not block the loop.
+
+    At most ``max_concurrency`` documents are analyzed at the same time.
+    """
+    usable_docs = [doc for doc in documents or [] if doc.title and doc.content]
+    if not usable_docs:
+        return []
+
+    llm = get_llm(provider, model, temperature=INFERENCE_TEMPERATURE)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def analyze(doc: Document) -> FewShotExample | None:
+        prompt = _build_few_shot_prompt(doc)
+        async with semaphore:
+            response = await acoalesce(
+                _inference_key("few_shot", provider, model, prompt),
+                lambda: ainvoke_model(llm, prompt),
+            )
+        return _parse_few_shot_example(response_text(response))
+
+    results = await asyncio.gather(*(analyze(doc) for doc in usable_docs))
+
+    return [example for example in results if example]
+
+
+def _inference_key(
+    operation: str, provider: str, model: str | None, prompt: str
+) -> str:
+    return llm_call_key(
+        operation,
+        provider,
+        model,
+        prompt,
+        temperature=INFERENCE_TEMPERATURE,
+        prompt_version=INFERENCE_PROMPT_VERSION,
+    )
+
+
+def _inference_batches(
+    content: str | list[Document], batch_size: int | None
+) -> list[list[tuple[str, str]]]:
+    """Split the (title, excerpt) pairs of ``content`` into inference batches."""
+    if isinstance(content, str):
+        excerpts = [("Untitled", _excerpt(content))] if content.strip() else []
+    else:
+        excerpts = [
+            (doc.title or "Untitled", _excerpt(doc.content))
+            for doc in content or []
+            if doc.content and doc.content.strip()
+        ]
+
+    size = max(1, batch_size) if batch_size else max(1, len(excerpts))
+    return [excerpts[i : i + size] for i in range(0, len(excerpts), size)]
+
+
+def _excerpt(text: str) -> str:
+    if len(text) <= DOCUMENT_EXCERPT_CHARS:
+        return text
+    return text[:DOCUMENT_EXCERPT_CHARS] + "..."
+
+
+def _build_writing_style_prompt(
+    excerpts: list[tuple[str, str]], measurements: dict[str, Any] | None = None
+) -> str:
+    """Build the prompt inferring a complete writing style in one call."""
+    documents = "\n\n".join(
+        f"Title: {title}\nContent: {excerpt}" for title, excerpt in excerpts
+    )
+    measured = ""
+    if measurements:
+        measured = "\n    Measured statistics of the full documents:\n" + "".join(
+            f"    - {key}: {value}\n" for key, value in measurements.items()
+        )
+    return f"""
+    Analyze the writing style shared by these documents.
+
+    Documents:
+    {documents}
+{measured}
+    Describe the overall tone, the formality level from 0.0 (very casual) to
+    1.0 (very formal), the sentence structure, the vocabulary level, the
+    personality traits and any notable writing patterns.
+
+    Add 3-5 specific, actionable style rules covering tone, structure,
+    vocabulary and writing patterns.
+
+    Add one few-shot example per document: a generic topic as the input and
+    a concise output (100-200 words) written in the same style.
+    """
+
+
+def _bind_writing_style(llm):
+    """Force ``llm`` to answer with a ``WritingStyle`` tool call."""
+    return llm.bind_tools([WritingStyle], tool_choice=WritingStyle.__name__)
+
+
+def _parse_writing_style(message) -> WritingStyle | None:
+    """Validate the ``WritingStyle`` tool call of a model response."""
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        if tool_call["name"] != WritingStyle.__name__:
+            continue
+        args = dict(tool_call["args"])
+        # Models tend to go over the rule limit; keep the first ones
+        args["style_rules"] = list(args.get("style_rules") or [])[:MAX_STYLE_RULES]
+        args["writing_patterns"] = _coerce_patterns(args.get("writing_patterns"))
+        try:
+            return WritingStyle.model_validate(args)
+        except ValidationError as e:
+            logger.warning("Discarding invalid inferred WritingStyle: %s", e)
+            return None
+    return None
+
+
+def _coerce_patterns(patterns: Any) -> dict[str, Any]:
+    """Turn the ``writing_patterns`` a model sent back into a dict.
+
+    Some providers (e.g. Gemini) convert the free-form dict field of the
+    tool schema to a string, so the patterns can come back as JSON text or
+    plain prose; prose is kept under ``"notes"``.
+    """
+    if isinstance(patterns, dict):
+        return patterns
+    if isinstance(patterns, str):
+        try:
+            decoded = json.loads(patterns)
+        except ValueError:
+            decoded = None
+        if isinstance(decoded, dict):
+            return decoded
+        return {"notes": patterns} if patterns.strip() else {}
+    if isinstance(patterns, list) and patterns:
+        return {"notes": patterns}
+    return {}
+
+
+def _unique(items) -> list:
+    """Return ``items`` without duplicates, keeping the first occurrence."""
+    return list(dict.fromkeys(items))
+
+
+def _build_style_rules_prompt(documents: list[Document]) -> str | None:
+    """Build the style rules prompt, or None if no document has usable content."""
+    if not documents:
+        return None
 
     # Combine document content for analysis
     combined_content = "\n\n".join(
@@ -34,10 +435,10 @@ def infer_style_rules(
     )
 
     if not combined_content:
-        return []
+        return None
 
     # Create a prompt to analyze writing style patterns
-    prompt = (
+    return (
         """
     Analyze these documents and extract 3-5 specific writing style rules.
 
@@ -55,31 +456,32 @@ def infer_style_rules(
     """
     )
 
-    response = llm.invoke(prompt)
 
-    # Handle different response types
-    if isinstance(response, dict):
-        # If response is a dict, extract content from common keys
-        content = response.get("content", response.get("text", str(response)))
-    elif hasattr(response, "content"):
-        content = response.content
-    else:
-        content = str(response)
-
-    # Ensure content is always a string
-    if isinstance(content, list):
-        content = content[0] if content else ""
-    elif isinstance(content, dict):
-        # Extract text from common response dict keys
-        content = content.get("text", content.get("content", str(content)))
-    elif not isinstance(content, str):
-        content = str(content)
-
-    # Final safety check - ensure we have a string
-    if not isinstance(content, str):
-        content = str(content)
-
-    # Parse the response to extract rules
+def _build_few_shot_prompt(doc: Document) -> str:
+    """Build the prompt that turns one document into a few-shot example."""
+    return (
+        """
+            Analyze this document and create a few-shot example that demonstrates its writing style.
+
+            Document Title: """
+        + f"{doc.title}\n"
+        + "Document Content: "
+        + f"{doc.content[:500]}...\n\n"
+        + """
+            Create a simple input-output pair that shows how to write in this style.
+            The input should be a generic topic, and the output should demonstrate the same writing style.
+
+            Format your response as:
+            Input: [generic topic]
+            Output: [content in the same style]
+
+            Keep the output concise (100-200 words) and focus on capturing the writing style.
+            """
+    )
+
+
+def _parse_style_rules(content: str) -> list[str]:
+    """Parse a bulleted list of style rules."""
     rules = []
     for line in content.split("\n"):
         line = line.strip()
@@ -91,88 +493,18 @@ def infer_style_rules(
     return rules
 
 
-def infer_few_shot_examples(
-    documents: list[Document], provider: str = "google_genai", model: str = None
-) -> list[FewShotExample]:
-    """
-    Infer few-shot examples from a list of documents using LLM analysis.
-
-    Args:
-        documents: List of reference documents to analyze
-        provider: LLM provider (openai, anthropic, google_genai)
-        model: Model name (optional, uses provider default)
+def _parse_few_shot_example(content: str) -> FewShotExample | None:
+    """Parse an ``Input:``/``Output:`` pair into a few-shot example."""
+    input_text = ""
+    output_text = ""
 
-    Returns:
-        List of few-shot examples inferred from the documents
-    """
-    if not documents:
-        return []
-
-    # Get LLM instance
-    llm = get_llm(provider, model, temperature=0.3)
-
-    examples = []
-
-    # Analyze each document to create meaningful examples
-    for doc in documents:
-        if doc.title and doc.content:
-            # Create a prompt to analyze the writing style
-            prompt = (
-                """
-            Analyze this document and create a few-shot example that demonstrates its writing style.
-
-            Document Title: """
-                + f"{doc.title}\n"
-                + "Document Content: "
-                + f"{doc.content[:500]}...\n\n"
-                + """
-            Create a simple input-output pair that shows how to write in this style.
-            The input should be a generic topic, and the output should demonstrate the same writing style.
-
-            Format your response as:
-            Input: [generic topic]
-            Output: [content in the same style]
+    for line in content.split("\n"):
+        if line.strip().startswith("Input:"):
+            input_text = line.replace("Input:", "").strip()
+        elif line.strip().startswith("Output:"):
+            output_text = line.replace("Output:", "").strip()
 
-            Keep the output concise (100-200 words) and focus on capturing the writing style.
-            """
-            )
+    if input_text and output_text:
+        return FewShotExample(input=input_text, output=output_text)
 
-            response = llm.invoke(prompt)
-
-            # Handle different response types
-            if isinstance(response, dict):
-                # If response is a dict, extract content from common keys
-                content = response.get("content", response.get("text", str(response)))
-            elif hasattr(response, "content"):
-                content = response.content
-            else:
-                content = str(response)
-
-            # Ensure content is always a string
-            if isinstance(content, list):
-                content = content[0] if content else ""
-            elif isinstance(content, dict):
-                # Extract text from common response dict keys
-                content = content.get("text", content.get("content", str(content)))
-            elif not isinstance(content, str):
-                content = str(content)
-
-            # Final safety check - ensure we have a string
-            if not isinstance(content, str):
-                content = str(content)
-
-            # Parse the response to extract input and output
-            lines = content.split("\n")
-            input_text = ""
-            output_text = ""
-
-            for line in lines:
-                if line.strip().startswith("Input:"):
-                    input_text = line.replace("Input:", "").strip()
-                elif line.strip().startswith("Output:"):
-                    output_text = line.replace("Output:", "").strip()
-
-            if input_text and output_text:
-                examples.append(FewShotExample(input=input_text, output=output_text))
-
-    return examples
+    return None
@@ -7,8 +7,8 @@ import asyncio
 import json
 from pathlib import Path
 
-from agent_style_transfer.agent import transfer_style
-from agent_style_transfer.evaluation import evaluate
+# The agent and evaluation modules are imported where they are used so the
+# menus show up without waiting for the model integrations to load
 from agent_style_transfer.schemas import StyleTransferRequest, StyleTransferResponse
 
 
@@ -18,8 +18,9 @@ def get_operation_choice():
     print("1. Generate content only (default)")
     print("2. Evaluate existing content only")
     print("3. Generate content and evaluate")
+    print("4. Generate content for every request file (batch)")
 
-    choice = input("Operation (1-3, default=1): ").strip() or "1"
+    choice = input("Operation (1-4, default=1): ").strip() or "1"
     return choice
 
 
@@ -248,6 +249,8 @@ async def generate_content(
     """Generate content using the style transfer agent."""
     print(f"\n🚀 Processing with {provider}/{model} (temp: {temperature})...")
 
+    from agent_style_transfer.agent import transfer_style
+
     try:
         responses = await transfer_style(request, provider, model, temperature)
         return responses
@@ -256,6 +259,43 @@ async def generate_content(
         return []
 
 
+async def generate_batch(directory: str):
+    """Generate content for every request file in a directory as one batch."""
+    requests = []
+    names = []
+    for file_path in list_json_files(directory, "request"):
+        json_data = load_json_file(str(file_path))
+        request = parse_style_transfer_request(json_data) if json_data else None
+        if request:
+            requests.append(request)
+            names.append(file_path.name)
+
+    if not requests:
+        print(f"❌ No valid request files found in {directory}")
+        return
+
+    provider = get_provider_choice()
+    model = get_model_choice(provider)
+    temperature = get_temperature_choice()
+
+    print(
+        f"\n🚀 Processing {len(requests)} request(s) with "
+        f"{provider}/{model} (temp: {temperature})..."
+    )
+
+    from agent_style_transfer.agent import transfer_style_batch
+
+    try:
+        results = await transfer_style_batch(requests, provider, model, temperature)
+    except Exception as e:
+        print(f"❌ Error generating content: {e}")
+        return
+
+    for name, responses in zip(names, results):
+        print(f"\n📄 {name}")
+        display_responses(responses)
+
+
 def evaluate_content(
     request: StyleTransferRequest,
     responses: list[StyleTransferResponse],
@@ -265,6 +305,8 @@ def evaluate_content(
     """Evaluate generated content."""
     print(f"\n🔍 Evaluating content with {eval_provider}/{eval_model}...")
 
+    from agent_style_transfer.evaluation import evaluate
+
     try:
         batch_results = evaluate(request, responses, eval_provider, eval_model)
         return batch_results
@@ -413,6 +455,10 @@ async def main():
     # Select directory once at the beginning
     directory = get_directory_choice()
 
+    if operation == "4":
+        await generate_batch(directory)
+        return
+
     # Get input file based on operation
     if operation == "2":
         # Evaluation only - need file with responses
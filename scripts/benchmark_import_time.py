@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Measure the cold import time of the package and the CLI.
+
+Every sample imports the module in a fresh interpreter, so nothing is cached
+in ``sys.modules``. With ``--top`` the slowest modules of one
+``python -X importtime`` run are listed as well, and ``--budget`` makes the
+script fail when a median is over the given number of milliseconds.
+
+Usage: python scripts/benchmark_import_time.py [--repeat 5] [--top 10]
+       [--budget MS] [module ...]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MODULES = ["agent_style_transfer", "main"]
+
+
+def time_import(module: str) -> float:
+    """Return the seconds a fresh interpreter takes to import ``module``."""
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def interpreter_startup() -> float:
+    """Return the seconds an empty interpreter takes to start, for reference."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def slowest_imports(module: str, top: int) -> list[tuple[int, str]]:
+    """Return the ``top`` modules with the highest cumulative import time (us)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        timings.append((int(cumulative), name.strip()))
+    return sorted(timings, reverse=True)[:top]
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5, help="samples per module")
+    parser.add_argument(
+        "--top", type=int, default=0, help="list the N slowest nested imports"
+    )
+    parser.add_argument(
+        "--budget", type=float, help="fail if a median is over this many ms"
+    )
+    args = parser.parse_args()
+
+    print(f"🐍 Interpreter startup: {interpreter_startup() * 1000:.0f} ms")
+
+    over_budget = []
+    for module in args.modules:
+        samples = [time_import(module) * 1000 for _ in range(args.repeat)]
+        median = statistics.median(samples)
+        print(
+            f"⏱️  import {module}: median {median:.0f} ms "
+            f"(min {min(samples):.0f} ms, max {max(samples):.0f} ms, "
+            f"{args.repeat} runs)"
+        )
+        for cumulative, name in slowest_imports(module, args.top):
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        if args.budget is not None and median > args.budget:
+            over_budget.append(module)
+
+    if over_budget:
+        print(f"❌ Over the {args.budget:.0f} ms budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
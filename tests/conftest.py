@@ -1,15 +1,237 @@
 """Pytest configuration for evaluator tests."""
 
+import asyncio
 import json
 import os
+import time
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
 import pytest
 from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
 
 from agent_style_transfer.schemas import StyleTransferRequest, StyleTransferResponse
 
+FAKE_INFERENCE_TEXT = """- Use short, punchy sentences
+- Address the reader directly
+Input: Remote work
+Output: Remote work isn't a perk. It's a skill. Learn it."""
+
+FAKE_SCHEMA_ARGS = {
+    "TweetSingle": {"text": "Fake tweet #AI", "url_allowed": True},
+    "TweetThread": {"tweets": [{"text": "First"}, {"text": "Second"}]},
+    "LinkedInPost": {"text": "Fake LinkedIn post"},
+    "LinkedInComment": {"text": "Fake comment"},
+    "BlogPost": {"title": "Fake title", "markdown": "# Fake\n\nBody text."},
+    "WritingStyle": {
+        "tone": "direct",
+        "formality_level": 0.3,
+        "sentence_structure": "short",
+        "vocabulary_level": "simple",
+        "personality_traits": ["confident"],
+        "style_rules": ["Use short, punchy sentences", "Address the reader directly"],
+        "few_shot_examples": [
+            {
+                "input": "Remote work",
+                "output": "Remote work isn't a perk. It's a skill. Learn it.",
+            }
+        ],
+    },
+}
+
+
+class FakeToolChatModel(BaseChatModel):
+    """Offline chat model answering plain prompts and function calls.
+
+    Plain prompts get ``text`` back (or what ``reply`` builds from the
+    messages); tool-bound calls get a tool call whose arguments come from
+    ``tool_args`` keyed by the tool (schema) name.
+
+    Calls block for ``delay`` seconds, or ``delays`` keyed by tool name
+    (``None`` for plain prompts). ``errors`` are raised, one per call, before
+    any answer. Tool calls given fewer ``max_tokens`` than ``needs_tokens``
+    are cut off; ``stop_reason`` and ``usage`` are reported on every answer.
+    """
+
+    text: str = FAKE_INFERENCE_TEXT
+    reply: Callable[[list], str] | None = None
+    tool_args: dict[str, dict] = Field(default_factory=lambda: dict(FAKE_SCHEMA_ARGS))
+    calls: list[list] = Field(default_factory=list)
+    max_tokens_seen: list[int | None] = Field(default_factory=list)
+    stream_chunk_size: int = 8
+    temperature: float | None = None
+    delay: float = 0.0
+    delays: dict[str | None, float] = Field(default_factory=dict)
+    errors: list[Any] = Field(default_factory=list)
+    needs_tokens: int | None = None
+    stop_reason: str | None = None
+    usage: dict | None = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-tool-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model": "fake", "temperature": self.temperature}
+
+    @property
+    def text_calls(self) -> int:
+        return sum(1 for _, tools in self.calls if not tools)
+
+    @property
+    def tool_calls(self) -> int:
+        return sum(1 for _, tools in self.calls if tools)
+
+    @property
+    def inference_calls(self) -> int:
+        """Structured style inference calls."""
+        return sum(1 for _, tools in self.calls if _tool_name(tools) == "WritingStyle")
+
+    @property
+    def generation_calls(self) -> int:
+        """Tool calls other than style inference."""
+        return self.tool_calls - self.inference_calls
+
+    def bind_tools(self, tools, *, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        delay = self._delay(kwargs.get("tools"))
+        if delay:
+            time.sleep(delay)
+        return self._respond(messages, **kwargs)
+
+    def _delay(self, tools) -> float:
+        return self.delays.get(_tool_name(tools), self.delay)
+
+    def _respond(self, messages, **kwargs) -> ChatResult:
+        if self.errors:
+            raise self.errors.pop(0)
+        tools = kwargs.get("tools")
+        max_tokens = kwargs.get("max_tokens")
+        self.calls.append([messages, tools])
+        self.max_tokens_seen.append(max_tokens)
+        if tools:
+            name = tools[0]["function"]["name"]
+            message = AIMessage(
+                content="",
+                tool_calls=[
+                    {"name": name, "args": self.tool_args.get(name, {}), "id": "c0"}
+                ],
+            )
+        else:
+            text = self.reply(messages) if self.reply else self.text
+            message = AIMessage(content=text)
+
+        stop_reason = self.stop_reason
+        cut_off = self.needs_tokens is not None and max_tokens is not None
+        if cut_off and max_tokens < self.needs_tokens:
+            message.tool_calls = []
+            stop_reason = "max_tokens"
+        if stop_reason:
+            message.response_metadata["stop_reason"] = stop_reason
+        if self.usage:
+            message.usage_metadata = dict(self.usage)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        message = self._generate(messages, stop=stop, **kwargs).generations[0].message
+        if not message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=message.content))
+            return
+
+        tool_call = message.tool_calls[0]
+        args = json.dumps(tool_call["args"])
+        size = self.stream_chunk_size
+        for start in range(0, len(args), size):
+            first = start == 0
+            tool_chunk = {
+                "name": tool_call["name"] if first else None,
+                "args": args[start : start + size],
+                "id": tool_call["id"] if first else None,
+                "index": 0,
+            }
+            yield ChatGenerationChunk(
+                message=AIMessageChunk(content="", tool_call_chunks=[tool_chunk])
+            )
+
+
+class AsyncFakeChatModel(FakeToolChatModel):
+    """Fake model with a native async path that waits without blocking.
+
+    Tracks how many calls overlap and how many were cancelled while waiting.
+    """
+
+    in_flight: int = 0
+    max_in_flight: int = 0
+    cancelled: int = 0
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self._delay(kwargs.get("tools")))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        return self._respond(messages, **kwargs)
+
+
+def _tool_name(tools) -> str | None:
+    return tools[0]["function"]["name"] if tools else None
+
+
+class FakeClock:
+    """Manually advanced clock for code that takes a ``clock`` callable."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def make_fake_llm(monkeypatch) -> Callable[..., FakeToolChatModel]:
+    """Return a factory routing every ``get_llm`` call to a new fake model.
+
+    The factory takes the fake model class and its fields.
+    """
+
+    def make(
+        model_class: type[FakeToolChatModel] = FakeToolChatModel, **fields
+    ) -> FakeToolChatModel:
+        llm = model_class(**fields)
+
+        def fake_get_llm(*args, **kwargs):
+            return llm
+
+        for module in (
+            "agent_style_transfer.agent",
+            "agent_style_transfer.long_input",
+            "agent_style_transfer.writing_style_inferrer",
+            "agent_style_transfer.utils.evaluation",
+        ):
+            monkeypatch.setattr(f"{module}.get_llm", fake_get_llm)
+        return llm
+
+    return make
+
+
+@pytest.fixture
+def fake_llm(make_fake_llm) -> FakeToolChatModel:
+    """Route every ``get_llm`` call in the package to one offline fake model."""
+    return make_fake_llm()
+
 
 @pytest.fixture(scope="session")
 def vcr_config() -> dict[str, Any]:
@@ -5,8 +5,18 @@ import json
 
 import pytest
 
-from agent_style_transfer.agent import transfer_style
-from agent_style_transfer.schemas import StyleTransferRequest
+from agent_style_transfer.agent import (
+    transfer_style,
+    transfer_style_batch,
+    transfer_style_stream,
+    transfer_style_stream_events,
+)
+from agent_style_transfer.schemas import (
+    OutputSchema,
+    OutputType,
+    StyleTransferRequest,
+)
+from tests.conftest import AsyncFakeChatModel, load_fixture
 
 
 @pytest.mark.vcr
@@ -87,3 +97,201 @@ async def test_linkedin_fullstack_skills():
         assert "schema_name" in response.metadata
         assert response.metadata["reference_styles_count"] == 1
         assert response.metadata["target_documents_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_reference_styles_inferred_once_per_request(fake_llm):
+    """Style inference runs once per request, not once per target schema."""
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    request.target_schemas.append(
+        OutputSchema(name="Blog", output_type=OutputType.BLOG_POST)
+    )
+    documents = request.reference_style[0].documents
+
+    responses = await transfer_style(request, "anthropic")
+
+    assert len(responses) == 2
+    # One structured call infers the whole style, whatever the document count
+    assert len(documents) > 1
+    assert fake_llm.inference_calls == 1
+    assert fake_llm.generation_calls == 2
+    # The request itself is not mutated by the inference pre-pass
+    assert request.reference_style[0].style_definition is None
+
+
+@pytest.mark.asyncio
+async def test_transfer_style_batch(fake_llm):
+    """Batch results keep request and schema order."""
+    requests = [
+        load_fixture("document-based-request", model=StyleTransferRequest),
+        load_fixture("tweet-and-blog-request", model=StyleTransferRequest),
+    ]
+
+    results = await transfer_style_batch(requests, "anthropic", max_concurrency=2)
+
+    assert [len(responses) for responses in results] == [1, 2]
+    for request, responses in zip(requests, results):
+        assert [r.output_schema.name for r in responses] == [
+            s.name for s in request.target_schemas
+        ]
+    assert fake_llm.generation_calls == 3
+
+
+@pytest.mark.asyncio
+async def test_transfer_style_batch_isolates_failed_units(fake_llm):
+    """A failing schema is returned as an error; the other results survive."""
+    fake_llm.tool_args["BlogPost"] = {"title": "Missing markdown"}
+    requests = [
+        load_fixture("document-based-request", model=StyleTransferRequest),
+        load_fixture("tweet-and-blog-request", model=StyleTransferRequest),
+    ]
+
+    results = await transfer_style_batch(requests, "anthropic", max_concurrency=2)
+
+    [document_response], [tweet, blog] = results
+    assert document_response.status == tweet.status == "completed"
+    assert json.loads(tweet.processed_content)["text"] == "Fake tweet #AI"
+    assert blog.status == "error"
+    assert blog.processed_content == ""
+    assert blog.output_schema == requests[1].target_schemas[1]
+    assert "ValidationError" in blog.metadata["error"]
+
+
+@pytest.mark.asyncio
+async def test_transfer_style_stream_yields_in_completion_order(make_fake_llm):
+    """The fast tweet is yielded before the slow blog post."""
+    make_fake_llm(AsyncFakeChatModel, delays={"BlogPost": 0.05})
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    request.target_schemas.reverse()
+
+    responses = [r async for r in transfer_style_stream(request, "anthropic")]
+
+    assert [r.output_schema.output_type for r in responses] == [
+        OutputType.TWEET_SINGLE,
+        OutputType.BLOG_POST,
+    ]
+    assert [r.metadata["schema_index"] for r in responses] == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_transfer_style_stream_events(fake_llm):
+    """Blog markdown streams as deltas and thread tweets arrive one by one."""
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    request.target_schemas[0] = OutputSchema(
+        name="Thread", output_type=OutputType.TWEET_THREAD
+    )
+    fake_llm.stream_chunk_size = 3
+
+    events = [e async for e in transfer_style_stream_events(request, "anthropic")]
+
+    blog_index = next(
+        i for i, s in enumerate(request.target_schemas) if s.output_type == "blog_post"
+    )
+    markdown = "".join(
+        e.text
+        for e in events
+        if e.event == "delta" and e.field == "markdown" and e.schema_index == blog_index
+    )
+    tweets = [e.item for e in events if e.event == "item" and e.field == "tweets"]
+    finals = [e for e in events if e.event == "final"]
+
+    assert markdown == "# Fake\n\nBody text."
+    assert [tweet.text for tweet in tweets] == ["First", "Second"]
+    assert len(finals) == 2
+    assert {e.response.metadata["schema_index"] for e in finals} == {0, 1}
+
+
+@pytest.mark.asyncio
+async def test_combined_schemas_use_one_call(fake_llm):
+    """All schemas come from one call and are split back in request order."""
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    fake_llm.tool_args["CombinedOutput"] = {
+        "tweet_single_1": {"text": "Combined tweet"},
+        "blog_post_2": {"title": "Combined title", "markdown": "# Combined"},
+    }
+
+    responses = await transfer_style(request, "anthropic", combine_schemas=True)
+
+    assert fake_llm.tool_calls == 1
+    assert [r.output_schema.name for r in responses] == [
+        s.name for s in request.target_schemas
+    ]
+    assert json.loads(responses[0].processed_content)["text"] == "Combined tweet"
+    assert json.loads(responses[1].processed_content)["markdown"] == "# Combined"
+    assert {r.metadata["combined_schemas"] for r in responses} == {2}
+
+    # The shared sections are sent once, the guidance of every schema is sent
+    prompt = fake_llm.calls[-1][0][-1].content
+    assert prompt.count("## Reference Style Information") == 1
+    assert "`tweet_single_1`" in prompt and "`blog_post_2`" in prompt
+
+
+@pytest.mark.asyncio
+async def test_generation_is_capped_and_truncation_recorded(make_fake_llm):
+    """Schemas get their token limit, max_length overrides it."""
+    llm = make_fake_llm(stop_reason="max_tokens")
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    request.reference_style = []
+    request.target_schemas[0].max_length = None
+    request.target_schemas[1].max_length = 300
+
+    responses = await transfer_style(request, "anthropic")
+
+    assert sorted(llm.max_tokens_seen) == [150, 450]
+    assert [r.metadata["max_tokens"] for r in responses] == [150, 450]
+    assert all(r.metadata["truncated"] for r in responses)
+    assert {r.metadata["stop_reason"] for r in responses} == {"max_tokens"}
+
+
+@pytest.mark.asyncio
+async def test_cut_off_tool_call_is_retried_with_larger_cap(make_fake_llm):
+    """An incomplete tool call at the cap is retried once instead of failing."""
+    llm = make_fake_llm(needs_tokens=200)
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    request.reference_style = []
+    request.target_schemas = request.target_schemas[:1]
+    request.target_schemas[0].max_length = None
+
+    [response] = await transfer_style(request, "anthropic")
+
+    assert llm.max_tokens_seen == [150, 300]
+    assert json.loads(response.processed_content)["text"] == "Fake tweet #AI"
+    assert response.metadata["max_tokens"] == 300
+    assert response.metadata["truncation_retry"] is True
+    assert "truncated" not in response.metadata
+
+
+@pytest.mark.asyncio
+async def test_prompt_budget_reported_in_metadata(fake_llm):
+    """Budgeted prompts stay within the budget and report their size."""
+    request = load_fixture("enhanced-style-request", model=StyleTransferRequest)
+    request.target_content[0].content = "A sentence about the topic. " * 500
+
+    full = await transfer_style(request, "anthropic")
+    budgeted = await transfer_style(request, "anthropic", max_prompt_tokens=1000)
+
+    assert full[0].metadata["prompt_tokens"] > 1000
+    assert budgeted[0].metadata["prompt_tokens"] <= 1000
+
+
+@pytest.mark.asyncio
+async def test_prompt_caching_marks_prefix_and_reports_usage(make_fake_llm):
+    """The stable prefix gets a cache breakpoint and cache reads are reported."""
+    llm = make_fake_llm(
+        usage={
+            "input_tokens": 1200,
+            "output_tokens": 40,
+            "total_tokens": 1240,
+            "input_token_details": {"cache_read": 1000},
+        }
+    )
+    request = load_fixture("enhanced-style-request", model=StyleTransferRequest)
+
+    responses = await transfer_style(request, "anthropic", prompt_caching=True)
+
+    prefix, suffix = llm.calls[-1][0][-1].content
+    assert prefix["cache_control"] == {"type": "ephemeral"}
+    assert "## Reference Style Information" in prefix["text"]
+    assert request.target_content[0].title not in prefix["text"]
+    assert request.target_content[0].title in suffix["text"]
+    assert responses[0].metadata["usage"]["cached_input_tokens"] == 1000
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Unit tests for offline bulk jobs through provider batch APIs."""
+
+import json
+
+import pytest
+
+from agent_style_transfer.batch_jobs import (
+    BatchBackend,
+    LocalBatchBackend,
+    build_batch_payload,
+    collect_batch_results,
+    parse_batch_custom_id,
+    run_batch_job,
+    submit_batch_job,
+    wait_for_batch_job,
+)
+from agent_style_transfer.schemas import StyleTransferRequest
+from tests.conftest import load_fixture
+
+
+@pytest.fixture
+def requests() -> list[StyleTransferRequest]:
+    return [
+        load_fixture("document-based-request", model=StyleTransferRequest),
+        load_fixture("tweet-and-blog-request", model=StyleTransferRequest),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_openai_payload(fake_llm, requests):
+    payload = await build_batch_payload(requests, "openai", temperature=0)
+
+    assert len(payload) == sum(len(r.target_schemas) for r in requests)
+    line = payload[0]
+    assert parse_batch_custom_id(line["custom_id"]) == (0, 0)
+    assert line["url"] == "/v1/chat/completions"
+    body = line["body"]
+    assert body["model"] == "gpt-3.5-turbo"
+    assert [m["role"] for m in body["messages"]] == ["system", "user"]
+    assert body["tool_choice"]["function"]["name"] == (
+        body["tools"][0]["function"]["name"]
+    )
+    json.dumps(payload)
+
+
+@pytest.mark.asyncio
+async def test_anthropic_payload_with_prompt_caching(fake_llm, requests):
+    payload = await build_batch_payload(requests, "anthropic", prompt_caching=True)
+
+    params = payload[-1]["params"]
+    assert parse_batch_custom_id(payload[-1]["custom_id"]) == (1, 1)
+    assert params["tools"][0]["name"] == "BlogPost"
+    assert params["tool_choice"] == {"type": "tool", "name": "BlogPost"}
+    assert params["max_tokens"] > 0
+    prefix = params["messages"][0]["content"][0]
+    assert prefix["cache_control"] == {"type": "ephemeral"}
+
+
+def test_unsupported_provider_is_rejected(fake_llm, tmp_path):
+    with pytest.raises(ValueError):
+        LocalBatchBackend(tmp_path, fake_llm, provider="google_genai")
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class SubmitOnly(BatchBackend):
+        provider = "openai"
+
+        def submit(self, payload):
+            return "job"
+
+    with pytest.raises(TypeError):
+        SubmitOnly()
+
+
+@pytest.mark.parametrize("provider", ["openai", "anthropic"])
+@pytest.mark.asyncio
+async def test_local_backend_round_trip(fake_llm, requests, tmp_path, provider):
+    backend = LocalBatchBackend(tmp_path, fake_llm, provider=provider)
+
+    job, responses = await run_batch_job(requests, backend, poll_interval=0)
+
+    assert job.status == "completed"
+    assert job.errors == {}
+    assert [len(r) for r in responses] == [len(r.target_schemas) for r in requests]
+    tweet, blog = responses[1]
+    assert json.loads(tweet.processed_content)["text"] == "Fake tweet #AI"
+    assert json.loads(blog.processed_content)["title"] == "Fake title"
+    assert blog.metadata["batch_job_id"] == job.job_id
+    assert blog.output_schema == requests[1].target_schemas[1]
+
+
+@pytest.mark.asyncio
+async def test_failed_items_are_reported(fake_llm, requests, tmp_path):
+    fake_llm.tool_args["BlogPost"] = {"title": "Missing markdown"}
+    backend = LocalBatchBackend(tmp_path, fake_llm)
+
+    job = await submit_batch_job(requests, backend)
+    # The job is saved and collected from its serialized form
+    job = type(job).model_validate_json(job.model_dump_json())
+    await wait_for_batch_job(job, backend, poll_interval=0)
+    responses = collect_batch_results(job, backend)
+
+    assert responses[1][1] is None
+    assert list(job.errors) == ["request-1-schema-1"]
+    assert responses[1][0] is not None
+
+
+@pytest.mark.asyncio
+async def test_truncated_openai_arguments_are_reported(fake_llm, requests, tmp_path):
+    backend = LocalBatchBackend(tmp_path, fake_llm, provider="openai")
+    job = await submit_batch_job(requests, backend)
+    await wait_for_batch_job(job, backend, poll_interval=0)
+
+    # Cut the tool arguments of one result off as a max_tokens stop would
+    path = tmp_path / f"{job.job_id}.output.jsonl"
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    choice = lines[-1]["response"]["body"]["choices"][0]
+    call = choice["message"]["tool_calls"][0]["function"]
+    call["arguments"] = call["arguments"][:10]
+    choice["finish_reason"] = "length"
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines))
+
+    responses = collect_batch_results(job, backend)
+
+    assert responses[1][1] is None
+    assert list(job.errors) == ["request-1-schema-1"]
+    assert job.errors["request-1-schema-1"].startswith("Invalid output (truncated)")
+    assert responses[0][0] is not None and responses[1][0] is not None
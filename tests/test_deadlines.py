@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Unit tests for request deadlines split across pipeline stages."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent_style_transfer import evaluation
+from agent_style_transfer.agent import build_timeout_response, transfer_style
+from agent_style_transfer.deadlines import Deadline, DeadlineExceeded
+from agent_style_transfer.evaluation import evaluate
+from agent_style_transfer.schemas import StyleTransferRequest
+from tests.conftest import AsyncFakeChatModel, FakeClock, load_fixture
+
+# Long enough that only a deadline ends the call
+HANG = 60
+
+
+def test_stage_timeouts_split_remaining_time():
+    clock = FakeClock()
+    deadline = Deadline(10, {"inference": 1, "generation": 3}, clock=clock)
+
+    assert deadline.stage_timeout("inference") == pytest.approx(2.5)
+
+    # Time inference didn't use rolls over to generation
+    clock.now = 1.0
+    assert deadline.stage_timeout("generation") == pytest.approx(9.0)
+
+    clock.now = 12.0
+    assert deadline.expired
+    assert deadline.stage_timeout("generation") == 0
+
+
+@pytest.mark.asyncio
+async def test_run_cancels_work_past_the_stage_budget():
+    deadline = Deadline(0.05, {"inference": 1})
+    cancelled = []
+
+    async def hang():
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    with pytest.raises(DeadlineExceeded) as info:
+        await deadline.run("inference", hang())
+
+    assert info.value.stage == "inference"
+    assert cancelled == [1]
+
+
+@pytest.mark.asyncio
+async def test_generation_timeout_returns_partial_results(make_fake_llm):
+    llm = make_fake_llm(AsyncFakeChatModel, delays={"BlogPost": HANG})
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    request.reference_style = []
+
+    started = time.monotonic()
+    tweet, blog = await transfer_style(
+        request, "anthropic", deadline=Deadline(0.2, {"generation": 1})
+    )
+
+    assert time.monotonic() - started < 5
+    assert tweet.status == "completed"
+    assert blog.status == "timeout"
+    assert blog.processed_content == ""
+    assert blog.metadata["timeout_stage"] == "generation"
+    assert llm.cancelled == 1
+
+
+@pytest.mark.asyncio
+async def test_inference_timeout_falls_back_to_given_styles(make_fake_llm):
+    make_fake_llm(AsyncFakeChatModel, delays={"WritingStyle": HANG, None: HANG})
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+
+    responses = await transfer_style(request, "openai", deadline=0.2)
+
+    assert all(r.status == "completed" for r in responses)
+    assert all(r.metadata["timed_out_stages"] == ["inference"] for r in responses)
+
+
+def test_evaluation_of_timed_out_responses_is_skipped(fake_llm):
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    response = build_timeout_response(
+        request.target_schemas[0],
+        request.reference_style,
+        request.intent,
+        request.focus,
+        request.target_content,
+        "generation",
+    )
+
+    results = evaluate(request, response, deadline=5)
+
+    assert {r["status"] for r in results} == {"timeout"}
+    assert fake_llm.calls == []
+
+
+def test_deadline_evaluations_run_on_a_bounded_pool(monkeypatch):
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def slow_evaluation():
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return {"score": 1.0}
+
+    monkeypatch.setattr(
+        evaluation,
+        "_evaluations",
+        lambda *args: [(f"eval_{i}", lambda: slow_evaluation()) for i in range(20)],
+    )
+    response = build_timeout_response(
+        request.target_schemas[0],
+        request.reference_style,
+        request.intent,
+        request.focus,
+        request.target_content,
+        "generation",
+    )
+    response.status = "completed"
+
+    [results] = evaluate(request, [response], deadline=30)
+
+    assert results == [{"score": 1.0}] * 20
+    assert 1 < running[1] <= evaluation.MAX_EVALUATION_WORKERS
@@ -4,15 +4,23 @@
 import json
 
 import pytest
+from langchain_core.messages import AIMessage
 
 from agent_style_transfer.schemas import (
+    OutputSchema,
+    OutputType,
     StyleTransferRequest,
     StyleTransferResponse,
 )
+from agent_style_transfer.utils.content_extractor import (
+    extract_content,
+    response_text,
+)
 from agent_style_transfer.utils.evaluation import (
     format_result,
     get_text_content,
 )
+from tests.conftest import FAKE_SCHEMA_ARGS
 
 
 def test_format_result():
@@ -124,3 +132,55 @@ def test_get_text_content_no_original_content():
 
     assert generated_text == "Generated content here"
     assert original_text == ""
+
+
+@pytest.mark.parametrize("output_type", list(OutputType))
+def test_extract_content_from_object_matches_json(output_type):
+    """Reading the typed output gives the same text as parsing its JSON."""
+    schema_class = output_type.get_schema()
+    output = schema_class(**FAKE_SCHEMA_ARGS[schema_class.__name__])
+    output_schema = OutputSchema(name="test", output_type=output_type)
+
+    assert extract_content(output, output_schema) == extract_content(
+        output.model_dump_json(indent=2), output_schema
+    )
+
+
+def test_response_keeps_output_and_renders_json_lazily():
+    """The typed output is kept and only serialized when read."""
+    with open("fixtures/tweet-request.json") as f:
+        request = StyleTransferRequest(**json.load(f))
+    schema_class = OutputType.TWEET_SINGLE.get_schema()
+    output = schema_class(text="Generated content here")
+
+    response = StyleTransferResponse(
+        output=output,
+        applied_style="Tech Influencer Style",
+        output_schema=request.target_schemas[0],
+    )
+
+    assert get_text_content(request, response)[0] == "Generated content here"
+    assert response._processed_content is None
+
+    loaded = StyleTransferResponse.model_validate_json(response.model_dump_json())
+    assert loaded.output is None
+    assert json.loads(loaded.processed_content) == output.model_dump(mode="json")
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        AIMessage(content="- Rule one\n- Rule two"),
+        AIMessage(
+            content=[
+                {"type": "text", "text": "- Rule one\n"},
+                {"type": "text", "text": "- Rule two"},
+            ]
+        ),
+        AIMessage(content=["- Rule one\n", "- Rule two"]),
+        {"content": "- Rule one\n- Rule two"},
+        "- Rule one\n- Rule two",
+    ],
+)
+def test_response_text_joins_multi_part_content(response):
+    assert response_text(response) == "- Rule one\n- Rule two"
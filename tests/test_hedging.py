@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Unit tests for hedged requests and cross-provider fallback."""
+
+import asyncio
+
+import pytest
+
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.hedging import HedgePolicy
+from agent_style_transfer.schemas import StyleTransferRequest
+from tests.conftest import AsyncFakeChatModel, load_fixture
+
+
+async def answer(value, delay=0.0, error=None):
+    await asyncio.sleep(delay)
+    if error:
+        raise error
+    return value
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    policy = HedgePolicy("openai", initial_delay=0.1)
+
+    result, info = await policy.run(lambda: answer("primary"), lambda: answer("x"))
+
+    assert result == "primary"
+    assert info["hedged"] is False
+    assert policy.hedge_rate == 0.0
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled():
+    policy = HedgePolicy("openai", initial_delay=0.01)
+    primary = asyncio.Event()
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            primary.set()
+            raise
+
+    result, info = await policy.run(slow_primary, lambda: answer("secondary"))
+    await asyncio.sleep(0)
+
+    assert result == "secondary"
+    assert info["hedged"] is True
+    assert info["winner"] == "secondary"
+    assert primary.is_set()
+    assert policy.stats()["secondary_wins"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_primary_falls_back_to_secondary():
+    policy = HedgePolicy("openai", initial_delay=1)
+
+    result, info = await policy.run(
+        lambda: answer(None, error=RuntimeError("down")), lambda: answer("secondary")
+    )
+
+    assert result == "secondary"
+    assert info["winner"] == "secondary"
+
+
+@pytest.mark.asyncio
+async def test_both_failing_raises_primary_error():
+    policy = HedgePolicy("openai", initial_delay=0)
+
+    with pytest.raises(RuntimeError, match="primary"):
+        await policy.run(
+            lambda: answer(None, error=RuntimeError("primary")),
+            lambda: answer(None, 0.01, error=RuntimeError("secondary")),
+        )
+
+
+def test_hedge_delay_uses_latency_percentile():
+    policy = HedgePolicy("openai", percentile=90, min_samples=10, min_delay=0)
+    assert policy.delay() == policy.initial_delay
+
+    for latency in range(1, 11):
+        policy.record_latency(latency / 10)
+
+    assert policy.delay() == pytest.approx(0.9)
+
+
+@pytest.mark.asyncio
+async def test_transfer_style_reports_hedge_metadata(monkeypatch, make_fake_llm):
+    """A slow primary provider loses to the secondary and is reported."""
+    primary = make_fake_llm(AsyncFakeChatModel, delay=1.0)
+    secondary = AsyncFakeChatModel()
+    monkeypatch.setattr(
+        "agent_style_transfer.hedging.get_llm", lambda *args, **kwargs: secondary
+    )
+    request = load_fixture("tweet-request", model=StyleTransferRequest)
+    policy = HedgePolicy("openai", initial_delay=0.01)
+
+    responses = await transfer_style(request, "anthropic", hedge_policy=policy)
+    await asyncio.sleep(0)
+
+    assert responses[0].metadata["hedge"]["winner"] == "secondary"
+    assert responses[0].metadata["hedge"]["hedge_rate"] == 1.0
+    assert secondary.tool_calls == 1
+    assert primary.cancelled == 1
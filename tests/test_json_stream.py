@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Unit tests for the incremental JSON parser."""
+
+import json
+
+import pytest
+
+from agent_style_transfer.utils.json_stream import IncrementalJSONParser
+
+DOCUMENT = {
+    "title": 'Escapes: "quoted" \\ tab\t é 😀',
+    "markdown": "# Heading\n\nBody",
+    "tags": ["api", "rest"],
+    "tweets": [{"text": "one", "url_allowed": True}, {"text": "two"}],
+    "score": -1.5e3,
+    "empty": [],
+    "nothing": None,
+}
+
+
+def feed_in_chunks(text, size):
+    parser = IncrementalJSONParser()
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start : start + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_parser_matches_json_loads(size, ensure_ascii):
+    """Any chunking yields the same result as json.loads."""
+    text = json.dumps(DOCUMENT, ensure_ascii=ensure_ascii, indent=2)
+
+    parser, events = feed_in_chunks(text, size)
+
+    assert parser.done
+    assert parser.root == DOCUMENT
+    assert events[-1] == ("value", (), DOCUMENT)
+
+
+def test_parser_string_deltas_reassemble():
+    """Deltas for a string field concatenate to its final value."""
+    _, events = feed_in_chunks(json.dumps(DOCUMENT), 4)
+
+    deltas = [text for kind, path, text in events if kind == "delta"]
+    markdown = "".join(
+        text for kind, path, text in events if kind == "delta" and path == ("markdown",)
+    )
+
+    assert markdown == DOCUMENT["markdown"]
+    assert len(deltas) > len(DOCUMENT)
+
+
+def test_parser_reports_completed_list_items():
+    """Each list entry completes with its index in the path."""
+    _, events = feed_in_chunks(json.dumps(DOCUMENT), 5)
+
+    tweets = [
+        value
+        for kind, path, value in events
+        if kind == "value" and len(path) == 2 and path[0] == "tweets"
+    ]
+
+    assert tweets == DOCUMENT["tweets"]
+
+
+def test_parser_rejects_invalid_json():
+    with pytest.raises(ValueError):
+        IncrementalJSONParser().feed('{"a" 1}')
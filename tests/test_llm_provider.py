@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 """Test LLM provider setup with real API keys."""
 
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
 import pytest
 
-from agent_style_transfer.llm_provider_setup import get_llm
+from agent_style_transfer.llm_provider_setup import clear_llm_cache, get_llm
+from tests.conftest import FakeToolChatModel
 
 
 @pytest.mark.integration
@@ -47,3 +53,75 @@ def test_get_llm_with_temperature():
     llm = get_llm("openai", "gpt-3.5-turbo", temperature=0.1)
     assert llm is not None
     assert hasattr(llm, "invoke")
+
+
+@pytest.fixture
+def counted_init(monkeypatch):
+    """Count model constructions without touching any provider."""
+    created = []
+
+    def fake_init_chat_model(**kwargs):
+        llm = FakeToolChatModel()
+        created.append((kwargs, llm))
+        return llm
+
+    monkeypatch.setattr(
+        "agent_style_transfer.llm_provider_setup.init_chat_model",
+        fake_init_chat_model,
+    )
+    clear_llm_cache()
+    yield created
+    clear_llm_cache()
+
+
+def test_get_llm_memoizes_clients(counted_init):
+    """Identical settings reuse one client; different settings don't."""
+    llm = get_llm("anthropic", temperature=0.3)
+
+    assert get_llm("anthropic", "claude-3-haiku-20240307", 0.3) is llm
+    assert get_llm("anthropic", temperature=0.1) is not llm
+    assert get_llm("anthropic", temperature=0.3, max_tokens=100) is not llm
+    assert len(counted_init) == 3
+
+
+def test_clear_llm_cache_resets_clients(counted_init):
+    """Clearing the cache forces a fresh client."""
+    llm = get_llm("openai")
+
+    clear_llm_cache()
+
+    assert get_llm("openai") is not llm
+
+
+def test_get_llm_scopes_clients_per_event_loop(counted_init):
+    """Each event loop gets its own client so async pools never cross loops."""
+
+    async def fetch():
+        first = get_llm("openai")
+        await asyncio.sleep(0)
+        assert get_llm("openai") is first
+        return first
+
+    first_loop = asyncio.run(fetch())
+    second_loop = asyncio.run(fetch())
+
+    assert first_loop is not second_loop
+    assert first_loop is not get_llm("openai")
+
+
+def test_import_does_not_load_providers_or_env():
+    """Importing the agent leaves provider integrations and .env for later."""
+    code = (
+        "import sys, agent_style_transfer.agent; "
+        "print(sorted(m for m in ('langchain.chat_models', 'dotenv') "
+        "if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Unit tests for map-reduce condensing of long target documents."""
+
+import pytest
+
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.long_input import (
+    KEY_POINTS_HEADING,
+    LongInputConfig,
+    condense_target_content,
+)
+from agent_style_transfer.schemas import StyleTransferRequest
+from agent_style_transfer.utils.tokens import chunk_text, estimate_tokens
+from tests.conftest import AsyncFakeChatModel, load_fixture
+
+PARAGRAPH = "Machine learning models learn patterns from example data. " * 20
+LONG_CONTENT = "\n\n".join(f"Section {i}. {PARAGRAPH}" for i in range(20))
+CONFIG = LongInputConfig(threshold_tokens=1000, chunk_tokens=500, max_concurrency=2)
+
+
+@pytest.fixture
+def long_request() -> StyleTransferRequest:
+    request = load_fixture("enhanced-style-request", model=StyleTransferRequest)
+    request.target_content[0].content = LONG_CONTENT
+    return request
+
+
+def test_chunk_text_keeps_chunks_within_size():
+    chunks = chunk_text(LONG_CONTENT, 500)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= 500 for chunk in chunks)
+    assert chunks[0].startswith("Section 0.")
+    assert " ".join(" ".join(chunks).split()) == " ".join(LONG_CONTENT.split())
+
+
+def test_chunk_text_splits_oversized_sentences_between_words():
+    chunks = chunk_text("word " * 1000, 50)
+
+    assert all(estimate_tokens(chunk) <= 50 for chunk in chunks)
+    assert sum(len(chunk.split()) for chunk in chunks) == 1000
+
+
+@pytest.mark.asyncio
+async def test_short_documents_are_not_condensed(fake_llm):
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+
+    docs = await condense_target_content(request.target_content, "openai")
+
+    assert docs is request.target_content
+    assert fake_llm.calls == []
+
+
+def echo_key_points(messages) -> str:
+    """Echo the excerpt's section numbers as key points."""
+    prompt = messages[-1].content
+    sections = sorted(set(part.split(".")[0] for part in prompt.split("Section ")[1:]))
+    return "\n".join(f"- Point about section {s}" for s in sections)
+
+
+@pytest.mark.asyncio
+async def test_long_documents_are_condensed_concurrently(make_fake_llm, long_request):
+    llm = make_fake_llm(AsyncFakeChatModel, delay=0.01, reply=echo_key_points)
+
+    (doc,) = await condense_target_content(
+        long_request.target_content, "openai", config=CONFIG
+    )
+
+    chunks = chunk_text(LONG_CONTENT, CONFIG.chunk_tokens)
+    assert llm.text_calls == len(chunks)
+    assert llm.max_in_flight == CONFIG.max_concurrency
+    assert doc.content.startswith(KEY_POINTS_HEADING)
+    assert "- Point about section 0" in doc.content
+    assert "- Point about section 19" in doc.content
+    assert doc.title == long_request.target_content[0].title
+
+
+@pytest.mark.asyncio
+async def test_long_input_is_selected_automatically(fake_llm, long_request):
+    await transfer_style(long_request, "openai", long_input=CONFIG)
+
+    prompt = fake_llm.calls[-1][0][-1].content
+    assert KEY_POINTS_HEADING in prompt
+    assert PARAGRAPH not in prompt
+
+    fake_llm.calls.clear()
+    await transfer_style(long_request, "openai", long_input=None)
+
+    assert PARAGRAPH.strip() in fake_llm.calls[-1][0][-1].content
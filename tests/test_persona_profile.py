@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""Unit tests for incrementally updated persona profiles."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.persona_profile import PersonaProfile, PersonaProfileStore
+from agent_style_transfer.schemas import Document, StyleTransferRequest
+from agent_style_transfer.stylometry import profile_documents
+from tests.conftest import load_fixture
+
+FORMAL_POSTS = [
+    "The committee reviewed the proposal in considerable detail. Its "
+    "recommendations will be published following the consultation period.",
+    "Quarterly results demonstrate sustained improvement across all regions. "
+    "Management anticipates continued growth throughout the coming year.",
+    "The organisation remains committed to transparent governance. Further "
+    "information is available in the annual report.",
+]
+CASUAL_POSTS = [
+    "OMG you guys!!! 🎉🎉 We did it!!! #launch #party 🚀",
+    "Can't believe it's live!! 😍 Go try it, you'll love it!! #yay",
+    "Best. Day. Ever!!! 🙌🔥 #winning",
+]
+
+
+def make_documents(posts: list[str]) -> list[Document]:
+    return [
+        Document(url="https://example.com", type="Blog", category="Formal", content=p)
+        for p in posts
+    ]
+
+
+def test_add_documents_only_profiles_new_documents():
+    documents = make_documents(FORMAL_POSTS)
+    profile = PersonaProfile("exec")
+
+    assert profile.add_documents(documents[:2]) == documents[:2]
+    assert profile.add_documents(documents) == documents[2:]
+    assert profile.add_documents(documents) == []
+
+    assert len(profile.document_hashes) == 3
+    assert profile.stats.features() == profile_documents(documents).features()
+
+
+def test_profiles_persist_across_store_instances(tmp_path):
+    path = tmp_path / "profiles" / "personas.sqlite"
+    profile = PersonaProfile("exec")
+    profile.add_documents(make_documents(FORMAL_POSTS))
+    profile.set_inferred(profile.local_style(), "anthropic")
+    PersonaProfileStore(path).save(profile)
+
+    store = PersonaProfileStore(path)
+    restored = store.get("exec")
+
+    assert len(store) == 1
+    assert restored.document_hashes == profile.document_hashes
+    assert restored.stats.features() == profile.stats.features()
+    assert restored.inferred == profile.inferred
+    assert restored.drift() == 0
+    assert not restored.needs_inference("anthropic")
+    assert restored.needs_inference("openai")
+    assert store.get("unknown") is None
+
+
+@pytest.mark.asyncio
+async def test_reinference_only_runs_when_style_drifts(fake_llm):
+    store = PersonaProfileStore(":memory:")
+    formal = make_documents(FORMAL_POSTS)
+    casual = make_documents(CASUAL_POSTS)
+
+    first = await store.ainfer_style("exec", formal[:2], "anthropic")
+    # A new post in the same style updates the aggregates only
+    second = await store.ainfer_style("exec", formal, "anthropic")
+
+    assert store.inferences == fake_llm.inference_calls == 1
+    assert first.tone == second.tone == "direct"
+    assert len(store.get("exec").document_hashes) == 3
+    assert second == store.get("exec").inferred
+
+    # A change of voice passes the drift threshold
+    await store.ainfer_style("exec", formal + casual, "anthropic")
+
+    assert store.inferences == fake_llm.inference_calls == 2
+    assert store.get("exec").drift() == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_updates_of_one_persona_are_serialized(fake_llm):
+    store = PersonaProfileStore(":memory:")
+    formal = make_documents(FORMAL_POSTS)
+
+    await asyncio.gather(
+        *(store.ainfer_style("exec", [doc], "anthropic") for doc in formal)
+    )
+
+    assert len(store.get("exec").document_hashes) == 3
+    assert store.inferences == fake_llm.inference_calls == 1
+
+
+def test_concurrent_threads_share_one_persona_update(fake_llm):
+    store = PersonaProfileStore(":memory:")
+    formal = make_documents(FORMAL_POSTS)
+
+    with ThreadPoolExecutor(3) as pool:
+        list(
+            pool.map(lambda doc: store.infer_style("exec", [doc], "anthropic"), formal)
+        )
+
+    assert len(store.get("exec").document_hashes) == 3
+    assert store.inferences == fake_llm.inference_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_transfer_style_updates_persona_profiles(fake_llm):
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    store = PersonaProfileStore(":memory:")
+    documents = request.reference_style[0].documents
+
+    await transfer_style(request, "anthropic", persona_profiles=store)
+    request.reference_style[0].documents = documents + [
+        documents[0].model_copy(update={"content": documents[0].content + " Again."})
+    ]
+    await transfer_style(request, "anthropic", persona_profiles=store)
+
+    profile = store.get(request.reference_style[0].name)
+    assert fake_llm.inference_calls == 1
+    assert len(profile.document_hashes) == len(documents) + 1
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Unit tests for token-budgeted prompt assembly."""
+
+import pytest
+
+from agent_style_transfer.prompt_builder import (
+    build_cacheable_generation_prompt,
+    build_generation_prompt,
+)
+from agent_style_transfer.schemas import StyleTransferRequest
+from agent_style_transfer.utils.tokens import (
+    TRUNCATION_MARKER,
+    estimate_tokens,
+    truncate_to_tokens,
+)
+from tests.conftest import load_fixture
+
+SENTENCE = "Machine learning models learn patterns from example data. "
+
+
+@pytest.fixture
+def request_with_content() -> StyleTransferRequest:
+    request = load_fixture("enhanced-style-request", model=StyleTransferRequest)
+    request.target_content[0].content = SENTENCE * 200
+    return request
+
+
+def build(request, max_prompt_tokens=None) -> str:
+    return build_generation_prompt(
+        request.target_schemas[0],
+        request.reference_style,
+        request.intent,
+        request.focus,
+        request.target_content,
+        infer_styles=False,
+        max_prompt_tokens=max_prompt_tokens,
+    )
+
+
+def test_truncate_to_tokens_keeps_whole_sentences():
+    text = "First sentence. Second sentence! Third sentence?"
+
+    assert truncate_to_tokens(text, 100) == text
+    assert truncate_to_tokens(text, 8) == "First sentence." + TRUNCATION_MARKER
+    assert truncate_to_tokens(text, 4) == "First" + TRUNCATION_MARKER
+    assert truncate_to_tokens(text, 0) == ""
+    assert truncate_to_tokens(None, 10) == ""
+
+
+def test_prompt_within_budget_is_unchanged(request_with_content):
+    full = build(request_with_content)
+
+    assert build(request_with_content, estimate_tokens(full)) == full
+
+
+def test_metadata_is_trimmed_first(request_with_content):
+    full = build(request_with_content)
+
+    trimmed = build(request_with_content, estimate_tokens(full) - 10)
+
+    assert "Metadata:" in full
+    assert "Metadata:" not in trimmed
+    assert "Example 2:" in trimmed
+    assert SENTENCE * 200 in trimmed
+
+
+def test_extra_examples_are_trimmed_before_content(request_with_content):
+    full = build(request_with_content)
+    without_metadata = build(request_with_content, estimate_tokens(full) - 10)
+
+    trimmed = build(request_with_content, estimate_tokens(without_metadata) - 10)
+
+    assert "Example 1:" in trimmed
+    assert "Example 2:" not in trimmed
+    assert SENTENCE * 200 in trimmed
+
+
+def test_content_is_truncated_at_sentence_boundary(request_with_content):
+    budget = 1000
+
+    trimmed = build(request_with_content, budget)
+
+    assert estimate_tokens(trimmed) <= budget
+    assert TRUNCATION_MARKER in trimmed
+    content = trimmed.split("Content:\n", 1)[1].split(TRUNCATION_MARKER)[0]
+    assert content.endswith("data.")
+    # Instructions and guidance are never trimmed
+    assert "## Writing Style Guidance:" in trimmed
+    assert "Please generate the content now:" in trimmed
+
+
+def test_cacheable_prompt_keeps_request_content_out_of_the_prefix(
+    request_with_content,
+):
+    request = request_with_content
+
+    prefix, suffix = build_cacheable_generation_prompt(
+        request.target_schemas,
+        request.reference_style,
+        request.intent,
+        request.focus,
+        request.target_content,
+    )
+
+    assert "## Writing Style Guidance:" in prefix
+    assert "## Reference Style Information" in prefix
+    assert SENTENCE not in prefix
+    assert SENTENCE in suffix
+    assert request.intent in suffix
+    assert suffix.rstrip().endswith("Please generate the content now:")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Unit tests for rate limiting and retry with a local fake provider."""
+
+import pytest
+
+from agent_style_transfer.llm_provider_setup import clear_llm_cache, get_llm
+from agent_style_transfer.rate_limiting import (
+    RateLimitedModel,
+    RateLimiter,
+    RetryPolicy,
+    clear_rate_limits,
+    configure_rate_limit,
+    get_rate_limit_stats,
+    get_retry_after,
+    is_retryable,
+)
+from tests.conftest import FakeClock, FakeToolChatModel
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeAPIError(Exception):
+    """Mimics provider SDK errors carrying an HTTP response."""
+
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = FakeResponse(status_code, headers)
+
+
+def throttled_llm(failures=2, status_code=429, retry_after="0"):
+    """Fake provider that answers ``status_code`` a fixed number of times first."""
+    headers = {"retry-after": retry_after} if retry_after else {}
+    return FakeToolChatModel(errors=[FakeAPIError(status_code, headers)] * failures)
+
+
+def fast_limiter(**kwargs):
+    return RateLimiter(retry_policy=RetryPolicy(base_delay=0.001), **kwargs)
+
+
+def test_rate_limiter_requests_per_minute():
+    """Requests beyond the per-minute budget wait for the bucket to refill."""
+    clock = FakeClock()
+    limiter = RateLimiter(requests_per_minute=60, clock=clock)
+
+    waits = [limiter.reserve() for _ in range(62)]
+
+    assert waits[:60] == [0.0] * 60
+    assert waits[60:] == pytest.approx([1.0, 2.0])
+    clock.now = 10.0
+    assert limiter.reserve() == 0.0
+    assert limiter.stats()["queue_wait_seconds"] == pytest.approx(3.0)
+
+
+def test_rate_limiter_tokens_per_minute_with_usage_correction():
+    """Token reservations are corrected by the reported usage."""
+    clock = FakeClock()
+    limiter = RateLimiter(tokens_per_minute=600, clock=clock)
+
+    assert limiter.reserve(500) == 0.0
+    limiter.record_usage(estimated_tokens=500, actual_tokens=700)
+
+    assert limiter.reserve(100) == pytest.approx(20.0)
+
+
+def test_retry_after_and_retryable_detection():
+    assert get_retry_after(FakeAPIError(429, {"retry-after": "3"})) == 3.0
+    assert get_retry_after(FakeAPIError(429, {"retry-after-ms": "250"})) == 0.25
+    assert get_retry_after(FakeAPIError(429)) is None
+    assert is_retryable(FakeAPIError(429))
+    assert is_retryable(FakeAPIError(503))
+    assert not is_retryable(FakeAPIError(400))
+    assert not is_retryable(ValueError("boom"))
+
+
+def test_retry_policy_honors_retry_after():
+    policy = RetryPolicy(max_delay=10)
+
+    assert policy.backoff(0, FakeAPIError(429, {"retry-after": "4"})) == 4.0
+    assert policy.backoff(0, FakeAPIError(429, {"retry-after": "60"})) == 10
+    assert 0 <= policy.backoff(3, FakeAPIError(429)) <= 8
+
+
+def test_rate_limited_model_retries_429():
+    """429 responses are retried until the fake provider recovers."""
+    llm = RateLimitedModel(throttled_llm(), fast_limiter())
+
+    response = llm.invoke("hello")
+
+    assert response.content == llm.runnable.text
+    assert llm.limiter.stats()["retries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_model_async_structured_output():
+    """Derived runnables keep the limiter and retry asynchronously."""
+    limiter = fast_limiter()
+    llm = RateLimitedModel(throttled_llm(retry_after=None), limiter)
+
+    structured = llm.with_structured_output({"title": "TweetSingle", "type": "object"})
+    result = await structured.ainvoke("hello")
+
+    assert isinstance(structured, RateLimitedModel)
+    assert result == {"text": "Fake tweet #AI", "url_allowed": True}
+    assert limiter.stats()["retries"] == 2
+
+
+def test_rate_limited_model_gives_up():
+    """Non-retryable errors and exhausted retries propagate."""
+    limiter = RateLimiter(retry_policy=RetryPolicy(max_retries=1, base_delay=0.001))
+
+    with pytest.raises(FakeAPIError):
+        RateLimitedModel(throttled_llm(failures=5), limiter).invoke("hi")
+    with pytest.raises(FakeAPIError):
+        RateLimitedModel(throttled_llm(status_code=400), limiter).invoke("hi")
+
+
+def test_get_llm_wraps_configured_providers(monkeypatch):
+    """get_llm applies the limiter configured for the provider."""
+    monkeypatch.setattr(
+        "agent_style_transfer.llm_provider_setup.init_chat_model",
+        lambda **kwargs: FakeToolChatModel(),
+    )
+    clear_llm_cache()
+    limiter = configure_rate_limit("openai", requests_per_minute=100)
+    try:
+        llm = get_llm("openai")
+        llm.invoke("hello")
+
+        assert isinstance(llm, RateLimitedModel)
+        assert llm.limiter is limiter
+        assert not isinstance(get_llm("anthropic"), RateLimitedModel)
+        assert get_rate_limit_stats()["openai"]["requests"] == 1
+    finally:
+        clear_rate_limits()
+        clear_llm_cache()
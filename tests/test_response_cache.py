@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Unit tests for the generation response cache."""
+
+import pytest
+from langchain.schema import HumanMessage, SystemMessage
+
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.response_cache import (
+    InMemoryResponseCache,
+    ResponseCache,
+    SQLiteResponseCache,
+    is_deterministic,
+    response_cache_key,
+)
+from agent_style_transfer.schemas import BlogPost, LinkedInPost, StyleTransferRequest
+from tests.conftest import FakeToolChatModel, load_fixture
+
+MESSAGES = [SystemMessage(content="system"), HumanMessage(content="prompt")]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryResponseCache(max_entries=2)
+    return SQLiteResponseCache(tmp_path / "responses.db", max_entries=2)
+
+
+def test_key_covers_prompt_schema_provider_model_and_temperature():
+    key = response_cache_key(MESSAGES, BlogPost, "openai", "gpt-4", 0.0)
+
+    assert key == response_cache_key(list(MESSAGES), BlogPost, "openai", "gpt-4", 0.0)
+    assert key != response_cache_key(MESSAGES[:1], BlogPost, "openai", "gpt-4", 0.0)
+    assert key != response_cache_key(MESSAGES, LinkedInPost, "openai", "gpt-4", 0.0)
+    assert key != response_cache_key(MESSAGES, BlogPost, "anthropic", "gpt-4", 0.0)
+    assert key != response_cache_key(MESSAGES, BlogPost, "openai", "gpt-4o", 0.0)
+    assert key != response_cache_key(MESSAGES, BlogPost, "openai", "gpt-4", 0.5)
+
+
+def test_backend_hits_misses_and_lru_eviction(cache):
+    assert cache.get("a") is None
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "3"
+    assert len(cache) == 2
+    assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0
+
+
+def test_sqlite_cache_persists_and_expires(tmp_path):
+    path = tmp_path / "responses.db"
+    cache = SQLiteResponseCache(path)
+    cache.set("a", "1")
+    cache.close()
+
+    assert SQLiteResponseCache(path).get("a") == "1"
+    assert SQLiteResponseCache(path, ttl_seconds=0).get("a") is None
+
+
+def test_is_deterministic():
+    assert is_deterministic(FakeToolChatModel(temperature=0.0))
+    assert not is_deterministic(FakeToolChatModel(temperature=0.7))
+    assert not is_deterministic(FakeToolChatModel())
+
+
+@pytest.mark.asyncio
+async def test_rerun_at_temperature_zero_skips_provider(fake_llm):
+    fake_llm.temperature = 0.0
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    cache = InMemoryResponseCache()
+
+    first = await transfer_style(request, "openai", response_cache=cache)
+    calls = fake_llm.generation_calls
+    second = await transfer_style(request, "openai", response_cache=cache)
+
+    assert fake_llm.generation_calls == calls
+    assert [r.processed_content for r in second] == [r.processed_content for r in first]
+    assert {r.metadata["response_cache"] for r in first} == {"miss"}
+    assert {r.metadata["response_cache"] for r in second} == {"hit"}
+    assert cache.hits == len(request.target_schemas)
+
+
+@pytest.mark.asyncio
+async def test_sampling_temperature_bypasses_cache(fake_llm):
+    fake_llm.temperature = 0.7
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    cache = InMemoryResponseCache()
+
+    await transfer_style(request, "openai", response_cache=cache)
+    await transfer_style(request, "openai", response_cache=cache)
+
+    assert fake_llm.generation_calls == 2 * len(request.target_schemas)
+    assert len(cache) == 0
+    assert cache.hits == cache.misses == 0
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class NoClear(ResponseCache):
+        def _get(self, key):
+            return None
+
+        def _set(self, key, value):
+            pass
+
+        def __len__(self):
+            return 0
+
+    with pytest.raises(TypeError):
+        NoClear()
+    assert isinstance(SQLiteResponseCache(":memory:"), ResponseCache)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Unit tests for the batch concurrency scheduler."""
+
+import asyncio
+
+import pytest
+
+from agent_style_transfer.scheduler import ConcurrencyScheduler
+
+
+async def run_units(scheduler, providers):
+    active = {}
+    peaks = {}
+
+    async def unit(provider):
+        async with scheduler.slot(provider):
+            active[provider] = active.get(provider, 0) + 1
+            peaks[provider] = max(peaks.get(provider, 0), active[provider])
+            await asyncio.sleep(0.01)
+            active[provider] -= 1
+
+    await asyncio.gather(*(unit(p) for p in providers))
+    return peaks
+
+
+@pytest.mark.asyncio
+async def test_scheduler_global_limit():
+    """No more than max_concurrency units run at once."""
+    scheduler = ConcurrencyScheduler(max_concurrency=3)
+
+    await run_units(scheduler, ["openai"] * 10)
+
+    assert scheduler.max_in_flight == 3
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_scheduler_per_provider_limit():
+    """Provider caps apply on top of the global cap."""
+    scheduler = ConcurrencyScheduler(
+        max_concurrency=4, per_provider_limits={"anthropic": 1}
+    )
+
+    peaks = await run_units(scheduler, ["anthropic"] * 4 + ["openai"] * 6)
+
+    assert peaks["anthropic"] == 1
+    assert peaks["openai"] <= 4
+    assert scheduler.max_in_flight == 4
+
+
+def test_scheduler_rejects_invalid_limit():
+    with pytest.raises(ValueError):
+        ConcurrencyScheduler(max_concurrency=0)
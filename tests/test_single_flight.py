@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""Unit tests for single-flight coalescing of identical LLM calls."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.schemas import StyleTransferRequest
+from agent_style_transfer.single_flight import SingleFlight, llm_call_key
+from agent_style_transfer.writing_style_inferrer import ainfer_style_rules
+from tests.conftest import load_fixture
+
+
+def counted(result="result", delay=0.01, error=None):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return result
+
+    return fn, calls
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_flight():
+    flight = SingleFlight()
+    fn, calls = counted()
+
+    results = await asyncio.gather(*(flight.ado("key", fn) for _ in range(5)))
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "shared": 4}
+
+
+@pytest.mark.asyncio
+async def test_different_keys_and_later_calls_are_not_shared():
+    flight = SingleFlight()
+    fn, calls = counted()
+
+    await asyncio.gather(flight.ado("a", fn), flight.ado("b", fn))
+    await flight.ado("a", fn)
+
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+    fn, calls = counted(error=ValueError("boom"))
+
+    results = await asyncio.gather(
+        flight.ado("key", fn), flight.ado("key", fn), return_exceptions=True
+    )
+
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_the_shared_call():
+    flight = SingleFlight()
+    fn, _ = counted(delay=0.05)
+
+    first = asyncio.ensure_future(flight.ado("key", fn))
+    second = asyncio.ensure_future(flight.ado("key", fn))
+    await asyncio.sleep(0.01)
+    first.cancel()
+
+    assert await second == "result"
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_cancelling_every_waiter_cancels_the_call():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    cancelled = []
+
+    async def fn():
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    waiter = asyncio.ensure_future(flight.ado("key", fn))
+    await started.wait()
+    waiter.cancel()
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert cancelled == [1]
+
+
+def test_sync_calls_coalesce_across_threads():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fn():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, "key", fn) for _ in range(4)]
+        # Let every thread join the flight before the leader finishes
+        while flight.shared < 3:
+            time.sleep(0.001)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+
+
+def test_llm_call_key_resolves_default_model():
+    explicit = llm_call_key("op", "openai", "gpt-3.5-turbo", "prompt")
+
+    assert llm_call_key("op", "openai", None, "prompt") == explicit
+    assert llm_call_key("op", "openai", "gpt-4", "prompt") != explicit
+    assert llm_call_key("op", "openai", None, "other") != explicit
+
+
+@pytest.mark.asyncio
+async def test_concurrent_inferences_share_llm_calls(fake_llm):
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    documents = request.reference_style[0].documents
+
+    results = await asyncio.gather(
+        *(ainfer_style_rules(documents, provider="openai") for _ in range(3))
+    )
+
+    assert results[0] == results[1] == results[2]
+    assert fake_llm.text_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_transfers_share_generation(fake_llm):
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+
+    first, second = await asyncio.gather(
+        transfer_style(request, llm_provider="openai"),
+        transfer_style(request, llm_provider="openai"),
+    )
+
+    assert [r.processed_content for r in first] == [r.processed_content for r in second]
+    assert fake_llm.generation_calls == len(request.target_schemas)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Unit tests for the persistent style profile cache."""
+
+import pytest
+
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.schemas import StyleTransferRequest, WritingStyle
+from agent_style_transfer.style_cache import StyleProfileCache, style_cache_key
+from tests.conftest import load_fixture
+
+
+def make_style(rule: str) -> WritingStyle:
+    return WritingStyle(
+        tone="neutral",
+        formality_level=0.5,
+        sentence_structure="varied",
+        vocabulary_level="moderate",
+        style_rules=[rule],
+    )
+
+
+def test_style_cache_key_depends_on_inputs():
+    """Keys change with document content, provider and model."""
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    documents = request.reference_style[0].documents
+
+    key = style_cache_key(documents, "anthropic")
+
+    assert key == style_cache_key(documents, "anthropic", "claude-3-haiku-20240307")
+    assert key != style_cache_key(documents, "openai")
+    assert key != style_cache_key(documents, "anthropic", "claude-3-opus-20240229")
+    assert key != style_cache_key(documents[:1], "anthropic")
+    assert key != style_cache_key(documents, "anthropic", prompt_version="0")
+
+
+def test_style_cache_persists_across_instances(tmp_path):
+    """Entries survive reopening the database file."""
+    path = tmp_path / "cache" / "styles.sqlite"
+    StyleProfileCache(path).set("k", make_style("Be brief"))
+
+    cache = StyleProfileCache(path)
+
+    assert cache.get("k").style_rules == ["Be brief"]
+    assert cache.get("missing") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_style_cache_lru_eviction():
+    """The least recently used entry is evicted past max_entries."""
+    cache = StyleProfileCache(":memory:", max_entries=2)
+    cache.set("a", make_style("a"))
+    cache.set("b", make_style("b"))
+    cache.get("a")
+    cache.set("c", make_style("c"))
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_style_cache_ttl_expiry():
+    """Entries older than the TTL are treated as misses."""
+    cache = StyleProfileCache(":memory:", ttl_seconds=60)
+    cache.set("k", make_style("k"))
+    cache._last_tick += 61
+
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_transfer_style_skips_inference_on_cache_hit(fake_llm, tmp_path):
+    """A second request for the same persona makes no inference calls."""
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    cache = StyleProfileCache(tmp_path / "styles.sqlite")
+
+    await transfer_style(request, "anthropic", style_cache=cache)
+    inference_calls = fake_llm.inference_calls
+    responses = await transfer_style(request, "anthropic", style_cache=cache)
+
+    assert inference_calls > 0
+    assert fake_llm.inference_calls == inference_calls
+    assert cache.hits == 1
+    assert len(responses) == 1
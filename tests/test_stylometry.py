@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Unit tests for the local stylometric profiler."""
+
+import pytest
+
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.prompt_builder import aenhance_reference_styles
+from agent_style_transfer.schemas import Document, StyleTransferRequest
+from agent_style_transfer.stylometry import (
+    STYLE_PATTERNS,
+    infer_local_style,
+    profile_documents,
+    profile_text,
+)
+from tests.conftest import load_fixture
+
+CASUAL = (
+    "Hey everyone! Just shipped the new release 🚀 It's fast. "
+    "You're gonna love it! #buildinpublic @team"
+)
+FORMAL = (
+    "The quarterly financial report indicates a considerable increase in "
+    "revenue compared to the previous period. This development can be "
+    "attributed to strategic market expansion and improved operational "
+    "efficiency across international subsidiaries."
+)
+
+
+def make_document(content: str) -> Document:
+    return Document(
+        url="https://example.com", type="Blog", category="Casual", content=content
+    )
+
+
+def test_profile_text_counts_surface_features():
+    stats = profile_text(CASUAL)
+    features = stats.features()
+
+    assert stats.words == 13
+    assert stats.sentences == 3
+    assert stats.counts["emojis"] == 1
+    assert stats.counts["hashtags"] == 1
+    assert stats.counts["mentions"] == 1
+    assert stats.counts["contractions"] == 2
+    assert stats.counts["exclamations"] == 2
+    assert features["sentence_words_p50"] == 4
+    assert features["type_token_ratio"] == 1.0
+
+
+def test_stats_merge_like_the_concatenated_documents():
+    merged = profile_text(CASUAL).merge(profile_text(FORMAL))
+    documents = profile_documents([make_document(CASUAL), make_document(FORMAL)])
+
+    assert merged.documents == documents.documents == 2
+    assert merged.features() == documents.features()
+    assert merged.sentences == profile_text(CASUAL).sentences + 2
+    assert profile_documents([]).features() == {}
+
+
+def test_infer_local_style_separates_casual_and_formal():
+    casual = infer_local_style(CASUAL)
+    formal = infer_local_style([make_document(FORMAL)])
+
+    assert casual.formality_level < 0.35 < 0.65 < formal.formality_level
+    assert casual.tone == "enthusiastic"
+    assert formal.tone == "formal"
+    assert casual.sentence_structure == "short"
+    assert casual.vocabulary_level == "simple"
+    assert formal.vocabulary_level in ("advanced", "technical")
+    assert any(rule.startswith("Use emojis") for rule in casual.style_rules)
+    assert set(formal.writing_patterns) == set(STYLE_PATTERNS)
+    assert infer_local_style("") is None
+
+
+@pytest.mark.asyncio
+async def test_local_style_inference_makes_no_llm_calls(fake_llm):
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+
+    responses = await transfer_style(request, "anthropic", style_inference="local")
+
+    assert fake_llm.inference_calls == 0
+    assert fake_llm.generation_calls == len(responses)
+    prompt = fake_llm.calls[0][0][-1].content
+    assert "Keep sentences around" in prompt
+
+
+@pytest.mark.asyncio
+async def test_llm_style_inference_is_grounded_by_measurements(fake_llm):
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+
+    (style,) = await aenhance_reference_styles(request.reference_style, "anthropic")
+
+    inference_prompt = fake_llm.calls[0][0][0].content
+    assert "Measured statistics" in inference_prompt
+    assert "avg_sentence_words" in inference_prompt
+    assert style.style_definition.tone == "direct"
+    # Measurements only ground the inference; generation gets the LLM's style
+    assert "avg_sentence_words" not in style.style_definition.writing_patterns
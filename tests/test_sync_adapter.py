@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Unit tests for running sync-only models on a bounded thread pool."""
+
+import asyncio
+import threading
+
+import pytest
+
+from agent_style_transfer import sync_adapter
+from agent_style_transfer.agent import transfer_style
+from agent_style_transfer.rate_limiting import RateLimitedModel, RateLimiter
+from agent_style_transfer.schemas import StyleTransferRequest
+from agent_style_transfer.sync_adapter import (
+    SyncModelExecutor,
+    ainvoke_model,
+    configure_sync_executor,
+    get_sync_executor_stats,
+    supports_async,
+)
+from tests.conftest import AsyncFakeChatModel, FakeToolChatModel, load_fixture
+
+
+@pytest.fixture
+def sync_executor(monkeypatch):
+    executor = SyncModelExecutor(max_workers=2)
+    monkeypatch.setattr(sync_adapter, "_sync_executor", executor)
+    yield executor
+    executor.shutdown()
+
+
+def test_supports_async_looks_through_wrappers():
+    sync_model = FakeToolChatModel()
+    async_model = AsyncFakeChatModel()
+
+    assert not supports_async(sync_model)
+    assert not supports_async(sync_model.bind_tools([]))
+    assert not supports_async(RateLimitedModel(sync_model, RateLimiter()))
+    assert supports_async(async_model.bind_tools([]))
+
+
+@pytest.mark.asyncio
+async def test_sync_models_run_on_bounded_pool(sync_executor):
+    # Sync-only fake model that blocks its thread for a while
+    llm = FakeToolChatModel(delay=0.05)
+    ticks = 0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal ticks
+        while not done.is_set():
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    ticking = asyncio.ensure_future(ticker())
+    await asyncio.gather(*(ainvoke_model(llm, "prompt") for _ in range(6)))
+    done.set()
+    await ticking
+
+    assert sync_executor.stats() == {
+        "max_workers": 2,
+        "calls": 6,
+        "queued": 0,
+        "running": 0,
+        "peak_running": 2,
+    }
+    # The event loop kept running while the models blocked their threads
+    assert ticks > 10
+
+
+@pytest.mark.asyncio
+async def test_async_models_bypass_the_pool(sync_executor):
+    await ainvoke_model(AsyncFakeChatModel(), "prompt")
+
+    assert sync_executor.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_generation_of_sync_models_uses_the_pool(make_fake_llm, sync_executor):
+    llm = make_fake_llm()
+    request = load_fixture("tweet-and-blog-request", model=StyleTransferRequest)
+    request.reference_style = []
+    main_thread = threading.get_ident()
+    threads = set()
+    generate = llm._generate
+
+    def record_thread(*args, **kwargs):
+        threads.add(threading.get_ident())
+        return generate(*args, **kwargs)
+
+    object.__setattr__(llm, "_generate", record_thread)
+
+    responses = await transfer_style(request, "anthropic")
+
+    assert len(responses) == 2
+    assert sync_executor.calls == 2
+    assert main_thread not in threads
+
+
+def test_configure_sync_executor():
+    previous = sync_adapter._sync_executor
+    try:
+        executor = configure_sync_executor(max_workers=3)
+
+        assert get_sync_executor_stats()["max_workers"] == 3
+        assert sync_adapter._sync_executor is executor
+        with pytest.raises(ValueError):
+            configure_sync_executor(max_workers=0)
+    finally:
+        sync_adapter._sync_executor = previous
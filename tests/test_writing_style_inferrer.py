@@ -3,15 +3,23 @@
 
 import pytest
 
+from agent_style_transfer.prompt_builder import abuild_generation_prompt
 from agent_style_transfer.schemas import (
+    Document,
     FewShotExample,
     StyleTransferRequest,
+    WritingStyle,
 )
 from agent_style_transfer.writing_style_inferrer import (
+    ainfer_few_shot_examples,
+    ainfer_style_rules,
+    ainfer_writing_style,
     infer_few_shot_examples,
     infer_style_rules,
+    infer_writing_style,
+    merge_writing_styles,
 )
-from tests.conftest import load_fixture
+from tests.conftest import AsyncFakeChatModel, load_fixture
 
 
 @pytest.mark.vcr
@@ -57,3 +65,168 @@ def test_infer_style_rules_with_linkedin_documents():
 
     for rule in rules:
         assert isinstance(rule, str)
+
+
+@pytest.mark.asyncio
+async def test_async_inference_matches_sync(fake_llm):
+    """Async inference parses responses exactly like the sync versions."""
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+    documents = request.reference_style[0].documents
+
+    rules = await ainfer_style_rules(documents, provider="anthropic")
+    examples = await ainfer_few_shot_examples(documents, provider="anthropic")
+
+    assert rules == infer_style_rules(documents, provider="anthropic")
+    assert examples == infer_few_shot_examples(documents, provider="anthropic")
+    assert rules == ["Use short, punchy sentences", "Address the reader directly"]
+    assert len(examples) == len(documents)
+
+
+@pytest.mark.asyncio
+async def test_abuild_generation_prompt_includes_inferred_style(fake_llm):
+    """The async prompt builder enriches document-based styles."""
+    request = load_fixture("document-based-request", model=StyleTransferRequest)
+
+    prompt = await abuild_generation_prompt(
+        request.target_schemas[0],
+        request.reference_style,
+        request.intent,
+        request.focus,
+        request.target_content,
+        "anthropic",
+    )
+
+    assert "Use short, punchy sentences" in prompt
+    assert "Input: Remote work" in prompt
+
+
+def echo_title(messages) -> str:
+    """Answer with an example styled after the document title."""
+    title = messages[0].content.split("Document Title: ")[1].split("\n")[0]
+    return f"Input: {title}\nOutput: styled {title}"
+
+
+@pytest.mark.asyncio
+async def test_ainfer_few_shot_examples_bounded_and_ordered(make_fake_llm):
+    """Per-document calls run concurrently up to the cap, keeping input order."""
+    llm = make_fake_llm(AsyncFakeChatModel, delay=0.01, reply=echo_title)
+    documents = [
+        Document(
+            url="https://example.com",
+            type="Twitter",
+            category="Casual",
+            title=f"Post {i}",
+            content=f"Content {i}",
+        )
+        for i in range(7)
+    ]
+
+    examples = await ainfer_few_shot_examples(documents, max_concurrency=3)
+
+    assert [example.input for example in examples] == [f"Post {i}" for i in range(7)]
+    assert llm.max_in_flight == 3
+
+
+def make_documents(count: int) -> list[Document]:
+    return [
+        Document(
+            url="https://example.com",
+            type="Twitter",
+            category="Casual",
+            title=f"Post {i}",
+            content=f"Content {i} " * 100,
+        )
+        for i in range(count)
+    ]
+
+
+def test_infer_writing_style_uses_one_structured_call(fake_llm):
+    """Rules, examples and characteristics come from a single call."""
+    documents = make_documents(4)
+
+    style = infer_writing_style(documents, provider="anthropic")
+
+    assert fake_llm.inference_calls == 1
+    assert len(fake_llm.calls) == 1
+    assert style.tone == "direct"
+    assert style.style_rules == [
+        "Use short, punchy sentences",
+        "Address the reader directly",
+    ]
+    assert style.few_shot_examples[0].input == "Remote work"
+
+    # Every document is shown the same way
+    prompt = fake_llm.calls[0][0][0].content
+    for doc in documents:
+        assert f"Title: {doc.title}\nContent: {doc.content[:500]}..." in prompt
+
+
+def test_infer_writing_style_accepts_plain_text(fake_llm):
+    style = infer_writing_style("Hey everyone! Check this out 🚀", "anthropic")
+
+    assert style.vocabulary_level == "simple"
+    assert infer_writing_style("   ", "anthropic") is None
+    assert fake_llm.inference_calls == 1
+
+
+@pytest.mark.parametrize(
+    "patterns, expected",
+    [
+        ("Uses emojis and hashtags", {"notes": "Uses emojis and hashtags"}),
+        ('{"emojis": "often"}', {"emojis": "often"}),
+        ("", {}),
+    ],
+)
+def test_string_writing_patterns_keep_the_style(fake_llm, patterns, expected):
+    """Patterns sent back as a string (as Gemini does) don't drop the style."""
+    fake_llm.tool_args["WritingStyle"] = {
+        **fake_llm.tool_args["WritingStyle"],
+        "writing_patterns": patterns,
+    }
+
+    style = infer_writing_style(make_documents(2), "google_genai")
+
+    assert style.tone == "direct"
+    assert style.style_rules
+    assert style.writing_patterns == expected
+
+
+@pytest.mark.asyncio
+async def test_ainfer_writing_style_batches_large_persona_sets(fake_llm):
+    """``batch_size`` splits documents into calls whose styles are merged."""
+    documents = make_documents(5)
+
+    style = await ainfer_writing_style(documents, "anthropic", batch_size=2)
+
+    assert fake_llm.inference_calls == 3
+    assert style.style_rules == [
+        "Use short, punchy sentences",
+        "Address the reader directly",
+    ]
+    assert len(style.few_shot_examples) == 3
+    assert style == infer_writing_style(documents, "anthropic", batch_size=2)
+
+
+def test_merge_writing_styles_weights_batches():
+    def style(tone: str, formality: float, rule: str) -> WritingStyle:
+        return WritingStyle(
+            tone=tone,
+            formality_level=formality,
+            sentence_structure="short",
+            vocabulary_level="simple",
+            personality_traits=["witty"],
+            writing_patterns={"emojis": tone},
+            style_rules=[rule, "Be concise"],
+        )
+
+    merged = merge_writing_styles(
+        [style("casual", 0.2, "Use emojis"), None, style("formal", 0.8, "No slang")],
+        weights=[3, 5, 1],
+    )
+
+    assert merged.tone == "casual"
+    assert merged.formality_level == pytest.approx(0.35)
+    assert merged.personality_traits == ["witty"]
+    assert merged.writing_patterns == {"emojis": "casual"}
+    assert merged.style_rules == ["Use emojis", "Be concise", "No slang"]
+    assert merge_writing_styles([None]) is None